@@ -0,0 +1,82 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+# Measures the time and the peak memory of 'az webapp list --show-config --show-app-settings' over mocked sites,
+# against listing the apps and then fetching the configuration and settings of each app one after the other.
+# The mocked calls take a fixed latency, per page of 100 sites for the list.
+#
+# Usage: python measure_webapp_list.py [number of sites] [latency in ms]
+
+import sys
+import time
+import tracemalloc
+
+from azure.mgmt.web.models import Site, SiteConfigResource, StringDictionary
+
+from azure.cli.command_modules.appservice import custom
+
+
+class _WebApps(object):
+    def __init__(self, count, latency):
+        self.count = count
+        self.latency = latency
+
+    def list(self):
+        for i in range(self.count):
+            if i % 100 == 0:
+                time.sleep(self.latency)
+            site = Site(location='westus', kind='app', server_farm_id='plan')
+            site.name, site.resource_group = 'app{}'.format(i), 'myRG'
+            yield site
+
+    def get_configuration(self, resource_group_name, name):
+        time.sleep(self.latency)
+        return SiteConfigResource(linux_fx_version='PYTHON|3.7', always_on=True, app_command_line=name * 20)
+
+    def list_application_settings(self, resource_group_name, name):
+        time.sleep(self.latency)
+        return StringDictionary(properties={'SETTING{}'.format(i): name * 10 for i in range(20)})
+
+
+class _Cmd(object):  # pylint: disable=too-few-public-methods
+    cli_ctx = None
+
+
+class _Client(object):  # pylint: disable=too-few-public-methods
+    def __init__(self, count, latency):
+        self.web_apps = _WebApps(count, latency)
+
+
+def _list_serially(client):
+    sites = list(client.web_apps.list())
+    for site in sites:
+        site.site_config = client.web_apps.get_configuration(site.resource_group, site.name)
+        site.app_settings = client.web_apps.list_application_settings(site.resource_group, site.name).properties
+    return sites
+
+
+def _measure(label, func):
+    tracemalloc.start()
+    start = time.time()
+    result = func()
+    elapsed = time.time() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print('{}: {} apps in {:.2f} s, peak memory {:.1f} MiB'.format(label, len(result), elapsed, peak / 1048576.0))
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    latency = (int(sys.argv[2]) if len(sys.argv) > 2 else 20) / 1000.0
+    client = _Client(count, latency)
+    custom.web_client_factory = lambda cli_ctx: client
+
+    _measure('one app after the other', lambda: _list_serially(client))
+    _measure('az webapp list --show-config --show-app-settings',
+             lambda: custom.list_webapp(_Cmd(), show_config=True, show_app_settings=True))
+
+
+if __name__ == '__main__':
+    main()
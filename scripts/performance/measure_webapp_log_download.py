@@ -0,0 +1,77 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+# Measures the throughput of downloading a log dump, as 'az webapp log download' does, from a local server which
+# supports ranges and resets the connection a few times during the download.
+#
+# Usage: python measure_webapp_log_download.py [size in MiB] [number of resets]
+
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from six.moves import BaseHTTPServer, socketserver  # pylint: disable=import-error
+
+from azure.cli.command_modules.appservice._log_utils import download_log, get_pool_manager
+
+
+class _Server(socketserver.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    daemon_threads = True
+
+
+def serve(port_queue, size, resets):
+    dump = os.urandom(1024 * 1024) * (size // (1024 * 1024))
+    requests = []
+
+    class Handler(BaseHTTPServer.BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_GET(self):  # pylint: disable=invalid-name
+            offset = int(self.headers.get('Range', 'bytes=0-')[6:-1])
+            requests.append(offset)
+            self.send_response(206 if offset else 200)
+            self.send_header('Content-Length', str(size - offset))
+            self.end_headers()
+            # the connection is reset after a part of the dump, until there were enough resets
+            end = size * len(requests) // (resets + 1) if len(requests) <= resets else size
+            view = memoryview(dump)
+            for start in range(offset, end, 1024 * 1024):
+                self.wfile.write(view[start:min(start + 1024 * 1024, end)])
+            self.close_connection = True
+
+        def log_message(self, *args):  # pylint: disable=arguments-differ
+            pass
+
+    server = _Server(('127.0.0.1', 0), Handler)
+    port_queue.put(server.server_port)
+    server.serve_forever()
+
+
+def main():
+    size = int(sys.argv[1]) * 1024 * 1024 if len(sys.argv) > 1 else 512 * 1024 * 1024
+    resets = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    port_queue = multiprocessing.Queue()
+    process = multiprocessing.Process(target=serve, args=(port_queue, size, resets))
+    process.daemon = True
+    process.start()
+    url = 'http://127.0.0.1:{}/dump'.format(port_queue.get())
+
+    temp_dir = tempfile.mkdtemp()
+    try:
+        start = time.time()
+        received = download_log(get_pool_manager(), url, {}, os.path.join(temp_dir, 'logs.zip'), retry_interval=0)
+        elapsed = time.time() - start
+        print('{:.0f} MiB with {} resets: {:.2f} s, {:.0f} MiB/s'.format(
+            received / 1048576.0, resets, elapsed, received / 1048576.0 / elapsed))
+    finally:
+        shutil.rmtree(temp_dir)
+        process.terminate()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+# Measures the line rate and CPU time of streaming the logs of several apps, as 'az webapp log tail' does,
+# from local servers which send their lines in chunks as fast as they can.
+#
+# Usage: python measure_webapp_log_tail.py [number of apps] [lines per app]
+
+import multiprocessing
+import os
+import sys
+import time
+
+from six.moves import BaseHTTPServer, socketserver  # pylint: disable=import-error
+
+from knack.util import CLIError
+from azure.cli.command_modules.appservice._log_utils import LogSource, stream_logs
+
+
+class _Server(socketserver.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    daemon_threads = True
+
+
+def serve(port_queue, count, lines):
+    class Handler(BaseHTTPServer.BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_GET(self):  # pylint: disable=invalid-name
+            if self.headers.get('Range'):
+                self.send_response(404)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header('Transfer-Encoding', 'chunked')
+            self.end_headers()
+            chunk = b''.join(b'2019-03-01T12:00:00 PID[1234] Information request %d handled\r\n' % i
+                             for i in range(100))
+            for _ in range(lines // 100):
+                self.wfile.write(b'%x\r\n%s\r\n' % (len(chunk), chunk))
+            self.wfile.write(b'0\r\n\r\n')
+
+        def log_message(self, *args):  # pylint: disable=arguments-differ
+            pass
+
+    servers = [_Server(('127.0.0.1', 0), Handler) for _ in range(count)]
+    for server in servers:
+        port_queue.put(server.server_port)
+    import threading
+    for server in servers[1:]:
+        thread = threading.Thread(target=server.serve_forever)
+        thread.daemon = True
+        thread.start()
+    servers[0].serve_forever()
+
+
+class _CountingOutput(object):
+    def __init__(self):
+        self.lines = 0
+
+    def write(self, data):
+        self.lines += data.count(b'\n')
+
+    def flush(self):
+        pass
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    lines = int(sys.argv[2]) if len(sys.argv) > 2 else 500000
+    port_queue = multiprocessing.Queue()
+    process = multiprocessing.Process(target=serve, args=(port_queue, count, lines))
+    process.daemon = True
+    process.start()
+    sources = [LogSource('app{}'.format(i), 'http://127.0.0.1:{}/logstream'.format(port_queue.get()), {})
+               for i in range(count)]
+
+    output = _CountingOutput()
+    start, start_cpu = time.time(), sum(os.times()[:2])
+    try:
+        stream_logs(sources, output=output, retry_interval=0)
+    except CLIError:  # the servers answer 404 once they sent their lines
+        pass
+    elapsed, cpu = time.time() - start, sum(os.times()[:2]) - start_cpu
+    print('{} apps, {} lines: {:.2f} s, {:.0f} lines/s, {:.2f} s of CPU ({:.0%})'.format(
+        count, output.lines, elapsed, output.lines / elapsed, cpu, cpu / elapsed))
+    if output.lines != count * lines:
+        print('{} lines lost'.format(count * lines - output.lines))
+    process.terminate()
+
+
+if __name__ == '__main__':
+    main()
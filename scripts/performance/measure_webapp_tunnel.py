@@ -0,0 +1,130 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+# Measures the throughput and the round trip latency of the debug tunnel of 'az webapp create-remote-connection'
+# against a local websocket echo server, with one and several concurrent connections.
+#
+# Python 3 only, for the echo server.
+#
+# Usage: python measure_webapp_tunnel.py [MiB per connection] [concurrent connections]
+
+import base64
+import hashlib
+import multiprocessing
+import socket
+import struct
+import sys
+import threading
+import time
+
+from azure.cli.command_modules.appservice.tunnel import TunnelServer
+
+
+def _recv_exactly(conn, size):
+    data = b''
+    while len(data) < size:
+        chunk = conn.recv(size - len(data))
+        if not chunk:
+            raise EOFError()
+        data += chunk
+    return data
+
+
+def _serve_echo(conn):
+    request = b''
+    while b'\r\n\r\n' not in request:
+        request += conn.recv(4096)
+    key = [line.split(b':', 1)[1].strip() for line in request.split(b'\r\n')
+           if line.lower().startswith(b'sec-websocket-key')][0]
+    accept = base64.b64encode(hashlib.sha1(key + b'258EAFA5-E914-47DA-95CA-C5AB0DC85B11').digest())
+    conn.sendall(b'HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n'
+                 b'Sec-WebSocket-Accept: ' + accept + b'\r\n\r\n')
+    try:
+        while True:
+            opcode, length = struct.unpack('!BB', _recv_exactly(conn, 2))
+            length &= 0x7F
+            if length == 126:
+                length = struct.unpack('!H', _recv_exactly(conn, 2))[0]
+            elif length == 127:
+                length = struct.unpack('!Q', _recv_exactly(conn, 8))[0]
+            mask = _recv_exactly(conn, 4)
+            payload = _recv_exactly(conn, length)
+            # unmask the payload at once, as an integer
+            mask = int.from_bytes((mask * (length // 4 + 1))[:length], 'big')
+            payload = (int.from_bytes(payload, 'big') ^ mask).to_bytes(length, 'big')
+            if opcode & 0x0F == 0x8:
+                break
+            header = struct.pack('!BB', 0x82, 127) + struct.pack('!Q', length)
+            conn.sendall(header + payload)
+    except (EOFError, socket.error):
+        pass
+    conn.close()
+
+
+def serve(port_queue):
+    server = socket.socket()
+    server.bind(('127.0.0.1', 0))
+    server.listen(100)
+    port_queue.put(server.getsockname()[1])
+    while True:
+        conn, _ = server.accept()
+        thread = threading.Thread(target=_serve_echo, args=(conn,))
+        thread.daemon = True
+        thread.start()
+
+
+def transfer(port, size, results):
+    conn = socket.create_connection(('127.0.0.1', port))
+    conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    block = b'x' * (64 * 1024)
+
+    def _send():
+        for _ in range(size // len(block)):
+            conn.sendall(block)
+
+    sender = threading.Thread(target=_send)
+    sender.start()
+    received = 0
+    while received < size:
+        received += len(conn.recv(1024 * 1024))
+    sender.join()
+
+    start = time.time()
+    for _ in range(200):
+        conn.sendall(b'p')
+        conn.recv(1)
+    results.append((time.time() - start) / 200)
+    conn.close()
+
+
+def main():
+    size = int(sys.argv[1]) * 1024 * 1024 if len(sys.argv) > 1 else 64 * 1024 * 1024
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    port_queue = multiprocessing.Queue()
+    process = multiprocessing.Process(target=serve, args=(port_queue,))
+    process.daemon = True
+    process.start()
+    tunnel = TunnelServer('127.0.0.1', 0, 'bench', 'user', 'password')
+    tunnel.remote_url = 'ws://127.0.0.1:{}/AppServiceTunnel/Tunnel.ashx'.format(port_queue.get())
+    thread = threading.Thread(target=tunnel.start_server)
+    thread.daemon = True
+    thread.start()
+
+    for count in sorted({1, concurrency}):
+        results = []
+        start = time.time()
+        threads = [threading.Thread(target=transfer, args=(tunnel.get_port(), size, results)) for _ in range(count)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.time() - start
+        print('{} connections: {:.0f} MiB/s each way, round trip {:.2f} ms'.format(
+            count, count * size / 1048576.0 / elapsed, 1000 * sum(results) / len(results)))
+    process.terminate()
+
+
+if __name__ == '__main__':
+    main()
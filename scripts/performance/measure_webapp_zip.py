@@ -0,0 +1,56 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+# Measures the time to zip a synthetic web app of text and binary files, as 'az webapp up' does,
+# with an increasing number of compression threads.
+#
+# Usage: python measure_webapp_zip.py [number of files]
+
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from azure.cli.command_modules.appservice._zip_utils import write_zip
+
+
+def create_tree(root, count):
+    files = []
+    text = b''.join(b'function f%d(a, b) { return a + b * %d; }\n' % (i, i) for i in range(500))
+    for i in range(count):
+        directory = os.path.join(root, 'src', 'module{}'.format(i // 100))
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        # one file in ten is an already compressed asset
+        name = 'asset{}.png'.format(i) if i % 10 == 0 else 'file{}.js'.format(i)
+        path = os.path.join(directory, name)
+        with open(path, 'wb') as f:
+            f.write(os.urandom(64 * 1024) if i % 10 == 0 else text)
+        files.append((path, os.path.relpath(path, root)))
+    return files
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    root = tempfile.mkdtemp()
+    try:
+        files = create_tree(root, count)
+        workers = 1
+        while workers <= multiprocessing.cpu_count():
+            zip_path = os.path.join(root, 'app.zip')
+            start = time.time()
+            with open(zip_path, 'wb') as f:
+                write_zip(f, files, max_workers=workers)
+            print('{} files, {} threads: {:.2f} s, {:.1f} MiB'.format(
+                count, workers, time.time() - start, os.path.getsize(zip_path) / 1048576.0))
+            workers *= 2
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == '__main__':
+    main()
@@ -5,7 +5,6 @@
 
 from __future__ import print_function
 
-import datetime
 import json
 import logging as logs
 import os
@@ -27,6 +26,7 @@ from knack.events import EVENT_INVOKER_TRANSFORM_RESULT
 from azure.cli.core.commands.constants import (
     BLACKLISTED_MODS, DEFAULT_QUERY_TIME_RANGE, CLI_COMMON_KWARGS, CLI_COMMAND_KWARGS, CLI_PARAM_KWARGS,
     CLI_POSITIONAL_PARAM_KWARGS, CONFIRM_PARAM_NAME)
+from azure.cli.core.commands.deployment_progress import get_deployment_progress
 from azure.cli.core.commands.parameters import (
     AzArgumentContext, patch_arg_make_required, patch_arg_make_optional)
 from azure.cli.core.extension import get_extension
@@ -317,10 +317,14 @@ class AzCliCommandInvoker(CommandInvoker):
             jobs.append((expanded_arg, cmd_copy))
 
         ids = getattr(parsed_args, '_ids', None) or [None] * len(jobs)
-        if self.cli_ctx.config.getboolean('core', 'disable_concurrent_ids', False) or len(ids) < 2:
-            results, exceptions = self._run_jobs_serially(jobs, ids)
-        else:
-            results, exceptions = self._run_jobs_concurrently(jobs, ids)
+        try:
+            if self.cli_ctx.config.getboolean('core', 'disable_concurrent_ids', False) or len(ids) < 2:
+                results, exceptions = self._run_jobs_serially(jobs, ids)
+            else:
+                results, exceptions = self._run_jobs_concurrently(jobs, ids)
+        finally:
+            from azure.cli.core.commands.wait_poller import release_wait_group
+            release_wait_group(self.cli_ctx.data['headers'].get('x-ms-client-request-id'))
 
         # handle exceptions
         if len(exceptions) == 1 and not results:
@@ -350,7 +354,7 @@ class AzCliCommandInvoker(CommandInvoker):
         return [(p.split('=', 1)[0] if p.startswith('--') else p[:2]) for p in args if
                 (p.startswith('-') and not p.startswith('---') and len(p) > 1)]
 
-    def _run_job(self, expanded_arg, cmd_copy):
+    def _run_job(self, expanded_arg, cmd_copy, lro_scheduler=None):
         params = self._filter_params(expanded_arg)
         try:
             result = cmd_copy(params)
@@ -364,19 +368,37 @@ class AzCliCommandInvoker(CommandInvoker):
                 result = transform_op(result)
 
             if _is_poller(result):
+                if lro_scheduler is not None:
+                    # the operation is waited on together with the operations of the other jobs
+                    index = lro_scheduler.add(result)
+                    return _PendingJobResult(lambda: self._complete_job(cmd_copy, lro_scheduler.result, index))
                 result = LongRunningOperation(cmd_copy.cli_ctx, 'Starting {}'.format(cmd_copy.name))(result)
-            elif _is_paged(result):
-                result = list(result)
+            return self._convert_job_result(cmd_copy, result)
+        except Exception as ex:  # pylint: disable=broad-except
+            return self._handle_job_exception(cmd_copy, ex)
 
-            result = todict(result, AzCliCommandInvoker.remove_additional_prop_layer)
-            event_data = {'result': result}
-            cmd_copy.cli_ctx.raise_event(EVENT_INVOKER_TRANSFORM_RESULT, event_data=event_data)
-            return event_data['result']
+    def _complete_job(self, cmd_copy, get_result, *args):
+        try:
+            return self._convert_job_result(cmd_copy, get_result(*args))
         except Exception as ex:  # pylint: disable=broad-except
-            if cmd_copy.exception_handler:
-                cmd_copy.exception_handler(ex)
-                return CommandResultItem(None, exit_code=1, error=ex)
-            six.reraise(*sys.exc_info())
+            return self._handle_job_exception(cmd_copy, ex)
+
+    @staticmethod
+    def _convert_job_result(cmd_copy, result):
+        if _is_paged(result):
+            result = list(result)
+
+        result = todict(result, AzCliCommandInvoker.remove_additional_prop_layer)
+        event_data = {'result': result}
+        cmd_copy.cli_ctx.raise_event(EVENT_INVOKER_TRANSFORM_RESULT, event_data=event_data)
+        return event_data['result']
+
+    @staticmethod
+    def _handle_job_exception(cmd_copy, ex):
+        if cmd_copy.exception_handler:
+            cmd_copy.exception_handler(ex)
+            return CommandResultItem(None, exit_code=1, error=ex)
+        six.reraise(*sys.exc_info())
 
     def _run_jobs_serially(self, jobs, ids):
         results, exceptions = [], []
@@ -389,16 +411,27 @@ class AzCliCommandInvoker(CommandInvoker):
         return results, exceptions
 
     def _run_jobs_concurrently(self, jobs, ids):
-        from concurrent.futures import ThreadPoolExecutor, as_completed
-        tasks, results, exceptions = [], [], []
+        from concurrent.futures import ThreadPoolExecutor
+        from azure.cli.core.commands.lro_scheduler import LongRunningOperationScheduler
+
+        # the workers only start the operations, which are then waited on all at once
+        lro_scheduler = LongRunningOperationScheduler(self.cli_ctx)
+        outcomes, results, exceptions = [], [], []
         with ThreadPoolExecutor(max_workers=10) as executor:
-            for expanded_arg, cmd_copy in jobs:
-                tasks.append(executor.submit(self._run_job, expanded_arg, cmd_copy))
-            for index, task in enumerate(as_completed(tasks)):
+            tasks = [executor.submit(self._run_job, expanded_arg, cmd_copy, lro_scheduler)
+                     for expanded_arg, cmd_copy in jobs]
+            for task, id_arg in zip(tasks, ids):
                 try:
-                    results.append(task.result())
+                    outcomes.append((task.result(), id_arg))
                 except (Exception, SystemExit) as ex:  # pylint: disable=broad-except
-                    exceptions.append((ex, ids[index]))
+                    exceptions.append((ex, id_arg))
+
+        lro_scheduler.wait()
+        for result, id_arg in outcomes:
+            try:
+                results.append(result.complete() if isinstance(result, _PendingJobResult) else result)
+            except (Exception, SystemExit) as ex:  # pylint: disable=broad-except
+                exceptions.append((ex, id_arg))
         return results, exceptions
 
     def resolve_warnings(self, cmd, parsed_args):
@@ -483,6 +516,13 @@ class AzCliCommandInvoker(CommandInvoker):
             pass
 
 
+class _PendingJobResult(object):  # pylint: disable=too-few-public-methods
+    """ The result of a job whose long-running operation is still running. """
+
+    def __init__(self, complete):
+        self.complete = complete
+
+
 class LongRunningOperation(object):  # pylint: disable=too-few-public-methods
     def __init__(self, cli_ctx, start_msg='', finish_msg='', poller_done_interval_ms=1000.0):
 
@@ -490,74 +530,13 @@ class LongRunningOperation(object):  # pylint: disable=too-few-public-methods
         self.start_msg = start_msg
         self.finish_msg = finish_msg
         self.poller_done_interval_ms = poller_done_interval_ms
-        self.deploy_dict = {}
-        self.last_progress_report = datetime.datetime.now()
-
-    def _delay(self):
-        time.sleep(self.poller_done_interval_ms / 1000.0)
-
-    def _generate_template_progress(self, correlation_id):  # pylint: disable=no-self-use
-        """ gets the progress for template deployments """
-        from azure.cli.core.commands.client_factory import get_mgmt_service_client
-        from azure.mgmt.monitor import MonitorManagementClient
-
-        if correlation_id is not None:  # pylint: disable=too-many-nested-blocks
-            formatter = "eventTimestamp ge {}"
-
-            end_time = datetime.datetime.utcnow()
-            start_time = end_time - datetime.timedelta(seconds=DEFAULT_QUERY_TIME_RANGE)
-            odata_filters = formatter.format(start_time.strftime('%Y-%m-%dT%H:%M:%SZ'))
-
-            odata_filters = "{} and {} eq '{}'".format(odata_filters, 'correlationId', correlation_id)
-
-            activity_log = get_mgmt_service_client(
-                self.cli_ctx, MonitorManagementClient).activity_logs.list(filter=odata_filters)
-
-            results = []
-            max_events = 50  # default max value for events in list_activity_log
-            for index, item in enumerate(activity_log):
-                if index < max_events:
-                    results.append(item)
-                else:
-                    break
-
-            if results:
-                for event in results:
-                    update = False
-                    long_name = event.resource_id.split('/')[-1]
-                    if long_name not in self.deploy_dict:
-                        self.deploy_dict[long_name] = {}
-                        update = True
-                    deploy_values = self.deploy_dict[long_name]
-
-                    checked_values = {
-                        str(event.resource_type.value): 'type',
-                        str(event.status.value): 'status value',
-                        str(event.event_name.value): 'request',
-                    }
-                    try:
-                        checked_values[str(event.properties.get('statusCode', ''))] = 'status'
-                    except AttributeError:
-                        pass
-
-                    if deploy_values.get('timestamp', None) is None or \
-                            event.event_timestamp > deploy_values.get('timestamp'):
-                        for value in checked_values:
-                            if deploy_values.get(checked_values[value], None) != value:
-                                update = True
-                            deploy_values[checked_values[value]] = value
-                        deploy_values['timestamp'] = event.event_timestamp
-
-                        # don't want to show the timestamp
-                        json_val = deploy_values.copy()
-                        json_val.pop('timestamp', None)
-                        status_val = deploy_values.get('status value', None)
-                        if status_val and status_val != 'Started':
-                            result = deploy_values['status value'] + ': ' + long_name
-                            result += ' (' + deploy_values.get('type', '') + ')'
-
-                            if update:
-                                logger.info(result)
+
+    def _delay(self, poller=None):
+        from azure.cli.core.commands.lro_scheduler import wait_for_poller
+        if poller is None:
+            time.sleep(self.poller_done_interval_ms / 1000.0)
+        else:
+            wait_for_poller(poller, self.poller_done_interval_ms / 1000.0)
 
     def __call__(self, poller):
         import colorama
@@ -572,9 +551,10 @@ class LongRunningOperation(object):  # pylint: disable=too-few-public-methods
 
         cli_logger = get_logger()  # get CLI logger which has the level set through command lines
         is_verbose = any(handler.level <= logs.INFO for handler in cli_logger.handlers)
+        deployment_progress = None
 
         while not poller.done():
-            self.cli_ctx.get_progress_controller().add(message='Running')
+            self.cli_ctx.get_progress_controller().add(message=getattr(poller, 'progress_message', 'Running'))
             try:
                 # pylint: disable=protected-access
                 correlation_id = json.loads(
@@ -584,20 +564,27 @@ class LongRunningOperation(object):  # pylint: disable=too-few-public-methods
             except:  # pylint: disable=bare-except
                 pass
 
-            current_time = datetime.datetime.now()
-            if is_verbose and current_time - self.last_progress_report >= datetime.timedelta(seconds=10):
-                self.last_progress_report = current_time
-                try:
-                    self._generate_template_progress(correlation_id)
-                except Exception as ex:  # pylint: disable=broad-except
-                    logger.warning('%s during progress reporting: %s', getattr(type(ex), '__name__', type(ex)), ex)
             try:
-                self._delay()
+                if correlation_id is not None and deployment_progress is None:
+                    deployment_progress = get_deployment_progress(self.cli_ctx, poller, is_verbose) or False
+                if deployment_progress:
+                    deployment_progress.poll()
+            except Exception as ex:  # pylint: disable=broad-except
+                logger.warning('%s during progress reporting: %s', getattr(type(ex), '__name__', type(ex)), ex)
+                deployment_progress = False
+            try:
+                self._delay(poller)
             except KeyboardInterrupt:
                 self.cli_ctx.get_progress_controller().stop()
                 logger.error('Long-running operation wait cancelled.  %s', correlation_message)
                 raise
 
+        if deployment_progress:
+            try:
+                deployment_progress.finish()
+            except Exception as ex:  # pylint: disable=broad-except
+                logger.warning('%s during progress reporting: %s', getattr(type(ex), '__name__', type(ex)), ex)
+
         try:
             result = poller.result()
         except ClientException as client_exception:
@@ -721,6 +708,9 @@ def _is_poller(obj):
     # Since loading msrest is expensive, we avoid it until we have to
     if obj.__class__.__name__ in ['AzureOperationPoller', 'LROPoller']:
         return isinstance(obj, poller_classes())
+    if obj.__class__.__name__ == 'WaitPoller':
+        from azure.cli.core.commands.wait_poller import WaitPoller
+        return isinstance(obj, WaitPoller)
     return False
 
 
@@ -601,7 +601,7 @@ def _cli_wait_command(context, name, getter_op, custom_command=False, **kwargs):
         )
         cmd_args['interval'] = CLICommandArgument(
             'interval', options_list=['--interval'], default=30, arg_group=group_name, type=int,
-            help='polling interval in seconds'
+            help='maximum polling interval in seconds, the interval starts shorter and doubles up to it'
         )
         cmd_args['deleted'] = CLICommandArgument(
             'deleted', options_list=['--deleted'], action='store_true', arg_group=group_name,
@@ -625,6 +625,10 @@ def _cli_wait_command(context, name, getter_op, custom_command=False, **kwargs):
                  "provisioningState!='InProgress', "
                  "instanceView.statuses[?code=='PowerState/running']"
         )
+        cmd_args['any'] = CLICommandArgument(
+            'any', options_list=['--any'], action='store_true', arg_group=group_name,
+            help='with multiple --ids, stop waiting as soon as any of the resources satisfies the condition'
+        )
         return [(k, v) for k, v in cmd_args.items()]
 
     def get_provisioning_state(instance):
@@ -639,7 +643,7 @@ def _cli_wait_command(context, name, getter_op, custom_command=False, **kwargs):
     def handler(args):
         from azure.cli.core.commands.client_factory import resolve_client_arg_name
         from msrest.exceptions import ClientException
-        import time
+        from azure.cli.core.commands.wait_poller import WaitPoller, get_wait_group
 
         context_copy = copy.copy(context)
         getter_args = dict(extract_args_from_signature(context.get_op_handler(
@@ -664,46 +668,37 @@ def _cli_wait_command(context, name, getter_op, custom_command=False, **kwargs):
         wait_for_updated = args.pop('updated')
         wait_for_exists = args.pop('exists')
         custom_condition = args.pop('custom')
+        wait_for_any = args.pop('any')
         if not any([wait_for_created, wait_for_updated, wait_for_deleted,
                     wait_for_exists, custom_condition]):
             raise CLIError(
                 "incorrect usage: --created | --updated | --deleted | --exists | --custom JMESPATH")
 
-        progress_indicator = context_copy.cli_ctx.get_progress_controller()
-        progress_indicator.begin()
-        for _ in range(0, timeout, interval):
-            try:
-                progress_indicator.add(message='Waiting')
-                instance = getter(**args)
-                if wait_for_exists:
-                    progress_indicator.end()
-                    return None
-                provisioning_state = get_provisioning_state(instance)
-                # until we have any needs to wait for 'Failed', let us bail out on this
-                if provisioning_state == 'Failed':
-                    progress_indicator.stop()
-                    raise CLIError('The operation failed')
-                if ((wait_for_created or wait_for_updated) and provisioning_state == 'Succeeded') or \
-                        custom_condition and bool(verify_property(instance, custom_condition)):
-                    progress_indicator.end()
-                    return None
-            except ClientException as ex:
-                progress_indicator.stop()
+        custom_query = _compile_jmespath(custom_condition) if custom_condition else None
+
+        def check(instance, ex):
+            if ex is not None:
+                if not isinstance(ex, ClientException):
+                    raise ex
                 if getattr(ex, 'status_code', None) == 404:
                     if wait_for_deleted:
-                        return None
+                        return True
                     if not any([wait_for_created, wait_for_exists, custom_condition]):
-                        raise
-                else:
-                    raise
-            except Exception:  # pylint: disable=broad-except
-                progress_indicator.stop()
-                raise
-
-            time.sleep(interval)
-
-        progress_indicator.end()
-        return CLIError('Wait operation timed-out after {} seconds'.format(timeout))
+                        raise CLIError(str(ex))
+                    return False
+                raise CLIError(str(ex))
+            if wait_for_exists:
+                return True
+            provisioning_state = get_provisioning_state(instance)
+            # until we have any needs to wait for 'Failed', let us bail out on this
+            if provisioning_state == 'Failed':
+                raise CLIError('The operation failed')
+            return bool((wait_for_created or wait_for_updated) and provisioning_state == 'Succeeded') or \
+                bool(custom_query and custom_query.search(todict(instance)))
+
+        # with multiple --ids, the jobs of the invocation share the client request id
+        group = get_wait_group(cmd.cli_ctx.data['headers'].get('x-ms-client-request-id')) if wait_for_any else None
+        return WaitPoller(lambda: getter(**args), check, timeout, interval, group=group)
 
     context._cli_command(name, handler=handler, argument_loader=generic_wait_arguments_loader, **kwargs)  # pylint: disable=protected-access
 
@@ -758,10 +753,19 @@ def show_exception_handler(ex):
     raise ex
 
 
-def verify_property(instance, condition):
+_compiled_jmespath = {}
+
+
+def _compile_jmespath(expression):
     from jmespath import compile as compile_jmespath
+    if expression not in _compiled_jmespath:
+        _compiled_jmespath[expression] = compile_jmespath(expression)
+    return _compiled_jmespath[expression]
+
+
+def verify_property(instance, condition):
     result = todict(instance)
-    jmes_query = compile_jmespath(condition)
+    jmes_query = _compile_jmespath(condition)
     value = jmes_query.search(result)
     return value
 
@@ -0,0 +1,129 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+"""
+Cache of the values offered by the tab completers which list resources from ARM.
+
+Values are cached per subscription under the config directory, keyed by the completion source and its
+arguments. Fresh values (younger than `core.completion_cache_ttl` seconds) are returned as is. Stale values
+are returned too, while a detached process lists them again, so TAB doesn't wait on ARM; values older than
+COMPLETION_CACHE_MAX_AGE are listed again before returning. Setting the TTL to 0 disables the cache.
+"""
+
+import json
+import os
+import sys
+import time
+
+from knack.log import get_logger
+
+logger = get_logger(__name__)
+
+COMPLETION_CACHE_DIR_NAME = 'completionCache'
+COMPLETION_CACHE_TTL = 5 * 60  # in seconds
+COMPLETION_CACHE_MAX_AGE = 7 * 24 * 60 * 60
+
+
+def _list_locations(cli_ctx):
+    from azure.cli.core.commands.location_catalog import get_location_catalog
+    return get_location_catalog(cli_ctx).names
+
+
+def _list_resource_groups(cli_ctx):
+    from azure.cli.core.commands.parameters import get_resource_groups
+    return [r.name for r in get_resource_groups(cli_ctx)]
+
+
+def _list_resource_names(cli_ctx, resource_group_name=None, resource_type=None):
+    from azure.cli.core.commands.parameters import get_resources_in_resource_group, get_resources_in_subscription
+    if resource_group_name:
+        return [r.name for r in get_resources_in_resource_group(cli_ctx, resource_group_name, resource_type)]
+    return [r.name for r in get_resources_in_subscription(cli_ctx, resource_type)]
+
+
+_COMPLETION_SOURCES = {
+    'locations': _list_locations,
+    'resourceGroups': _list_resource_groups,
+    'resourceNames': _list_resource_names
+}
+
+
+def _load_cache(subscription_id):
+    from knack.util import ensure_dir
+    from azure.cli.core._environment import get_config_dir
+    from azure.cli.core._session import Session
+
+    cache_dir = os.path.join(get_config_dir(), COMPLETION_CACHE_DIR_NAME)
+    ensure_dir(cache_dir)
+    cache = Session()
+    cache.load(os.path.join(cache_dir, '{}.json'.format(subscription_id)))
+    return cache
+
+
+def _get_cache_key(source, kwargs):
+    # resource group names and resource types are case insensitive
+    return json.dumps([source, {k: v.lower() for k, v in kwargs.items()}], sort_keys=True)
+
+
+def _refresh(cli_ctx, cache, key, source, kwargs):
+    values = _COMPLETION_SOURCES[source](cli_ctx, **kwargs)
+    try:
+        cache[key] = {'time': time.time(), 'values': values}
+    except (OSError, IOError) as ex:
+        logger.debug("Failed to save completion cache: %s", ex)
+    return values
+
+
+def _start_background_refresh(subscription_id, source, kwargs):
+    import subprocess
+
+    args = [sys.executable, '-m', __name__, subscription_id, source, json.dumps(kwargs)]
+    popen_kwargs = {'args': args}
+    with open(os.devnull, 'w') as devnull:
+        popen_kwargs.update(stdin=devnull, stdout=devnull, stderr=devnull)
+        if os.name == 'nt':
+            popen_kwargs['creationflags'] = 0x00000008  # DETACHED_PROCESS
+        subprocess.Popen(**popen_kwargs)
+
+
+def get_cached_completions(cli_ctx, source, **kwargs):
+    """ Returns the completion values of the source, from the cache when possible. """
+    ttl = cli_ctx.config.getint('core', 'completion_cache_ttl', fallback=COMPLETION_CACHE_TTL)
+    if ttl <= 0:
+        return _COMPLETION_SOURCES[source](cli_ctx, **kwargs)
+
+    from azure.cli.core.commands.client_factory import get_subscription_id
+    subscription_id = get_subscription_id(cli_ctx)
+    kwargs = {k: v for k, v in kwargs.items() if v}
+    cache = _load_cache(subscription_id)
+    key = _get_cache_key(source, kwargs)
+    entry = cache.get(key)
+    now = time.time()
+    if entry and entry['time'] + max(ttl, COMPLETION_CACHE_MAX_AGE) > now:
+        # start at most one refresh per ttl, TAB is often pressed several times in a row
+        if entry['time'] + ttl <= now and entry.get('refreshStarted', 0) + ttl <= now:
+            try:
+                entry['refreshStarted'] = now
+                cache.save()
+                _start_background_refresh(subscription_id, source, kwargs)
+            except (OSError, IOError) as ex:
+                logger.debug("Failed to start completion cache refresh: %s", ex)
+        return entry['values']
+    return _refresh(cli_ctx, cache, key, source, kwargs)
+
+
+def main():
+    subscription_id, source, kwargs = sys.argv[1], sys.argv[2], json.loads(sys.argv[3])
+
+    from azure.cli.core import get_default_cli
+    cli_ctx = get_default_cli()
+    cli_ctx.data['subscription_id'] = subscription_id
+    cli_ctx.data['completer_active'] = True
+    cache = _load_cache(subscription_id)
+    _refresh(cli_ctx, cache, _get_cache_key(source, kwargs), source, kwargs)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,169 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import json
+import re
+import sys
+import time
+
+from knack.log import get_logger
+
+logger = get_logger(__name__)
+
+PROGRESS_FORMAT_JSON = 'json'
+PROGRESS_FORMAT_LOG = 'log'
+PROGRESS_FORMAT_TABLE = 'table'
+
+MIN_POLL_INTERVAL = 2  # in seconds
+MAX_POLL_INTERVAL = 16
+MAX_TABLE_ROWS = 20
+
+_DEPLOYMENT_URL_REGEX = re.compile(
+    r'/subscriptions/[^/]+(/resourcegroups/(?P<resource_group>[^/]+))?'
+    r'/providers/microsoft\.resources/deployments/(?P<deployment_name>[^/?]+)', re.IGNORECASE)
+_TERMINAL_STATES = ['succeeded', 'failed', 'canceled']
+
+
+def get_deployment_target(url):
+    """ Returns the (resource group or None, deployment name) of a deployment request url, None for other urls. """
+    match = _DEPLOYMENT_URL_REGEX.search(url or '')
+    if not match:
+        return None
+    return match.group('resource_group'), match.group('deployment_name')
+
+
+class DeploymentProgress(object):  # pylint: disable=too-many-instance-attributes
+    """
+    Follows the operations of a template deployment while it runs.
+
+    Every poll lists the deployment operations and reports the ones whose state changed since the previous
+    poll, as log lines, as a live table or as JSON lines. The interval between polls is reset when something
+    changed and doubles, up to MAX_POLL_INTERVAL, while nothing does.
+    """
+
+    def __init__(self, operations_client, deployment_name, resource_group_name=None,
+                 progress_format=PROGRESS_FORMAT_LOG, out=None):
+        self.operations_client = operations_client
+        self.deployment_name = deployment_name
+        self.resource_group_name = resource_group_name
+        self.progress_format = progress_format
+        self.out = out or sys.stderr
+        self.operations = {}
+        self.interval = MIN_POLL_INTERVAL
+        self._next_poll = 0
+        self._rendered_lines = 0
+
+    def poll(self, force=False):
+        """ Lists the deployment operations if the poll interval elapsed and reports the changed ones. """
+        now = time.time()
+        if not force and now < self._next_poll:
+            return []
+        changes = self._detect_changes(self._list_operations())
+        self.interval = MIN_POLL_INTERVAL if changes else min(self.interval * 2, MAX_POLL_INTERVAL)
+        self._next_poll = now + self.interval
+        if changes:
+            self._report(changes)
+        return changes
+
+    def finish(self):
+        """ Reports the final state of the operations once the deployment is over. """
+        self.poll(force=True)
+        if self.progress_format == PROGRESS_FORMAT_TABLE and self._rendered_lines:
+            self.out.write('\n')
+            self.out.flush()
+
+    def _list_operations(self):
+        if self.resource_group_name:
+            return self.operations_client.list(self.resource_group_name, self.deployment_name)
+        return self.operations_client.list_at_subscription_scope(self.deployment_name)
+
+    def _detect_changes(self, operations):
+        changes = []
+        for operation in operations:
+            properties = operation.properties
+            if properties is None:
+                continue
+            target = properties.target_resource
+            state = {
+                'operationId': operation.operation_id,
+                'resourceType': target.resource_type if target else None,
+                'resourceName': target.resource_name if target else None,
+                'provisioningState': properties.provisioning_state,
+                'statusCode': properties.status_code,
+                'timestamp': properties.timestamp.isoformat() if properties.timestamp else None
+            }
+            if properties.provisioning_state and properties.provisioning_state.lower() == 'failed':
+                state['statusMessage'] = properties.status_message
+            previous = self.operations.get(operation.operation_id)
+            if previous is None or (previous['provisioningState'], previous['statusCode']) != \
+                    (state['provisioningState'], state['statusCode']):
+                self.operations[operation.operation_id] = state
+                changes.append(state)
+        return changes
+
+    def _report(self, changes):
+        if self.progress_format == PROGRESS_FORMAT_JSON:
+            for state in changes:
+                event = dict(state, deployment=self.deployment_name)
+                self.out.write(json.dumps(event, default=str) + '\n')
+            self.out.flush()
+        elif self.progress_format == PROGRESS_FORMAT_TABLE:
+            self._render_table()
+        else:
+            for state in changes:
+                logger.info('%s: %s (%s)', state['provisioningState'], state['resourceName'], state['resourceType'])
+
+    def _render_table(self):
+        from colorama import Cursor
+        from colorama.ansi import clear_line
+
+        states = sorted(self.operations.values(), key=lambda s: s['timestamp'] or '')
+        counts = {}
+        for state in states:
+            key = (state['provisioningState'] or 'Unknown')
+            counts[key] = counts.get(key, 0) + 1
+        # keep the unfinished operations in view when there are more than fit the table
+        unfinished = [s for s in states if (s['provisioningState'] or '').lower() not in _TERMINAL_STATES]
+        finished = [s for s in states if s not in unfinished]
+        rows = (finished + unfinished)[-MAX_TABLE_ROWS:] if len(states) > MAX_TABLE_ROWS else states
+
+        row_format = '{:<12} {:<6} {:<50} {}'
+        summary = ', '.join('{} {}'.format(count, state) for state, count in sorted(counts.items()))
+        lines = ['Deployment {}: {}'.format(self.deployment_name, summary),
+                 row_format.format('State', 'Code', 'Type', 'Name')]
+        lines.extend(row_format.format(s['provisioningState'] or '', s['statusCode'] or '',
+                                       s['resourceType'] or '', s['resourceName'] or '') for s in rows)
+
+        output = '\r' + clear_line()
+        if self._rendered_lines:
+            output += Cursor.UP(self._rendered_lines)
+        output += ''.join(clear_line() + line + '\n' for line in lines)
+        self.out.write(output)
+        self.out.flush()
+        self._rendered_lines = len(lines)
+
+
+def get_deployment_progress(cli_ctx, poller, is_verbose):
+    """ Returns a DeploymentProgress for the poller if it tracks a template deployment and progress is enabled. """
+    progress_format = cli_ctx.config.get('core', 'deployment_progress', None)
+    if progress_format not in [PROGRESS_FORMAT_JSON, PROGRESS_FORMAT_LOG, PROGRESS_FORMAT_TABLE]:
+        if not is_verbose:
+            return None
+        progress_format = PROGRESS_FORMAT_TABLE if sys.stderr.isatty() else PROGRESS_FORMAT_LOG
+
+    try:
+        url = poller._response.request.url  # pylint: disable=protected-access
+    except AttributeError:
+        return None
+    target = get_deployment_target(url)
+    if not target:
+        return None
+
+    from azure.cli.core.commands.client_factory import get_mgmt_service_client
+    from azure.cli.core.profiles import ResourceType
+    client = get_mgmt_service_client(cli_ctx, ResourceType.MGMT_RESOURCE_RESOURCES)
+    resource_group_name, deployment_name = target
+    return DeploymentProgress(client.deployment_operations, deployment_name, resource_group_name,
+                              progress_format=progress_format)
@@ -0,0 +1,99 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import os
+import threading
+import time
+
+from knack.log import get_logger
+
+logger = get_logger(__name__)
+
+LOCATION_CATALOG_DIR_NAME = 'locationCatalog'
+LOCATION_CATALOG_TTL = 24 * 60 * 60  # in seconds
+
+_location_catalogs = {}
+_location_catalogs_lock = threading.Lock()
+
+
+class LocationCatalog(object):
+    """
+    The locations of a subscription, with lookups of the location name by name or display name.
+
+    The locations are listed once and, when a filename is given, persisted as JSON so later invocations
+    can skip listing them until they are older than `ttl` seconds.
+    """
+
+    def __init__(self, list_func, filename=None, ttl=LOCATION_CATALOG_TTL):
+        from azure.cli.core._session import Session
+
+        self.ttl = ttl
+        self._list_func = list_func
+        self._lock = threading.Lock()
+        self._session = Session()
+        if filename:
+            from knack.util import ensure_dir
+            ensure_dir(os.path.dirname(filename))
+            self._session.load(filename)
+        self._by_name = None
+        self._by_display_name = None
+        self._listed = False
+        self._load(force=False)
+
+    @property
+    def names(self):
+        """ The location names, in the order the service lists them. """
+        return list(self._session.get('names', []))
+
+    def get_name(self, name_or_display_name):
+        """
+        Returns the location name of a location name or display name, case insensitively, or None if the
+        subscription has no such location. A catalog loaded from disk is listed again for an unknown location,
+        as it could have been added since.
+        """
+        key = name_or_display_name.lower()
+        with self._lock:
+            name = self._by_name.get(key) or self._by_display_name.get(key)
+            if name is None and not self._listed:
+                self._load(force=True)
+                name = self._by_name.get(key) or self._by_display_name.get(key)
+            return name
+
+    def _load(self, force):
+        if force or not self._session.get('names') or self._session.get('time', 0) + self.ttl <= time.time():
+            logger.debug("Listing the subscription locations")
+            locations = self._list_func()
+            self._session.data.update({
+                'time': time.time(),
+                'names': [l.name for l in locations],
+                'displayNames': [l.display_name for l in locations]
+            })
+            self._listed = True
+            try:
+                self._session.save()
+            except (OSError, IOError) as ex:
+                logger.debug("Failed to save location catalog: %s", ex)
+        names, display_names = self._session.data['names'], self._session.data['displayNames']
+        self._by_name = {n.lower(): n for n in names}
+        self._by_display_name = {d.lower(): n for n, d in zip(names, display_names) if d}
+
+
+def get_location_catalog(cli_ctx):
+    """ Returns the location catalog of the current cloud and subscription. """
+    from six import string_types
+    from azure.cli.core._environment import get_config_dir
+    from azure.cli.core.commands.client_factory import get_subscription_id
+    from azure.cli.core.commands.parameters import get_subscription_locations
+
+    subscription_id = get_subscription_id(cli_ctx)
+    key = (cli_ctx.cloud.name, subscription_id)
+    with _location_catalogs_lock:
+        if key not in _location_catalogs:
+            filename = None
+            if isinstance(subscription_id, string_types):
+                filename = os.path.join(get_config_dir(), LOCATION_CATALOG_DIR_NAME, cli_ctx.cloud.name,
+                                        '{}.json'.format(subscription_id))
+            _location_catalogs[key] = LocationCatalog(lambda: get_subscription_locations(cli_ctx), filename)
+        return _location_catalogs[key]
@@ -0,0 +1,99 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import threading
+import time
+
+from knack.log import get_logger
+
+logger = get_logger(__name__)
+
+PROGRESS_INTERVAL = 1  # in seconds
+
+
+def wait_for_poller(poller, timeout):
+    """
+    Waits up to `timeout` seconds for the poller to complete, returning as soon as it does. The poller polls
+    the service on its own thread, at the interval the service asks for with Retry-After.
+    """
+    done_event = getattr(poller, '_done', None)
+    if done_event is not None:
+        done_event.wait(timeout)
+    elif not poller.done():
+        time.sleep(timeout)
+
+
+class LongRunningOperationScheduler(object):
+    """
+    Waits on the pollers of many long-running operations at once.
+
+    Rather than every operation being waited on in its own loop, the scheduler is woken up by the pollers as
+    they complete and reports how many operations are done through the progress controller. Pollers can be
+    added from several threads while the operations are being started.
+    """
+
+    def __init__(self, cli_ctx, message=None):
+        self.cli_ctx = cli_ctx
+        self.message = message
+        self._pollers = []
+        self._completed = set()
+        self._lock = threading.Lock()
+        self._changed = threading.Event()
+
+    def add(self, poller):
+        """ Adds the poller of a started operation and returns its index. """
+        with self._lock:
+            index = len(self._pollers)
+            self._pollers.append(poller)
+
+        def _on_done(*_):
+            with self._lock:
+                self._completed.add(index)
+            self._changed.set()
+
+        try:
+            poller.add_done_callback(_on_done)
+        except ValueError:  # AzureOperationPoller refuses callbacks once it is done
+            _on_done()
+        return index
+
+    @property
+    def pending_count(self):
+        with self._lock:
+            return len(self._pollers) - len(self._completed)
+
+    def wait(self):
+        """ Waits until all the added operations are complete. """
+        with self._lock:
+            total = len(self._pollers)
+        if not total:
+            return
+        # the operations of one invocation are of the same command, e.g. 'Waiting' for the waits
+        message = self.message or getattr(self._pollers[0], 'progress_message', 'Running')
+        controller = self.cli_ctx.get_progress_controller(det=True)
+        controller.begin()
+        try:
+            while True:
+                self._changed.clear()
+                done = total - self.pending_count
+                controller.add(message='{} ({} of {} done)'.format(message, done, total),
+                               value=done, total_val=total)
+                if done == total:
+                    break
+                self._changed.wait(PROGRESS_INTERVAL)
+        except KeyboardInterrupt:
+            controller.stop()
+            logger.error('Long-running operation wait cancelled. %s operations still running.', self.pending_count)
+            raise
+        controller.end()
+
+    def result(self, index):
+        """ Returns the result of the operation, waiting for it if needed. """
+        from msrest.exceptions import ClientException
+        from azure.cli.core.commands.arm import handle_long_running_operation_exception
+        try:
+            return self._pollers[index].result()
+        except ClientException as client_exception:
+            handle_long_running_operation_exception(client_exception)
@@ -29,8 +29,8 @@ def get_subscription_locations(cli_ctx):
 
 @Completer
 def get_location_completion_list(cmd, prefix, namespace, **kwargs):  # pylint: disable=unused-argument
-    result = get_subscription_locations(cmd.cli_ctx)
-    return [l.name for l in result]
+    from azure.cli.core.commands.completion_cache import get_cached_completions
+    return get_cached_completions(cmd.cli_ctx, 'locations')
 
 
 # pylint: disable=redefined-builtin
@@ -94,16 +94,17 @@ def get_location_name_type(cli_ctx):
     def location_name_type(name):
         if ' ' in name:
             # if display name is provided, attempt to convert to short form name
-            name = next((l.name for l in get_subscription_locations(cli_ctx)
-                         if l.display_name.lower() == name.lower()), name)
+            from azure.cli.core.commands.location_catalog import get_location_catalog
+            name = get_location_catalog(cli_ctx).get_name(name) or name
         return name
     return location_name_type
 
 
 def get_one_of_subscription_locations(cli_ctx):
-    result = get_subscription_locations(cli_ctx)
+    from azure.cli.core.commands.location_catalog import get_location_catalog
+    result = get_location_catalog(cli_ctx).names
     if result:
-        return next((r.name for r in result if r.name.lower() == 'westus'), result[0].name)
+        return next((r for r in result if r.lower() == 'westus'), result[0])
     raise CLIError('Current subscription does not have valid location list')
 
 
@@ -115,8 +116,8 @@ def get_resource_groups(cli_ctx):
 
 @Completer
 def get_resource_group_completion_list(cmd, prefix, namespace, **kwargs):  # pylint: disable=unused-argument
-    result = get_resource_groups(cmd.cli_ctx)
-    return [l.name for l in result]
+    from azure.cli.core.commands.completion_cache import get_cached_completions
+    return get_cached_completions(cmd.cli_ctx, 'resourceGroups')
 
 
 def get_resources_in_resource_group(cli_ctx, resource_group_name, resource_type=None):
@@ -141,10 +142,10 @@ def get_resource_name_completion_list(resource_type=None):
 
     @Completer
     def completer(cmd, prefix, namespace, **kwargs):  # pylint: disable=unused-argument
-        rg = getattr(namespace, 'resource_group_name', None)
-        if rg:
-            return [r.name for r in get_resources_in_resource_group(cmd.cli_ctx, rg, resource_type=resource_type)]
-        return [r.name for r in get_resources_in_subscription(cmd.cli_ctx, resource_type)]
+        from azure.cli.core.commands.completion_cache import get_cached_completions
+        return get_cached_completions(cmd.cli_ctx, 'resourceNames',
+                                      resource_group_name=getattr(namespace, 'resource_group_name', None),
+                                      resource_type=resource_type)
 
     return completer
 
@@ -0,0 +1,125 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import threading
+import time
+
+from knack.log import get_logger
+from knack.util import CLIError
+
+logger = get_logger(__name__)
+
+MIN_WAIT_INTERVAL = 5  # in seconds
+
+_wait_groups = {}
+_wait_groups_lock = threading.Lock()
+
+
+def get_wait_group(key):
+    """
+    Returns the event shared by the wait jobs of one invocation, e.g. the jobs of multiple --ids, which
+    is set once any of them is satisfied.
+    """
+    with _wait_groups_lock:
+        return _wait_groups.setdefault(key, threading.Event())
+
+
+def release_wait_group(key):
+    """ Forgets the wait group of an invocation once all its jobs are done. """
+    with _wait_groups_lock:
+        _wait_groups.pop(key, None)
+
+
+class WaitPoller(object):
+    """
+    Waits on its own thread until a resource satisfies a wait condition, exposing the interface of the
+    SDK pollers so the wait is handled like any long-running operation, and the waits of multiple --ids
+    are waited on together.
+
+    The resource is first fetched right away, then after MIN_WAIT_INTERVAL seconds, and the delay doubles
+    up to `interval` seconds. With a group, the wait also ends as soon as another wait of the group is
+    satisfied.
+    """
+
+    # shown by the progress of the long-running operations
+    progress_message = 'Waiting'
+
+    def __init__(self, getter, check, timeout, interval, group=None):
+        """
+        :param getter: callable returning the resource
+        :param check: callable returning whether the resource satisfies the condition, which is called
+         with the resource, or with None and the exception if the getter failed and then either raises
+         or returns
+        """
+        self._getter = getter
+        self._check = check
+        self._timeout = timeout
+        self._interval = interval
+        self._group = group
+        self._result = None
+        self._exception = None
+        self._callbacks = []
+        self._callbacks_lock = threading.Lock()
+        self._done = threading.Event()
+        self._thread = threading.Thread(target=self._start, name='WaitPoller')
+        self._thread.daemon = True
+        self._thread.start()
+
+    def _poll(self):
+        deadline = time.time() + self._timeout
+        delay = min(MIN_WAIT_INTERVAL, self._interval)
+        while True:
+            if self._group is not None and self._group.is_set():
+                return None
+            try:
+                instance = self._getter()
+                satisfied = self._check(instance, None)
+            except Exception as ex:  # pylint: disable=broad-except
+                satisfied = self._check(None, ex)
+            if satisfied:
+                if self._group is not None:
+                    self._group.set()
+                return None
+
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                return CLIError('Wait operation timed-out after {} seconds'.format(self._timeout))
+            delay_event = self._group if self._group is not None else threading.Event()
+            delay_event.wait(min(delay, remaining))
+            delay = min(delay * 2, self._interval)
+
+    def _start(self):
+        try:
+            self._result = self._poll()
+        except Exception as ex:  # pylint: disable=broad-except
+            self._exception = ex
+        finally:
+            self._done.set()
+        with self._callbacks_lock:
+            callbacks, self._callbacks = self._callbacks, None
+        for callback in callbacks:
+            callback(self)
+
+    def status(self):
+        return 'Succeeded' if self._done.is_set() else 'InProgress'
+
+    def done(self):
+        return self._done.is_set()
+
+    def wait(self, timeout=None):
+        self._done.wait(timeout)
+
+    def result(self, timeout=None):
+        self._done.wait(timeout)
+        if self._exception is not None:
+            raise self._exception  # pylint: disable=raising-bad-type
+        return self._result
+
+    def add_done_callback(self, func):
+        with self._callbacks_lock:
+            if self._callbacks is not None:
+                self._callbacks.append(func)
+                return
+        func(self)
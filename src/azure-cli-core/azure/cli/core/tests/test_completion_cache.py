@@ -0,0 +1,69 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+import mock
+
+from azure.cli.core.commands import completion_cache
+from azure.cli.core.commands.completion_cache import get_cached_completions, COMPLETION_CACHE_TTL
+from azure.cli.core.mock import DummyCli
+
+
+class TestCompletionCache(unittest.TestCase):
+
+    def setUp(self):
+        self.config_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.config_dir)
+        patcher = mock.patch.dict(os.environ, {'AZURE_CONFIG_DIR': self.config_dir})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.cli_ctx = DummyCli()
+        self.cli_ctx.data['subscription_id'] = '00000000-0000-0000-0000-000000000000'
+        self.source = mock.MagicMock(return_value=['rg1', 'rg2'])
+        patcher = mock.patch.dict(completion_cache._COMPLETION_SOURCES,
+                                  {'resourceGroups': self.source, 'resourceNames': self.source})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_completion_cache_returns_fresh_values(self):
+        self.assertEqual(get_cached_completions(self.cli_ctx, 'resourceGroups'), ['rg1', 'rg2'])
+        self.assertEqual(get_cached_completions(self.cli_ctx, 'resourceGroups'), ['rg1', 'rg2'])
+        self.assertEqual(self.source.call_count, 1)
+
+        # the arguments are part of the key, case insensitively
+        get_cached_completions(self.cli_ctx, 'resourceNames', resource_group_name='RG1')
+        get_cached_completions(self.cli_ctx, 'resourceNames', resource_group_name='rg1', resource_type=None)
+        self.assertEqual(self.source.call_count, 2)
+        self.source.assert_called_with(self.cli_ctx, resource_group_name='RG1')
+
+    @mock.patch('azure.cli.core.commands.completion_cache._start_background_refresh', autospec=True)
+    def test_completion_cache_refreshes_stale_values_in_background(self, refresh_mock):
+        get_cached_completions(self.cli_ctx, 'resourceGroups')
+        self.source.return_value = ['rg3']
+
+        with mock.patch('time.time', return_value=time.time() + COMPLETION_CACHE_TTL + 1):
+            self.assertEqual(get_cached_completions(self.cli_ctx, 'resourceGroups'), ['rg1', 'rg2'])
+            self.assertEqual(get_cached_completions(self.cli_ctx, 'resourceGroups'), ['rg1', 'rg2'])
+        refresh_mock.assert_called_once_with('00000000-0000-0000-0000-000000000000', 'resourceGroups', {})
+        self.assertEqual(self.source.call_count, 1)
+
+        with mock.patch('time.time', return_value=time.time() + completion_cache.COMPLETION_CACHE_MAX_AGE + 1):
+            self.assertEqual(get_cached_completions(self.cli_ctx, 'resourceGroups'), ['rg3'])
+
+    def test_completion_cache_disabled(self):
+        with mock.patch.object(self.cli_ctx.config, 'getint', return_value=0):
+            get_cached_completions(self.cli_ctx, 'resourceGroups')
+            get_cached_completions(self.cli_ctx, 'resourceGroups')
+        self.assertEqual(self.source.call_count, 2)
+        self.assertFalse(os.path.exists(os.path.join(self.config_dir, 'completionCache')))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+import datetime
+import json
+import unittest
+
+import mock
+from six import StringIO
+
+from azure.cli.core.commands.deployment_progress import (
+    DeploymentProgress, get_deployment_target, PROGRESS_FORMAT_JSON, PROGRESS_FORMAT_TABLE,
+    MIN_POLL_INTERVAL, MAX_POLL_INTERVAL)
+
+
+def _operation(operation_id, name, state, status_code=None):
+    operation = mock.MagicMock()
+    operation.operation_id = operation_id
+    operation.properties.provisioning_state = state
+    operation.properties.status_code = status_code
+    operation.properties.timestamp = datetime.datetime(2019, 1, 1, 0, 0, int(operation_id))
+    operation.properties.target_resource.resource_type = 'Microsoft.Network/virtualNetworks'
+    operation.properties.target_resource.resource_name = name
+    return operation
+
+
+class TestDeploymentProgress(unittest.TestCase):
+
+    def test_get_deployment_target(self):
+        self.assertEqual(get_deployment_target(
+            'https://management.azure.com/subscriptions/sub/resourcegroups/rg/providers/Microsoft.Resources/'
+            'deployments/dep1?api-version=2018-05-01'), ('rg', 'dep1'))
+        self.assertEqual(get_deployment_target(
+            'https://management.azure.com/subscriptions/sub/providers/Microsoft.Resources/deployments/dep1'),
+            (None, 'dep1'))
+        self.assertIsNone(get_deployment_target(
+            'https://management.azure.com/subscriptions/sub/resourcegroups/rg/providers/Microsoft.Compute/'
+            'virtualMachines/vm1'))
+
+    def test_deployment_progress_json_lines(self):
+        client = mock.MagicMock()
+        out = StringIO()
+        progress = DeploymentProgress(client, 'dep1', 'rg', progress_format=PROGRESS_FORMAT_JSON, out=out)
+
+        client.list.return_value = [_operation('1', 'vnet1', 'Running'), _operation('2', 'vnet2', 'Running')]
+        self.assertEqual(len(progress.poll()), 2)
+        client.list.assert_called_with('rg', 'dep1')
+        self.assertEqual(progress.interval, MIN_POLL_INTERVAL)
+
+        # nothing is due before the interval elapsed
+        self.assertEqual(progress.poll(), [])
+        self.assertEqual(client.list.call_count, 1)
+
+        # only changed operations are reported, and the interval grows while nothing changes
+        self.assertEqual(progress.poll(force=True), [])
+        self.assertEqual(progress.interval, MIN_POLL_INTERVAL * 2)
+        client.list.return_value = [_operation('1', 'vnet1', 'Succeeded', 'OK'), _operation('2', 'vnet2', 'Running')]
+        progress.finish()
+        self.assertEqual(progress.interval, MIN_POLL_INTERVAL)
+
+        events = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual([(e['resourceName'], e['provisioningState']) for e in events],
+                         [('vnet1', 'Running'), ('vnet2', 'Running'), ('vnet1', 'Succeeded')])
+        self.assertEqual(events[-1]['deployment'], 'dep1')
+        self.assertEqual(events[-1]['statusCode'], 'OK')
+
+        for _ in range(10):
+            progress.poll(force=True)
+        self.assertEqual(progress.interval, MAX_POLL_INTERVAL)
+
+    def test_deployment_progress_table(self):
+        client = mock.MagicMock()
+        out = StringIO()
+        progress = DeploymentProgress(client, 'dep1', progress_format=PROGRESS_FORMAT_TABLE, out=out)
+
+        client.list_at_subscription_scope.return_value = [_operation('1', 'vnet1', 'Running')]
+        progress.poll()
+        client.list_at_subscription_scope.assert_called_with('dep1')
+        client.list_at_subscription_scope.return_value = [_operation('1', 'vnet1', 'Failed', 'Conflict'),
+                                                          _operation('2', 'vnet2', 'Succeeded', 'OK')]
+        progress.poll(force=True)
+        self.assertIn('1 Failed, 1 Succeeded', out.getvalue())
+        self.assertIn('vnet2', out.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main()
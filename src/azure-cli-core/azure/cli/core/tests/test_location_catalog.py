@@ -0,0 +1,73 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+import mock
+
+from azure.cli.core.commands import location_catalog
+from azure.cli.core.commands.location_catalog import LocationCatalog, LOCATION_CATALOG_TTL
+from azure.cli.core.commands.parameters import get_location_name_type, get_one_of_subscription_locations
+from azure.cli.core.mock import DummyCli
+
+
+def _location(name, display_name):
+    location = mock.MagicMock(display_name=display_name)
+    location.name = name
+    return location
+
+
+class TestLocationCatalog(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+        self.filename = os.path.join(self.temp_dir, 'AzureCloud', 'sub.json')
+        self.list_func = mock.MagicMock(return_value=[_location('eastus', 'East US'),
+                                                      _location('westus2', 'West US 2')])
+
+    def test_location_catalog_lookups(self):
+        catalog = LocationCatalog(self.list_func, self.filename)
+        self.assertEqual(catalog.names, ['eastus', 'westus2'])
+        self.assertEqual(catalog.get_name('west us 2'), 'westus2')
+        self.assertEqual(catalog.get_name('EastUS'), 'eastus')
+        self.assertIsNone(catalog.get_name('Mars Central'))
+        self.assertEqual(self.list_func.call_count, 1)
+
+    def test_location_catalog_persisted(self):
+        LocationCatalog(self.list_func, self.filename)
+        catalog = LocationCatalog(self.list_func, self.filename)
+        self.assertEqual(catalog.get_name('West US 2'), 'westus2')
+        self.assertEqual(self.list_func.call_count, 1)
+
+        # an unknown location lists the locations again, once
+        self.list_func.return_value.append(_location('newregion', 'New Region'))
+        self.assertEqual(catalog.get_name('New Region'), 'newregion')
+        self.assertIsNone(catalog.get_name('Mars Central'))
+        self.assertEqual(self.list_func.call_count, 2)
+
+        with mock.patch('time.time', return_value=time.time() + LOCATION_CATALOG_TTL + 1):
+            LocationCatalog(self.list_func, self.filename)
+        self.assertEqual(self.list_func.call_count, 3)
+
+    @mock.patch('azure.cli.core.commands.parameters.get_subscription_locations', autospec=True)
+    def test_location_parameters_use_catalog(self, list_mock):
+        list_mock.return_value = [_location('eastus', 'East US'), _location('westus', 'West US')]
+        cli_ctx = DummyCli()
+        cli_ctx.data['subscription_id'] = '00000000-0000-0000-0000-000000000000'
+
+        with mock.patch.dict(location_catalog._location_catalogs, clear=True), \
+                mock.patch.dict(os.environ, {'AZURE_CONFIG_DIR': self.temp_dir}):
+            self.assertEqual(get_location_name_type(cli_ctx)('West US'), 'westus')
+            self.assertEqual(get_location_name_type(cli_ctx)('centralus'), 'centralus')
+            self.assertEqual(get_one_of_subscription_locations(cli_ctx), 'westus')
+        self.assertEqual(list_mock.call_count, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+import threading
+import unittest
+
+import mock
+from knack.util import CLIError
+from msrest.exceptions import ClientException
+from msrest.polling import LROPoller, PollingMethod
+
+from azure.cli.core.commands import LongRunningOperation
+from azure.cli.core.commands.lro_scheduler import LongRunningOperationScheduler
+from azure.cli.core.mock import DummyCli
+
+
+class _TestPolling(PollingMethod):
+
+    def __init__(self, result, release_event, error=None):
+        self._result = result
+        self._release_event = release_event
+        self._error = error
+        self._finished = False
+
+    def initialize(self, client, initial_response, deserialization_callback):
+        pass
+
+    def run(self):
+        self._release_event.wait(10)
+        self._finished = True
+        if self._error:
+            raise self._error
+
+    def status(self):
+        return 'Succeeded' if self._finished else 'InProgress'
+
+    def finished(self):
+        return self._finished
+
+    def resource(self):
+        return self._result
+
+
+def _poller(result, release_event, error=None):
+    return LROPoller(mock.MagicMock(), None, None, _TestPolling(result, release_event, error))
+
+
+class TestLongRunningOperationScheduler(unittest.TestCase):
+
+    def test_scheduler_waits_for_all_operations(self):
+        release_events = [threading.Event() for _ in range(3)]
+        scheduler = LongRunningOperationScheduler(DummyCli())
+        indexes = [scheduler.add(_poller('result{}'.format(i), e)) for i, e in enumerate(release_events)]
+        self.assertEqual(scheduler.pending_count, 3)
+
+        release_events[2].set()
+        for event in release_events[:2]:
+            threading.Timer(0.1, event.set).start()
+        scheduler.wait()
+        self.assertEqual(scheduler.pending_count, 0)
+        self.assertEqual([scheduler.result(i) for i in indexes], ['result0', 'result1', 'result2'])
+
+    def test_scheduler_reports_failed_operation(self):
+        release_event = threading.Event()
+        release_event.set()
+        scheduler = LongRunningOperationScheduler(DummyCli())
+        index = scheduler.add(_poller(None, release_event, ClientException('boom')))
+        scheduler.wait()
+        with self.assertRaisesRegexp(CLIError, 'Deployment failed. boom'):
+            scheduler.result(index)
+
+    def test_scheduler_reports_waits_as_waiting(self):
+        from azure.cli.core.commands.wait_poller import WaitPoller
+        cli = DummyCli()
+        cli.get_progress_controller = mock.MagicMock()
+        scheduler = LongRunningOperationScheduler(cli)
+        scheduler.add(WaitPoller(lambda: None, lambda instance, ex: True, timeout=10, interval=1))
+        scheduler.wait()
+        cli.get_progress_controller.return_value.add.assert_called_with(
+            message='Waiting (1 of 1 done)', value=1, total_val=1)
+
+    @mock.patch('time.sleep', autospec=True)
+    def test_long_running_operation_returns_when_done(self, sleep_mock):
+        release_event = threading.Event()
+        threading.Timer(0.1, release_event.set).start()
+        operation = LongRunningOperation(DummyCli(), poller_done_interval_ms=60000)
+        self.assertEqual(operation(_poller('result', release_event)), 'result')
+        sleep_mock.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+import threading
+import unittest
+
+import mock
+from knack.util import CLIError
+
+from azure.cli.core.commands import _is_poller
+from azure.cli.core.commands.arm import _compile_jmespath
+from azure.cli.core.commands.wait_poller import WaitPoller, get_wait_group, release_wait_group, _wait_groups
+
+
+class TestWaitPoller(unittest.TestCase):
+
+    @mock.patch('azure.cli.core.commands.wait_poller.MIN_WAIT_INTERVAL', 0.01)
+    def test_wait_poller_backs_off_until_satisfied(self):
+        states = iter(['Creating', 'Creating', 'Creating', 'Succeeded'])
+        getter = mock.MagicMock(side_effect=lambda: {'provisioningState': next(states)})
+        query = _compile_jmespath("provisioningState=='Succeeded'")
+
+        poller = WaitPoller(getter, lambda instance, ex: query.search(instance), timeout=10, interval=0.04)
+        self.assertTrue(_is_poller(poller))
+        self.assertIsNone(poller.result(10))
+        self.assertTrue(poller.done())
+        self.assertEqual(getter.call_count, 4)
+
+    def test_wait_poller_timeout_and_errors(self):
+        poller = WaitPoller(lambda: None, lambda instance, ex: False, timeout=0, interval=1)
+        self.assertEqual(str(poller.result(10)), 'Wait operation timed-out after 0 seconds')
+
+        def _check(instance, ex):
+            raise CLIError('The operation failed')
+
+        poller = WaitPoller(lambda: None, _check, timeout=10, interval=1)
+        with self.assertRaisesRegexp(CLIError, 'The operation failed'):
+            poller.result(10)
+
+    def test_wait_poller_group_stops_on_any(self):
+        group = threading.Event()
+        waiting = WaitPoller(lambda: None, lambda instance, ex: False, timeout=60, interval=60, group=group)
+        satisfied = WaitPoller(lambda: None, lambda instance, ex: True, timeout=60, interval=60, group=group)
+        self.assertIsNone(satisfied.result(10))
+        self.assertIsNone(waiting.result(10))
+        self.assertTrue(group.is_set())
+
+    def test_wait_group_released_after_invocation(self):
+        group = get_wait_group('request1')
+        self.assertIs(get_wait_group('request1'), group)
+        self.assertIsNot(get_wait_group('request2'), group)
+        release_wait_group('request1')
+        release_wait_group('request2')
+        self.assertNotIn('request1', _wait_groups)
+        self.assertNotIn('request2', _wait_groups)
+        self.assertIsNot(get_wait_group('request1'), group)
+        release_wait_group('request1')
+
+    def test_compile_jmespath_once(self):
+        self.assertIs(_compile_jmespath('a.b'), _compile_jmespath('a.b'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -7,6 +7,8 @@ import tarfile
 import os
 import re
 import codecs
+import zlib
+from collections import deque
 from io import open
 import requests
 from knack.log import get_logger
@@ -18,6 +20,12 @@ from ._constants import TASK_VALID_VSTS_URLS
 
 logger = get_logger(__name__)
 
+# The archive is compressed in chunks on a thread pool, each chunk as a separate gzip member
+ARCHIVE_CHUNK_SIZE = 1024 * 1024
+ARCHIVE_COMPRESSION_LEVEL = 6
+ARCHIVE_MAX_WORKERS = 4
+UPLOAD_BLOCK_SIZE = 4 * 1024 * 1024
+
 
 def upload_source_code(client,
                        registry_name,
@@ -26,20 +34,11 @@ def upload_source_code(client,
                        tar_file_path,
                        docker_file_path,
                        docker_file_in_tar):
-    _pack_source_code(source_location,
-                      tar_file_path,
-                      docker_file_path,
-                      docker_file_in_tar)
-
-    size = os.path.getsize(tar_file_path)
-    unit = 'GiB'
-    for S in ['Bytes', 'KiB', 'MiB', 'GiB']:
-        if size < 1024:
-            unit = S
-            break
-        size = size / 1024.0
+    """Pack the source code and upload it to the registry. If tar_file_path is empty, the archive is
+    uploaded as blocks while it is being produced instead of being written to tar_file_path first.
+    """
+    from concurrent.futures import ThreadPoolExecutor
 
-    logger.warning("Uploading archived source code from '%s'...", tar_file_path)
     upload_url = None
     relative_path = None
     try:
@@ -54,18 +53,39 @@ def upload_source_code(client,
         raise CLIError("Failed to get a SAS URL to upload context.")
 
     account_name, endpoint_suffix, container_name, blob_name, sas_token = get_blob_info(upload_url)
-    BlockBlobService(account_name=account_name,
-                     sas_token=sas_token,
-                     endpoint_suffix=endpoint_suffix).create_blob_from_path(
-                         container_name=container_name,
-                         blob_name=blob_name,
-                         file_path=tar_file_path)
+    blob_service = BlockBlobService(account_name=account_name,
+                                    sas_token=sas_token,
+                                    endpoint_suffix=endpoint_suffix)
+
+    with ThreadPoolExecutor(max_workers=ARCHIVE_MAX_WORKERS) as executor:
+        if tar_file_path:
+            with open(tar_file_path, 'wb') as f:
+                _pack_source_code(source_location, f, docker_file_path, docker_file_in_tar, executor)
+            size = os.path.getsize(tar_file_path)
+
+            logger.warning("Uploading archived source code from '%s'...", tar_file_path)
+            blob_service.create_blob_from_path(container_name=container_name,
+                                               blob_name=blob_name,
+                                               file_path=tar_file_path)
+        else:
+            blob_writer = _BlockBlobWriter(blob_service, container_name, blob_name, executor)
+            _pack_source_code(source_location, blob_writer, docker_file_path, docker_file_in_tar, executor)
+            blob_writer.close()
+            size = blob_writer.size
+
+    unit = 'GiB'
+    for S in ['Bytes', 'KiB', 'MiB', 'GiB']:
+        if size < 1024:
+            unit = S
+            break
+        size = size / 1024.0
+
     logger.warning("Sending context ({0:.3f} {1}) to registry: {2}...".format(
         size, unit, registry_name))
     return relative_path
 
 
-def _pack_source_code(source_location, tar_file_path, docker_file_path, docker_file_in_tar):
+def _pack_source_code(source_location, fileobj, docker_file_path, docker_file_in_tar, executor):
     logger.warning("Packing source code into tar to upload...")
 
     ignore_list, ignore_list_size = _load_dockerignore_file(source_location)
@@ -87,7 +107,7 @@ def _pack_source_code(source_location, tar_file_path, docker_file_path, docker_f
             # at this point, current item should just inherit from parent
             if index >= parent_matching_rule_index:
                 break
-            if re.match(item.pattern, tarinfo.name):
+            if item.regex.match(tarinfo.name):
                 logger.debug(".dockerignore: rule '%s' matches '%s'.",
                              item.rule, tarinfo.name)
                 return item.ignore, index
@@ -97,14 +117,23 @@ def _pack_source_code(source_location, tar_file_path, docker_file_path, docker_f
         # inherit from parent
         return parent_ignored, parent_matching_rule_index
 
-    with tarfile.open(tar_file_path, "w:gz") as tar:
+    def _prune_check(tarinfo, matching_rule_index):
+        # an ignored dir can be skipped unless an exception rule with a higher priority than the rule
+        # ignoring it may include one of its child items
+        return ignore_list is None or not any(
+            not item.ignore and item.may_match_children(tarinfo.name)
+            for item in ignore_list[:matching_rule_index])
+
+    gzip_writer = _ParallelGzipWriter(fileobj, executor)
+    with tarfile.open(fileobj=gzip_writer, mode="w|") as tar:
         # need to set arcname to empty string as the archive root path
         _archive_file_recursively(tar,
                                   source_location,
                                   arcname="",
                                   parent_ignored=False,
                                   parent_matching_rule_index=ignore_list_size,
-                                  ignore_check=_ignore_check)
+                                  ignore_check=_ignore_check,
+                                  prune_check=_prune_check)
 
         # Add the Dockerfile if it's specified.
         # In the case of run, there will be no Dockerfile.
@@ -113,6 +142,108 @@ def _pack_source_code(source_location, tar_file_path, docker_file_path, docker_f
                 docker_file_path, docker_file_in_tar)
             with open(docker_file_path, "rb") as f:
                 tar.addfile(docker_file_tarinfo, f)
+    gzip_writer.close()
+
+
+def _gzip_compress(data):
+    compressor = zlib.compressobj(ARCHIVE_COMPRESSION_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    return compressor.compress(data) + compressor.flush()
+
+
+class _ParallelGzipWriter(object):
+    """Write-only file object gzip compressing the data written to it on a thread pool.
+
+    The data is split into chunks compressed as separate gzip members, which concatenated are a valid gzip
+    stream. The compressed chunks are written to fileobj in order.
+    """
+
+    def __init__(self, fileobj, executor, chunk_size=ARCHIVE_CHUNK_SIZE):
+        self._fileobj = fileobj
+        self._executor = executor
+        self._chunk_size = chunk_size
+        self._max_pending = 2 * ARCHIVE_MAX_WORKERS
+        self._buffer = []
+        self._buffer_size = 0
+        self._pending = deque()
+
+    def write(self, data):
+        self._buffer.append(data)
+        self._buffer_size += len(data)
+        if self._buffer_size >= self._chunk_size:
+            self._submit()
+        return len(data)
+
+    def close(self):
+        if self._buffer_size:
+            self._submit()
+        self._drain(0)
+
+    def _submit(self):
+        chunk = b''.join(self._buffer)
+        self._buffer = []
+        self._buffer_size = 0
+        self._pending.append(self._executor.submit(_gzip_compress, chunk))
+        self._drain(self._max_pending)
+
+    def _drain(self, max_pending):
+        # write the chunks compressed so far, and wait while too many chunks are pending
+        while self._pending and (len(self._pending) > max_pending or self._pending[0].done()):
+            self._fileobj.write(self._pending.popleft().result())
+
+
+class _BlockBlobWriter(object):
+    """Write-only file object uploading the data written to it as the blocks of a block blob on a thread pool.
+    The blob is committed on close.
+    """
+
+    def __init__(self, blob_service, container_name, blob_name, executor):
+        self.size = 0
+        self._blob_service = blob_service
+        self._container_name = container_name
+        self._blob_name = blob_name
+        self._executor = executor
+        self._block_size = UPLOAD_BLOCK_SIZE
+        self._max_pending = ARCHIVE_MAX_WORKERS
+        self._buffer = []
+        self._buffer_size = 0
+        self._block_ids = []
+        self._pending = deque()
+
+    def write(self, data):
+        self._buffer.append(data)
+        self._buffer_size += len(data)
+        self.size += len(data)
+        while self._buffer_size >= self._block_size:
+            buffered = b''.join(self._buffer)
+            self._buffer = [buffered[self._block_size:]]
+            self._buffer_size -= self._block_size
+            self._submit(buffered[:self._block_size])
+        return len(data)
+
+    def close(self):
+        from azure.storage.blob.models import BlobBlock
+
+        if self._buffer_size or not self._block_ids:
+            self._submit(b''.join(self._buffer))
+            self._buffer = []
+            self._buffer_size = 0
+        while self._pending:
+            self._pending.popleft().result()
+        self._blob_service.put_block_list(container_name=self._container_name,
+                                          blob_name=self._blob_name,
+                                          block_list=[BlobBlock(id=block_id) for block_id in self._block_ids])
+
+    def _submit(self, block):
+        # block ids must have the same length within a blob
+        block_id = '{:08d}'.format(len(self._block_ids))
+        self._block_ids.append(block_id)
+        self._pending.append(self._executor.submit(self._blob_service.put_block,
+                                                   container_name=self._container_name,
+                                                   blob_name=self._blob_name,
+                                                   block=block,
+                                                   block_id=block_id))
+        while len(self._pending) > self._max_pending or (self._pending and self._pending[0].done()):
+            self._pending.popleft().result()
 
 
 class IgnoreRule(object):  # pylint: disable=too-few-public-methods
@@ -126,21 +257,37 @@ class IgnoreRule(object):  # pylint: disable=too-few-public-methods
             rule = rule[1:]  # remove !
 
         self.pattern = "^"
+        # the pattern of each path component, None for **
+        self.token_regexes = []
         tokens = rule.split('/')
         token_length = len(tokens)
         for index, token in enumerate(tokens, 1):
             # ** matches any number of directories
             if token == "**":
                 self.pattern += ".*"  # treat **/ as **
+                self.token_regexes.append(None)
             else:
                 # * matches any sequence of non-seperator characters
                 # ? matches any single non-seperator character
                 # . matches dot character
-                self.pattern += token.replace(
+                token_pattern = token.replace(
                     "*", "[^/]*").replace("?", "[^/]").replace(".", "\\.")
+                self.pattern += token_pattern
+                self.token_regexes.append(re.compile("^" + token_pattern + "$"))
                 if index < token_length:
                     self.pattern += "/"  # add back / if it's not the last
         self.pattern += "$"
+        self.regex = re.compile(self.pattern)
+
+    def may_match_children(self, path):
+        """Return whether the rule may match a path under the directory path."""
+        components = path.split('/') if path else []
+        for token_regex, component in zip(self.token_regexes, components):
+            if token_regex is None:
+                return True
+            if not token_regex.match(component):
+                return False
+        return len(self.token_regexes) > len(components)
 
 
 def _load_dockerignore_file(source_location):
@@ -169,7 +316,8 @@ def _load_dockerignore_file(source_location):
     return ignore_list, len(ignore_list)
 
 
-def _archive_file_recursively(tar, name, arcname, parent_ignored, parent_matching_rule_index, ignore_check):
+def _archive_file_recursively(tar, name, arcname, parent_ignored, parent_matching_rule_index, ignore_check,
+                              prune_check):
     # create a TarInfo object from the file
     tarinfo = tar.gettarinfo(name, arcname)
 
@@ -188,12 +336,13 @@ def _archive_file_recursively(tar, name, arcname, parent_ignored, parent_matchin
         else:
             tar.addfile(tarinfo)
 
-    # even the dir is ignored, its child items can still be included, so continue to scan
-    if tarinfo.isdir():
+    # even the dir is ignored, its child items can still be included by an exception rule, so continue to scan
+    # unless no rule can include them
+    if tarinfo.isdir() and not (ignored and prune_check(tarinfo, matching_rule_index)):
         for f in os.listdir(name):
             _archive_file_recursively(tar, os.path.join(name, f), os.path.join(arcname, f),
                                       parent_ignored=ignored, parent_matching_rule_index=matching_rule_index,
-                                      ignore_check=ignore_check)
+                                      ignore_check=ignore_check, prune_check=prune_check)
 
 
 def check_remote_source_code(source_location):
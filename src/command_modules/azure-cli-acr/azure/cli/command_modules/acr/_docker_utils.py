@@ -9,9 +9,11 @@ except ImportError:
     from urllib import urlencode
     from urlparse import urlparse, urlunparse
 
+import os
+import threading
 import time
 from json import loads
-from base64 import b64encode
+from base64 import b64encode, urlsafe_b64decode
 import requests
 from requests import RequestException
 from requests.utils import to_native_string
@@ -40,6 +42,95 @@ ACCESS_TOKEN_PERMISSION = ['*', 'pull']
 AAD_TOKEN_BASE_ERROR_MESSAGE = "Unable to get AAD authorization tokens with message"
 ADMIN_USER_BASE_ERROR_MESSAGE = "Unable to get admin user credentials with message"
 
+TOKEN_CACHE_DIR_NAME = 'acrTokenCache'
+TOKEN_EXPIRY_MARGIN = 5 * 60  # in seconds
+
+_registry_session = None
+_registry_session_lock = threading.Lock()
+
+
+def _get_token_claims(token):
+    """Returns the claims of a JWT, or None if the token is not a JWT."""
+    try:
+        payload = token.split('.')[1]
+        return loads(urlsafe_b64decode(str(payload + '=' * (-len(payload) % 4))).decode('utf-8'))
+    except (AttributeError, IndexError, TypeError, ValueError):
+        return None
+
+
+def _get_token_cache_entry_path(key):
+    """Returns the path of the file of the cache entry, creating the cache directory if needed."""
+    import hashlib
+    from knack.util import ensure_dir
+    from azure.cli.core._environment import get_config_dir
+
+    cache_dir = os.path.join(get_config_dir(), TOKEN_CACHE_DIR_NAME)
+    ensure_dir(cache_dir)
+    return os.path.join(cache_dir, hashlib.sha256(key.encode('utf-8')).hexdigest() + '.json')
+
+
+def _read_token_cache_entry(path):
+    try:
+        with open(path, 'r') as f:
+            return loads(f.read())
+    except (OSError, IOError, ValueError):
+        return None
+
+
+def _get_cached_token(key):
+    """Returns the cache entry of the token if it is not about to expire."""
+    entry = _read_token_cache_entry(_get_token_cache_entry_path(key))
+    if entry and entry['expiresOn'] - TOKEN_EXPIRY_MARGIN > time.time():
+        return entry
+    return None
+
+
+def _cache_token(key, token, **kwargs):
+    """Caches the token until it expires, in a file of its own which is replaced at once, so concurrent commands
+    neither read a partial entry nor overwrite the other entries. The expired entries are removed."""
+    from json import dumps
+    claims = _get_token_claims(token)
+    if not claims or 'exp' not in claims:
+        return
+    path = _get_token_cache_entry_path(key)
+    temp_path = '{}.{}.{}.tmp'.format(path, os.getpid(), threading.current_thread().ident)
+    try:
+        # the cache holds registry tokens, so it is readable by the owner only
+        with os.fdopen(os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), 'w') as f:
+            f.write(dumps(dict(kwargs, token=token, expiresOn=claims['exp'])))
+        try:
+            os.replace(temp_path, path)
+        except AttributeError:  # Python 2
+            if os.path.exists(path):
+                os.remove(path)
+            os.rename(temp_path, path)
+
+        now = time.time()
+        cache_dir = os.path.dirname(path)
+        for name in os.listdir(cache_dir):
+            entry_path = os.path.join(cache_dir, name)
+            entry = _read_token_cache_entry(entry_path) if name.endswith('.json') else None
+            if entry and entry['expiresOn'] <= now:
+                try:
+                    os.remove(entry_path)
+                except OSError:  # removed by another command meanwhile
+                    pass
+    except (OSError, IOError) as e:
+        logger.debug("Failed to save registry token cache. Exception: %s", str(e))
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+def _get_registry_session():
+    """Returns the session shared by the registry calls, to reuse their connections."""
+    global _registry_session  # pylint: disable=global-statement
+    with _registry_session_lock:
+        if _registry_session is None:
+            _registry_session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(pool_maxsize=20)
+            _registry_session.mount('https://', adapter)
+        return _registry_session
+
 
 def _get_aad_token(cli_ctx,
                    login_server,
@@ -64,6 +155,31 @@ def _get_aad_token(cli_ctx,
 
     login_server = login_server.rstrip('/')
 
+    if repository:
+        scope = 'repository:{}:{}'.format(repository, permission)
+    elif artifact_repository:
+        scope = 'artifact-repository:{}:{}'.format(artifact_repository, permission)
+    else:
+        # catalog only has * as permission, even for a read operation
+        scope = 'registry:catalog:*'
+
+    from azure.cli.core._profile import Profile
+    profile = Profile(cli_ctx=cli_ctx)
+    creds, _, tenant = profile.get_raw_token()
+
+    # registry tokens are cached per identity, the object id of the AAD token
+    identity = (_get_token_claims(creds[1]) or {}).get('oid')
+    cache_key_prefix = '{}/{}/{}'.format(login_server, tenant, identity) if identity else None
+    # 'az acr login' hands the refresh token to docker, which keeps using it, so it always gets a new one
+    cached_refresh_token = _get_cached_token(cache_key_prefix + '/refresh') \
+        if cache_key_prefix and not only_refresh_token else None
+    if cached_refresh_token:
+        cached_access_token = _get_cached_token('{}/{}'.format(cache_key_prefix, scope))
+        if cached_access_token:
+            return cached_access_token['token']
+        return _get_access_token(login_server, urlparse(cached_refresh_token['realm']), scope,
+                                 cached_refresh_token['token'], cache_key_prefix)
+
     challenge = requests.get('https://' + login_server + '/v2/', verify=(not should_disable_connection_verify()))
     if challenge.status_code not in [401] or 'WWW-Authenticate' not in challenge.headers:
         raise CLIError("Registry '{}' did not issue a challenge.".format(login_server))
@@ -82,10 +198,6 @@ def _get_aad_token(cli_ctx,
     authurl = urlparse(params['realm'])
     authhost = urlunparse((authurl[0], authurl[1], '/oauth2/exchange', '', '', ''))
 
-    from azure.cli.core._profile import Profile
-    profile = Profile(cli_ctx=cli_ctx)
-    creds, _, tenant = profile.get_raw_token()
-
     headers = {'Content-Type': 'application/x-www-form-urlencoded'}
     content = {
         'grant_type': 'access_token',
@@ -102,19 +214,18 @@ def _get_aad_token(cli_ctx,
             login_server, response.status_code))
 
     refresh_token = loads(response.content.decode("utf-8"))["refresh_token"]
+    if cache_key_prefix:
+        _cache_token(cache_key_prefix + '/refresh', refresh_token, realm=params['realm'])
     if only_refresh_token:
         return refresh_token
 
-    authhost = urlunparse((authurl[0], authurl[1], '/oauth2/token', '', '', ''))
+    return _get_access_token(login_server, authurl, scope, refresh_token, cache_key_prefix)
 
-    if repository:
-        scope = 'repository:{}:{}'.format(repository, permission)
-    elif artifact_repository:
-        scope = 'artifact-repository:{}:{}'.format(artifact_repository, permission)
-    else:
-        # catalog only has * as permission, even for a read operation
-        scope = 'registry:catalog:*'
 
+def _get_access_token(login_server, authurl, scope, refresh_token, cache_key_prefix):
+    authhost = urlunparse((authurl[0], authurl[1], '/oauth2/token', '', '', ''))
+
+    headers = {'Content-Type': 'application/x-www-form-urlencoded'}
     content = {
         'grant_type': 'refresh_token',
         'service': login_server,
@@ -128,7 +239,10 @@ def _get_aad_token(cli_ctx,
         raise CLIError("Access to registry '{}' was denied. Response code: {}.".format(
             login_server, response.status_code))
 
-    return loads(response.content.decode("utf-8"))["access_token"]
+    access_token = loads(response.content.decode("utf-8"))["access_token"]
+    if cache_key_prefix:
+        _cache_token('{}/{}'.format(cache_key_prefix, scope), access_token)
+    return access_token
 
 
 def _get_credentials(cmd,  # pylint: disable=too-many-statements
@@ -347,7 +461,7 @@ def request_data_from_registry(http_method,
         try:
             if file_payload:
                 with open(file_payload, 'rb') as data_payload:
-                    response = requests.request(
+                    response = _get_registry_session().request(
                         method=http_method,
                         url=url,
                         headers=headers,
@@ -356,7 +470,7 @@ def request_data_from_registry(http_method,
                         verify=(not should_disable_connection_verify())
                     )
             else:
-                response = requests.request(
+                response = _get_registry_session().request(
                     method=http_method,
                     url=url,
                     headers=headers,
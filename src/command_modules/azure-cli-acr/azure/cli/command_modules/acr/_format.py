@@ -72,6 +72,10 @@ def helm_show_output_format(result):
     return _output_format(result, _helm_format_group)
 
 
+def repository_purge_output_format(result):
+    return _output_format(result, _repository_purge_format_group)
+
+
 def _output_format(result, format_group):
     if 'value' in result and isinstance(result['value'], list):
         result = result['value']
@@ -212,6 +216,16 @@ def _helm_format_group(item):
     ])
 
 
+def _repository_purge_format_group(item):
+    return OrderedDict([
+        ('REPOSITORY', _get_value(item, 'repository')),
+        ('DIGEST', _get_value(item, 'digest')),
+        ('TAGS', ', '.join(item.get('tags') or []) or ' '),
+        ('LAST UPDATED', _format_datetime(_get_value(item, 'timestamp'))),
+        ('STATUS', _get_value(item, 'status'))
+    ])
+
+
 def _get_value(item, *args):
     """Get a nested value from a dict.
     :param dict item: The dict object
@@ -345,6 +345,19 @@ examples:
     text: az acr repository list -n MyRegistry
 """
 
+helps['acr repository purge'] = """
+type: command
+short-summary: Delete the manifests matching filters across repositories in an Azure Container Registry.
+long-summary: The manifests of each repository are listed from the most recently updated, and the ones matching all the specified filters are deleted in parallel, with all the tags referencing them. Use --dry-run to list them first.
+examples:
+  - name: List the manifests of all repositories last updated more than 30 days ago, without deleting them.
+    text: az acr repository purge -n MyRegistry --older-than 30d --dry-run
+  - name: Delete the untagged manifests of 'hello-world', keeping the 5 most recent manifests.
+    text: az acr repository purge -n MyRegistry --repository hello-world --untagged --keep 5
+  - name: Delete the manifests of two repositories whose tags all look like 'dev-<number>' and are older than a week.
+    text: az acr repository purge -n MyRegistry --repository app1 app2 --filter-tags "dev-[0-9]+" --older-than 7d --yes
+"""
+
 helps['acr repository show'] = """
 type: command
 short-summary: Get the attributes of a repository or image in an Azure Container Registry.
@@ -367,6 +380,8 @@ examples:
     text: az acr repository show-manifests -n MyRegistry --repository MyRepository --top 10 --orderby time_desc
   - name: Show the detailed information of the latest 10 manifests ordered by timestamp of a repository in an Azure Container Registry.
     text: az acr repository show-manifests -n MyRegistry --repository MyRepository --top 10 --orderby time_desc --detail
+  - name: Show manifests of several repositories in an Azure Container Registry.
+    text: az acr repository show-manifests -n MyRegistry --repository MyRepository1 MyRepository2 MyRepository3
 """
 
 helps['acr repository show-tags'] = """
@@ -379,6 +394,8 @@ examples:
     text: az acr repository show-tags -n MyRegistry --repository MyRepository --detail
   - name: Show the detailed information of the latest 10 tags ordered by timestamp of a repository in an Azure Container Registry.
     text: az acr repository show-tags -n MyRegistry --repository MyRepository --top 10 --orderby time_desc --detail
+  - name: Show tags of several repositories in an Azure Container Registry.
+    text: az acr repository show-tags -n MyRegistry --repository MyRepository1 MyRepository2
 """
 
 helps['acr repository untag'] = """
@@ -519,6 +536,9 @@ examples:
   - name: Show logs for the last created run in the registry that built the image 'hello-world'.
     text: >
         az acr task logs -r MyRegistry --image hello-world
+  - name: Write the logs of a particular run to a file.
+    text: >
+        az acr task logs -r MyRegistry --run-id runId --log-file run.log
 """
 
 helps['acr task run'] = """
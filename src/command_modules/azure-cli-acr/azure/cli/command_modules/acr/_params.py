@@ -63,6 +63,7 @@ def load_arguments(self, _):  # pylint: disable=too-many-statements
         c.argument('no_logs', help="Do not show logs after successfully queuing the build.", action='store_true')
         c.argument('no_wait', help="Do not wait for the run to complete and return immediately after queuing the run.", action='store_true')
         c.argument('no_format', help="Indicates whether the logs should be displayed in raw format", action='store_true')
+        c.argument('log_file', help="Write the raw logs to this file instead of displaying them.", completer=FilesCompleter())
         c.argument('os_type', options_list=['--os'], help='The operating system type required for the build.', arg_type=get_enum_type(OsType), deprecate_info=c.deprecate(redirect='platform', hide=True))
         c.argument('platform', help="The platform where build/task is run, Eg, 'windows' and 'linux'. When it's used in build commands, it also can be specified in 'os/arch/variant' format for the resulting image. Eg, linux/arm/v7. The 'arch' and 'variant' parts are optional.")
         c.argument('target', help='The name of the target build stage.')
@@ -99,9 +100,22 @@ def load_arguments(self, _):  # pylint: disable=too-many-statements
         c.argument('read_enabled', help='Indicates whether read operation is allowed.', arg_type=get_three_state_flag())
         c.argument('write_enabled', help='Indicates whether write or delete operation is allowed.', arg_type=get_three_state_flag())
 
+    for scope in ['acr repository show-tags', 'acr repository show-manifests']:
+        with self.argument_context(scope) as c:
+            c.argument('repository', nargs='+', help="Space-separated names of the repositories. Multiple repositories are listed in parallel, and the results are grouped by repository.")
+
     with self.argument_context('acr repository untag') as c:
         c.argument('image', arg_type=image_by_tag_type)
 
+    with self.argument_context('acr repository purge') as c:
+        c.argument('repositories', options_list=['--repository'], nargs='+', help="Space-separated names of the repositories to purge. Default to all the repositories of the registry.")
+        c.argument('older_than', help="Only purge the manifests last updated longer ago than this duration, e.g. '30d', '12h' or '90m'.")
+        c.argument('tag_filter', options_list=['--filter-tags'], help="Only purge the tagged manifests whose tags all match this regular expression.")
+        c.argument('untagged', help='Purge the untagged manifests. With --filter-tags, purge them as well as the manifests matching it.', action='store_true')
+        c.argument('keep', type=int, help='Keep this number of the most recently updated manifests of each repository.')
+        c.argument('dry_run', help='List the manifests which would be purged without deleting them.', action='store_true')
+        c.argument('concurrency', type=int, help='The number of repositories listed and manifests deleted in parallel.')
+
     with self.argument_context('acr create') as c:
         c.argument('registry_name', completer=None)
         c.argument('deployment_name', validator=None)
@@ -2,7 +2,6 @@
 # Copyright (c) Microsoft Corporation. All rights reserved.
 # Licensed under the MIT License. See License.txt in the project root for license information.
 # --------------------------------------------------------------------------------------------
-from io import BytesIO
 import time
 from random import uniform
 import colorama
@@ -16,6 +15,7 @@ from ._azure_utils import get_blob_info
 logger = get_logger(__name__)
 
 DEFAULT_CHUNK_SIZE = 1024 * 4
+MAX_CHUNK_SIZE = 1024 * 1024 * 4
 DEFAULT_LOG_TIMEOUT_IN_SEC = 60 * 30  # 30 minutes
 
 
@@ -24,7 +24,8 @@ def stream_logs(client,
                 registry_name,
                 resource_group_name,
                 no_format=False,
-                raise_error_on_failure=False):
+                raise_error_on_failure=False,
+                log_file=None):
     log_file_sas = None
     error_msg = "Could not get logs for ID: {}".format(run_id)
 
@@ -53,7 +54,8 @@ def stream_logs(client,
                      endpoint_suffix=endpoint_suffix),
                  container_name,
                  blob_name,
-                 raise_error_on_failure)
+                 raise_error_on_failure,
+                 log_file)
 
 
 def _stream_logs(no_format,  # pylint: disable=too-many-locals, too-many-statements, too-many-branches
@@ -62,15 +64,19 @@ def _stream_logs(no_format,  # pylint: disable=too-many-locals, too-many-stateme
                  blob_service,
                  container_name,
                  blob_name,
-                 raise_error_on_failure):
+                 raise_error_on_failure,
+                 log_file=None):
 
-    if not no_format:
+    if not no_format and not log_file:
         colorama.init()
 
-    stream = BytesIO()
+    if log_file:
+        logger.warning("Writing logs to '%s'...", log_file)
+        output = _LogFileWriter(log_file)
+    else:
+        output = _LogLineSplitter()
     metadata = {}
     start = 0
-    end = byte_size - 1
     available = 0
     sleep_time = 1
     max_sleep_time = 15
@@ -88,96 +94,73 @@ def _stream_logs(no_format,  # pylint: disable=too-many-locals, too-many-stateme
     except (AttributeError, AzureHttpError):
         pass
 
-    while (_blob_is_not_complete(metadata) or start < available):
-        while start < available:
-            # Success! Reset our polling backoff.
-            sleep_time = 1
-            num_fails = 0
-            consecutive_sleep_in_sec = 0
+    try:
+        while (_blob_is_not_complete(metadata) or start < available):
+            while start < available:
+                # Success! Reset our polling backoff.
+                sleep_time = 1
+                num_fails = 0
+                consecutive_sleep_in_sec = 0
+
+                # Read everything known to be available, up to MAX_CHUNK_SIZE at a time, so large logs
+                # take few requests while a slow build is still polled in small ranges.
+                end = start + min(max(available - start, byte_size), MAX_CHUNK_SIZE) - 1
+                try:
+                    content = blob_service.get_blob_to_bytes(
+                        container_name=container_name,
+                        blob_name=blob_name,
+                        start_range=start,
+                        end_range=end).content
+                    start += len(content)
+                    output.write(content)
+                except AzureHttpError as ae:
+                    if ae.status_code != 404:
+                        raise CLIError(ae)
 
             try:
-                old_byte_size = len(stream.getvalue())
-                blob_service.get_blob_to_stream(
-                    container_name=container_name,
-                    blob_name=blob_name,
-                    start_range=start,
-                    end_range=end,
-                    stream=stream)
-
-                curr_bytes = stream.getvalue()
-                new_byte_size = len(curr_bytes)
-                amount_read = new_byte_size - old_byte_size
-                start += amount_read
-                end = start + byte_size - 1
-
-                # Only scan what's newly read. If nothing is read, default to 0.
-                min_scan_range = max(new_byte_size - amount_read - 1, 0)
-                for i in range(new_byte_size - 1, min_scan_range, -1):
-                    if curr_bytes[i - 1:i + 1] == b'\r\n':
-                        flush = curr_bytes[:i]  # won't print \n
-                        stream = BytesIO()
-                        stream.write(curr_bytes[i + 1:])
-                        print(flush.decode('utf-8', errors='ignore'))
-                        break
+                props = blob_service.get_blob_properties(
+                    container_name=container_name, blob_name=blob_name)
+                metadata = props.metadata
+                available = props.properties.content_length
             except AzureHttpError as ae:
                 if ae.status_code != 404:
                     raise CLIError(ae)
-            except KeyboardInterrupt:
-                curr_bytes = stream.getvalue()
-                if curr_bytes:
-                    print(curr_bytes.decode('utf-8', errors='ignore'))
+            except Exception as err:
+                raise CLIError(err)
+
+            if consecutive_sleep_in_sec > timeout_in_seconds:
+                # Flush anything remaining in the buffer - this would be the case
+                # if the file has expired and we weren't able to detect any \r\n
+                output.close()
+                logger.warning("Failed to find any new logs in %d seconds. "
+                               "Client will stop polling for additional logs.", consecutive_sleep_in_sec)
                 return
 
-        try:
-            props = blob_service.get_blob_properties(
-                container_name=container_name, blob_name=blob_name)
-            metadata = props.metadata
-            available = props.properties.content_length
-        except AzureHttpError as ae:
-            if ae.status_code != 404:
-                raise CLIError(ae)
-        except KeyboardInterrupt:
-            if curr_bytes:
-                print(curr_bytes.decode('utf-8', errors='ignore'))
-            return
-        except Exception as err:
-            raise CLIError(err)
-
-        if consecutive_sleep_in_sec > timeout_in_seconds:
-            # Flush anything remaining in the buffer - this would be the case
-            # if the file has expired and we weren't able to detect any \r\n
-            curr_bytes = stream.getvalue()
-            if curr_bytes:
-                print(curr_bytes.decode('utf-8', errors='ignore'))
-
-            logger.warning("Failed to find any new logs in %d seconds. Client will stop polling for additional logs.",
-                           consecutive_sleep_in_sec)
-            return
-
-        # If no new data available but not complete, sleep before trying to process additional data.
-        if (_blob_is_not_complete(metadata) and start >= available):
-            num_fails += 1
-
-            logger.debug(
-                "Failed to find new content %d times in a row", num_fails)
-            if num_fails >= num_fails_for_backoff:
-                num_fails = 0
-                sleep_time = min(sleep_time * 2, max_sleep_time)
-                logger.debug("Resetting failure count to %d", num_fails)
-
-            rnd = uniform(1, 2)  # 1.0 <= x < 2.0
-            total_sleep_time = sleep_time + rnd
-            consecutive_sleep_in_sec += total_sleep_time
-            logger.debug("Base sleep time: %d, random delay: %d, total: %d, consecutive: %d",
-                         sleep_time, rnd, total_sleep_time, consecutive_sleep_in_sec)
-            time.sleep(total_sleep_time)
+            # If no new data available but not complete, sleep before trying to process additional data.
+            if (_blob_is_not_complete(metadata) and start >= available):
+                num_fails += 1
+
+                logger.debug(
+                    "Failed to find new content %d times in a row", num_fails)
+                if num_fails >= num_fails_for_backoff:
+                    num_fails = 0
+                    sleep_time = min(sleep_time * 2, max_sleep_time)
+                    logger.debug("Resetting failure count to %d", num_fails)
+
+                rnd = uniform(1, 2)  # 1.0 <= x < 2.0
+                total_sleep_time = sleep_time + rnd
+                consecutive_sleep_in_sec += total_sleep_time
+                logger.debug("Base sleep time: %d, random delay: %d, total: %d, consecutive: %d",
+                             sleep_time, rnd, total_sleep_time, consecutive_sleep_in_sec)
+                time.sleep(total_sleep_time)
+    except KeyboardInterrupt:
+        output.close()
+        return
 
     # One final check to see if there's anything in the buffer to flush
     # E.g., metadata has been set and start == available, but the log file
     # didn't end in \r\n, so we were unable to flush out the final contents.
-    curr_bytes = stream.getvalue()
-    if curr_bytes:
-        print(curr_bytes.decode('utf-8', errors='ignore'))
+    output.close()
 
     build_status = _get_run_status(metadata).lower()
     logger.debug("status was: '%s'", build_status)
@@ -191,6 +174,44 @@ def _stream_logs(no_format,  # pylint: disable=too-many-locals, too-many-stateme
             raise CLIError("Run was canceled")
 
 
+class _LogLineSplitter(object):
+    """Prints the logs received in chunks of any size line by line, as soon as the lines are complete.
+
+    The bytes after the last line break are kept in a buffer until the next chunk, so each byte is only
+    scanned and copied a bounded number of times however large the logs are.
+    """
+
+    def __init__(self):
+        self._buffer = bytearray()
+
+    def write(self, content):
+        self._buffer += content
+        index = self._buffer.rfind(b'\r\n')
+        if index < 0:
+            return
+        lines = self._buffer[:index + 1]  # won't print \n
+        del self._buffer[:index + 2]
+        print(lines.decode('utf-8', errors='ignore'))
+
+    def close(self):
+        if self._buffer:
+            print(self._buffer.decode('utf-8', errors='ignore'))
+            self._buffer = bytearray()
+
+
+class _LogFileWriter(object):
+    """Writes the logs as received to a file, without decoding them."""
+
+    def __init__(self, log_file):
+        self._file = open(log_file, 'wb')
+
+    def write(self, content):
+        self._file.write(content)
+
+    def close(self):
+        self._file.close()
+
+
 def _blob_is_not_complete(metadata):
     if not metadata:
         return True
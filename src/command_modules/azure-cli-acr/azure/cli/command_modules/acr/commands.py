@@ -19,7 +19,8 @@ from ._format import (
     task_output_format,
     run_output_format,
     helm_list_output_format,
-    helm_show_output_format
+    helm_show_output_format,
+    repository_purge_output_format
 )
 from ._client_factory import (
     cf_acr_registries,
@@ -134,6 +135,7 @@ def load_command_table(self, _):  # pylint: disable=too-many-statements
         g.command('update', 'acr_repository_update')
         g.command('delete', 'acr_repository_delete')
         g.command('untag', 'acr_repository_untag')
+        g.command('purge', 'acr_repository_purge', table_transformer=repository_purge_output_format)
 
     with self.command_group('acr webhook', acr_webhook_util) as g:
         g.command('list', 'acr_webhook_list')
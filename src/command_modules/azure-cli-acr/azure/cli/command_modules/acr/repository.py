@@ -8,6 +8,9 @@ try:
 except ImportError:
     from urllib import unquote
 
+import re
+from datetime import datetime, timedelta
+
 from knack.util import CLIError
 from knack.log import get_logger
 
@@ -22,12 +25,22 @@ DELETE_NOT_SUPPORTED = 'Delete is only supported for managed registries.'
 SHOW_MANIFESTS_NOT_SUPPORTED = 'Show manifests is only supported for managed registries.'
 ATTRIBUTES_NOT_SUPPORTED = 'Attributes are only supported for managed registries.'
 METADATA_NOT_SUPPORTED = 'Metadata is only supported for managed registries.'
+PURGE_NOT_SUPPORTED = 'Purge is only supported for managed registries.'
 
 ORDERBY_PARAMS = {
     'time_asc': 'timeasc',
     'time_desc': 'timedesc'
 }
 DEFAULT_PAGINATION = 100
+MAX_PAGINATION = 1000
+MAX_LIST_CONCURRENCY = 10
+DEFAULT_PURGE_CONCURRENCY = 5
+
+DURATION_UNITS = {
+    'd': 'days',
+    'h': 'hours',
+    'm': 'minutes'
+}
 
 
 def _get_repository_path(repository=None):
@@ -75,12 +88,36 @@ def _obtain_data_from_registry(login_server,
                                password,
                                result_index,
                                top=None,
-                               orderby=None):
+                               orderby=None,
+                               page_size=DEFAULT_PAGINATION):
     result_list = []
+    for result in _iter_data_from_registry(login_server=login_server,
+                                           path=path,
+                                           username=username,
+                                           password=password,
+                                           result_index=result_index,
+                                           top=top,
+                                           orderby=orderby,
+                                           page_size=page_size):
+        result_list += result
+    return result_list
+
+
+def _iter_data_from_registry(login_server,
+                             path,
+                             username,
+                             password,
+                             result_index,
+                             top=None,
+                             orderby=None,
+                             page_size=DEFAULT_PAGINATION):
+    """Yield the pages of a list from the registry as they are received, following the Link headers.
+    The registry may return fewer items than the requested page size.
+    """
     execute_next_http_call = True
 
     params = {
-        'n': DEFAULT_PAGINATION,
+        'n': page_size,
         'orderby': ORDERBY_PARAMS[orderby] if orderby else None
     }
 
@@ -89,8 +126,7 @@ def _obtain_data_from_registry(login_server,
 
         # Override the default page size if top is provided
         if top is not None:
-            params['n'] = DEFAULT_PAGINATION if top > DEFAULT_PAGINATION else top
-            top -= params['n']
+            params['n'] = min(page_size, top)
 
         result, next_link = request_data_from_registry(
             http_method='get',
@@ -102,7 +138,10 @@ def _obtain_data_from_registry(login_server,
             params=params)
 
         if result:
-            result_list += result
+            if top is not None:
+                result = result[:top]
+                top -= len(result)
+            yield result
 
         if top is not None and top <= 0:
             break
@@ -117,7 +156,24 @@ def _obtain_data_from_registry(login_server,
             params = {y[0]: unquote(y[1]) for y in (x.split('=', 2) for x in tokens[1].split('&'))}
             execute_next_http_call = True
 
-    return result_list
+
+def _list_in_repositories(list_func, result_name, repository, **kwargs):
+    """Return the result of list_func for a repository. For several repositories, the repositories are listed
+    concurrently with larger pages, and the results are returned by repository in the order given.
+    """
+    if not isinstance(repository, list):
+        return list_func(repository=repository, **kwargs)
+    if len(repository) == 1:
+        return list_func(repository=repository[0], **kwargs)
+
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor(max_workers=min(len(repository), MAX_LIST_CONCURRENCY)) as executor:
+        futures = [executor.submit(list_func, repository=name, page_size=MAX_PAGINATION, **kwargs)
+                   for name in repository]
+        return [{
+            'repository': name,
+            result_name: future.result()
+        } for name, future in zip(repository, futures)]
 
 
 def acr_repository_list(cmd,
@@ -153,6 +209,29 @@ def acr_repository_show_tags(cmd,
                              username=None,
                              password=None,
                              detail=False):
+    return _list_in_repositories(_show_tags,
+                                 'tags',
+                                 cmd=cmd,
+                                 registry_name=registry_name,
+                                 repository=repository,
+                                 top=top,
+                                 orderby=orderby,
+                                 tenant_suffix=tenant_suffix,
+                                 username=username,
+                                 password=password,
+                                 detail=detail)
+
+
+def _show_tags(cmd,
+               registry_name,
+               repository,
+               top,
+               orderby,
+               tenant_suffix,
+               username,
+               password,
+               detail,
+               page_size=DEFAULT_PAGINATION):
     login_server, username, password = get_access_credentials(
         cmd=cmd,
         registry_name=registry_name,
@@ -170,7 +249,8 @@ def acr_repository_show_tags(cmd,
             password=password,
             result_index='tags',
             top=top,
-            orderby=orderby)
+            orderby=orderby,
+            page_size=page_size)
     except RegistryException as e:
         # Check for Classic registry
         if e.status_code == 405:
@@ -185,7 +265,8 @@ def acr_repository_show_tags(cmd,
                 path='/v2/{}/tags/list'.format(repository),
                 username=username,
                 password=password,
-                result_index='tags')
+                result_index='tags',
+                page_size=page_size)
         raise
 
     # For backward compatibility, convert the results to the old schema
@@ -205,6 +286,29 @@ def acr_repository_show_manifests(cmd,
                                   username=None,
                                   password=None,
                                   detail=False):
+    return _list_in_repositories(_show_manifests,
+                                 'manifests',
+                                 cmd=cmd,
+                                 registry_name=registry_name,
+                                 repository=repository,
+                                 top=top,
+                                 orderby=orderby,
+                                 tenant_suffix=tenant_suffix,
+                                 username=username,
+                                 password=password,
+                                 detail=detail)
+
+
+def _show_manifests(cmd,
+                    registry_name,
+                    repository,
+                    top,
+                    orderby,
+                    tenant_suffix,
+                    username,
+                    password,
+                    detail,
+                    page_size=DEFAULT_PAGINATION):
     login_server, username, password = get_access_credentials(
         cmd=cmd,
         registry_name=registry_name,
@@ -222,7 +326,8 @@ def acr_repository_show_manifests(cmd,
             password=password,
             result_index='manifests',
             top=top,
-            orderby=orderby)
+            orderby=orderby,
+            page_size=page_size)
     except RegistryException as e:
         # Check for Classic registry
         if e.status_code == 405:
@@ -463,6 +568,149 @@ def acr_repository_delete(cmd,
         raise
 
 
+def acr_repository_purge(cmd,
+                         registry_name,
+                         repositories=None,
+                         older_than=None,
+                         tag_filter=None,
+                         untagged=False,
+                         keep=0,
+                         dry_run=False,
+                         concurrency=DEFAULT_PURGE_CONCURRENCY,
+                         resource_group_name=None,  # pylint: disable=unused-argument
+                         tenant_suffix=None,
+                         username=None,
+                         password=None,
+                         yes=False):
+    if not any([older_than, tag_filter, untagged, keep]):
+        raise CLIError('Usage error: specify at least one of --older-than, --filter-tags, --untagged and --keep.')
+    if keep < 0 or concurrency < 1:
+        raise CLIError('Usage error: --keep must not be negative and --concurrency must be positive.')
+    cutoff = datetime.utcnow() - _parse_duration(older_than) if older_than else None
+    # the filter has to match the whole tag
+    tag_regex = re.compile('(?:{})$'.format(tag_filter)) if tag_filter else None
+
+    if not repositories:
+        login_server, catalog_username, catalog_password = get_access_credentials(
+            cmd=cmd,
+            registry_name=registry_name,
+            tenant_suffix=tenant_suffix,
+            username=username,
+            password=password)
+        repositories = _obtain_data_from_registry(
+            login_server=login_server,
+            path='/v2/_catalog',
+            username=catalog_username,
+            password=catalog_password,
+            result_index='repositories')
+
+    def _list_targets(repository):
+        """Return (repository, manifest, login server, username, password) of the manifests to delete."""
+        login_server, repo_username, repo_password = get_access_credentials(
+            cmd=cmd,
+            registry_name=registry_name,
+            tenant_suffix=tenant_suffix,
+            username=username,
+            password=password,
+            repository=repository,
+            permission='*')
+        try:
+            manifests = _obtain_data_from_registry(
+                login_server=login_server,
+                path=_get_manifest_path(repository),
+                username=repo_username,
+                password=repo_password,
+                result_index='manifests',
+                orderby='time_desc')
+        except RegistryException as e:
+            # Check for Classic registry
+            if e.status_code == 405:
+                raise CLIError(PURGE_NOT_SUPPORTED)
+            raise
+        return [(repository, manifest, login_server, repo_username, repo_password)
+                for manifest in _filter_manifests_to_purge(manifests[keep:], cutoff, tag_regex, untagged)]
+
+    def _delete(target):
+        repository, manifest, login_server, repo_username, repo_password = target
+        request_data_from_registry(
+            http_method='delete',
+            login_server=login_server,
+            path='/v2/{}/manifests/{}'.format(repository, manifest['digest']),
+            username=repo_username,
+            password=repo_password,
+            retry_times=1)
+
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        # the repositories are listed concurrently, and their manifests kept in the order of the repositories
+        targets = [target for repository_targets in executor.map(_list_targets, repositories)
+                   for target in repository_targets]
+
+        result = [{
+            'repository': repository,
+            'digest': manifest['digest'],
+            'tags': manifest.get('tags') or [],
+            'timestamp': manifest.get('lastUpdateTime', ''),
+            'status': 'dryRun' if dry_run else None
+        } for repository, manifest, _, _, _ in targets]
+        if dry_run or not targets:
+            logger.warning("%s manifests in %s repositories match the purge filters.",
+                           len(targets), len(set(t[0] for t in targets)))
+            return result
+
+        user_confirmation("This operation will delete {} manifests in {} repositories and all the tags "
+                          "referencing them.\nAre you sure you want to continue?".format(
+                              len(targets), len(set(t[0] for t in targets))), yes)
+
+        futures = [executor.submit(_delete, target) for target in targets]
+        for item, future in zip(result, futures):
+            try:
+                future.result()
+                item['status'] = 'deleted'
+            except CLIError as e:
+                logger.warning("Failed to delete '%s@%s': %s", item['repository'], item['digest'], str(e))
+                item['status'] = 'failed'
+
+    deleted = len([item for item in result if item['status'] == 'deleted'])
+    logger.warning("Deleted %s of %s manifests.", deleted, len(result))
+    if not deleted:
+        raise CLIError('Failed to delete the manifests.')
+    return result
+
+
+def _parse_duration(duration):
+    """Parse a duration such as '30d', '12h' or '90m' into a timedelta.
+    """
+    match = re.match(r'^(\d+)([{}])$'.format(''.join(DURATION_UNITS)), duration or '')
+    if not match:
+        raise CLIError("Invalid duration '{}'. Use a number followed by 'd', 'h' or 'm', e.g. '30d'.".format(
+            duration))
+    return timedelta(**{DURATION_UNITS[match.group(2)]: int(match.group(1))})
+
+
+def _filter_manifests_to_purge(manifests, cutoff, tag_regex, untagged):
+    """Return the manifests matching the purge filters. A tagged manifest matches the tag filter only if all its
+    tags match, so that it isn't deleted from under a tag which is kept.
+    """
+    from dateutil.parser import parse
+    from dateutil.tz import tzutc
+
+    for manifest in manifests:
+        attributes = manifest.get('changeableAttributes') or {}
+        if attributes.get('deleteEnabled') is False or not manifest.get('digest'):
+            continue
+        if cutoff:
+            last_update = manifest.get('lastUpdateTime')
+            if not last_update or parse(last_update) >= cutoff.replace(tzinfo=tzutc()):
+                continue
+        tags = manifest.get('tags') or []
+        if tag_regex or untagged:
+            matches_tags = bool(tag_regex) and bool(tags) and all(tag_regex.match(tag) for tag in tags)
+            if not matches_tags and not (untagged and not tags):
+                continue
+        yield manifest
+
+
 def _validate_parameters(repository, image):
     if bool(repository) == bool(image):
         raise CLIError('Usage error: --image IMAGE | --repository REPOSITORY')
@@ -4,8 +4,6 @@
 # --------------------------------------------------------------------------------------------
 
 import os
-import uuid
-import tempfile
 from knack.log import get_logger
 from knack.util import CLIError
 from azure.cli.core.commands import LongRunningOperation
@@ -34,7 +32,8 @@ def acr_run(cmd,  # pylint: disable=too-many-locals
             timeout=None,
             resource_group_name=None,
             os_type=None,
-            platform=None):
+            platform=None,
+            log_file=None):
 
     _, resource_group_name = validate_managed_registry(
         cmd, registry_name, resource_group_name, RUN_NOT_SUPPORTED)
@@ -46,22 +45,12 @@ def acr_run(cmd,  # pylint: disable=too-many-locals
             raise CLIError(
                 "Source location should be a local directory path or remote URL.")
 
-        tar_file_path = os.path.join(tempfile.gettempdir(
-        ), 'run_archive_{}.tar.gz'.format(uuid.uuid4().hex))
-
         try:
             source_location = upload_source_code(
                 client_registries, registry_name, resource_group_name,
-                source_location, tar_file_path, "", "")
+                source_location, None, "", "")
         except Exception as err:
             raise CLIError(err)
-        finally:
-            try:
-                logger.debug(
-                    "Deleting the archived source code from '%s'...", tar_file_path)
-                os.remove(tar_file_path)
-            except OSError:
-                pass
     else:
         source_location = check_remote_source_code(source_location)
         logger.warning("Sending context to registry: %s...", registry_name)
@@ -99,4 +88,4 @@ def acr_run(cmd,  # pylint: disable=too-many-locals
         from ._run_polling import get_run_with_polling
         return get_run_with_polling(cmd, client, run_id, registry_name, resource_group_name)
 
-    return stream_logs(client, run_id, registry_name, resource_group_name, no_format, True)
+    return stream_logs(client, run_id, registry_name, resource_group_name, no_format, True, log_file)
@@ -380,7 +380,8 @@ def acr_task_run(cmd,
                  set_secret=None,
                  no_logs=False,
                  no_wait=False,
-                 resource_group_name=None):
+                 resource_group_name=None,
+                 log_file=None):
     _, resource_group_name = validate_managed_registry(
         cmd, registry_name, resource_group_name, TASK_NOT_SUPPORTED)
 
@@ -411,7 +412,7 @@ def acr_task_run(cmd,
         from ._run_polling import get_run_with_polling
         return get_run_with_polling(cmd, client, run_id, registry_name, resource_group_name)
 
-    return stream_logs(client, run_id, registry_name, resource_group_name, True)
+    return stream_logs(client, run_id, registry_name, resource_group_name, True, log_file=log_file)
 
 
 def acr_task_show_run(cmd,
@@ -482,7 +483,8 @@ def acr_task_logs(cmd,
                   run_id=None,
                   task_name=None,
                   image=None,
-                  resource_group_name=None):
+                  resource_group_name=None,
+                  log_file=None):
     _, resource_group_name = validate_managed_registry(
         cmd, registry_name, resource_group_name, TASK_NOT_SUPPORTED)
 
@@ -505,7 +507,7 @@ def acr_task_logs(cmd,
                                                   task_name=task_name,
                                                   image=image))
 
-    return stream_logs(client, run_id, registry_name, resource_group_name)
+    return stream_logs(client, run_id, registry_name, resource_group_name, log_file=log_file)
 
 
 def _get_list_runs_message(base_message, task_name=None, image=None):
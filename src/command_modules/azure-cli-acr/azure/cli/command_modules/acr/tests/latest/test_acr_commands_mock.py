@@ -20,7 +20,8 @@ from azure.cli.command_modules.acr.repository import (
     acr_repository_show_manifests,
     acr_repository_show,
     acr_repository_delete,
-    acr_repository_untag
+    acr_repository_untag,
+    acr_repository_purge
 )
 from azure.cli.command_modules.acr.helm import (
     acr_helm_list,
@@ -35,7 +36,13 @@ from azure.cli.command_modules.acr._docker_utils import (
     EMPTY_GUID
 )
 from azure.cli.command_modules.acr._docker_utils import ResourceNotFound
+from azure.cli.command_modules.acr._stream_utils import _stream_logs
+from azure.cli.command_modules.acr._archive_utils import (
+    upload_source_code,
+    _ParallelGzipWriter
+)
 from azure.cli.core.mock import DummyCli
+from knack.util import CLIError
 
 
 TEST_TENANT = 'testtenant'
@@ -49,7 +56,7 @@ TEST_REPOSITORY = 'testrepository'
 class AcrMockCommandsTests(unittest.TestCase):
 
     @mock.patch('azure.cli.command_modules.acr.repository.get_access_credentials', autospec=True)
-    @mock.patch('requests.request', autospec=True)
+    @mock.patch('requests.Session.request', autospec=True)
     def test_repository_list(self, mock_requests_get, mock_get_access_credentials):
         cmd = self._setup_cmd()
 
@@ -63,6 +70,7 @@ class AcrMockCommandsTests(unittest.TestCase):
         mock_get_access_credentials.return_value = 'testregistry.azurecr.io', 'username', 'password'
         acr_repository_list(cmd, 'testregistry')
         mock_requests_get.assert_called_with(
+            mock.ANY,
             method='get',
             url='https://testregistry.azurecr.io/v2/_catalog',
             headers=get_authorization_header('username', 'password'),
@@ -77,6 +85,7 @@ class AcrMockCommandsTests(unittest.TestCase):
         mock_get_access_credentials.return_value = 'testregistry.azurecr.io', EMPTY_GUID, 'password'
         acr_repository_list(cmd, 'testregistry', top=10)
         mock_requests_get.assert_called_with(
+            mock.ANY,
             method='get',
             url='https://testregistry.azurecr.io/v2/_catalog',
             headers=get_authorization_header(EMPTY_GUID, 'password'),
@@ -88,7 +97,7 @@ class AcrMockCommandsTests(unittest.TestCase):
             verify=mock.ANY)
 
     @mock.patch('azure.cli.command_modules.acr.repository.get_access_credentials', autospec=True)
-    @mock.patch('requests.request', autospec=True)
+    @mock.patch('requests.Session.request', autospec=True)
     def test_repository_show_tags(self, mock_requests_get, mock_get_access_credentials):
         cmd = self._setup_cmd()
 
@@ -114,6 +123,7 @@ class AcrMockCommandsTests(unittest.TestCase):
 
         acr_repository_show_tags(cmd, 'testregistry', 'testrepository')
         mock_requests_get.assert_called_with(
+            mock.ANY,
             method='get',
             url='https://testregistry.azurecr.io/acr/v1/testrepository/_tags',
             headers=get_authorization_header('username', 'password'),
@@ -131,6 +141,7 @@ class AcrMockCommandsTests(unittest.TestCase):
 
         acr_repository_show_tags(cmd, 'testregistry', 'testrepository', top=10, orderby='time_desc', detail=True)
         mock_requests_get.assert_called_with(
+            mock.ANY,
             method='get',
             url='https://testregistry.azurecr.io/acr/v1/testrepository/_tags',
             headers=get_authorization_header(EMPTY_GUID, 'password'),
@@ -142,7 +153,55 @@ class AcrMockCommandsTests(unittest.TestCase):
             verify=mock.ANY)
 
     @mock.patch('azure.cli.command_modules.acr.repository.get_access_credentials', autospec=True)
-    @mock.patch('requests.request', autospec=True)
+    @mock.patch('requests.Session.request', autospec=True)
+    def test_repository_show_tags_multiple_repositories(self, mock_requests_get, mock_get_access_credentials):
+        cmd = self._setup_cmd()
+
+        def _request(_, method, url, params, **kwargs):
+            # each repository has 3 tags, returned 2 per page at most
+            repository = url.split('/')[-2]
+            start = int(params.get('last', 0))
+            end = min(start + 2, 3)
+            response = mock.MagicMock()
+            response.status_code = 200
+            response.headers = {}
+            if end < 3:
+                response.headers['link'] = '</acr/v1/{}/_tags?last={}&n={}>; rel="next"'.format(
+                    repository, end, params['n'])
+            response.json.return_value = {
+                'tags': [{'name': '{}-{}'.format(repository, i)} for i in range(start, end)]
+            }
+            return response
+
+        mock_requests_get.side_effect = _request
+        mock_get_access_credentials.return_value = 'testregistry.azurecr.io', 'username', 'password'
+
+        result = acr_repository_show_tags(cmd, 'testregistry', ['repo1', 'repo2'])
+        self.assertEqual(result, [
+            {'repository': 'repo1', 'tags': ['repo1-0', 'repo1-1', 'repo1-2']},
+            {'repository': 'repo2', 'tags': ['repo2-0', 'repo2-1', 'repo2-2']}
+        ])
+        self.assertEqual(mock_requests_get.call_count, 4)
+        mock_requests_get.assert_any_call(
+            mock.ANY,
+            method='get',
+            url='https://testregistry.azurecr.io/acr/v1/repo2/_tags',
+            headers=get_authorization_header('username', 'password'),
+            params={
+                'n': 1000,
+                'orderby': None
+            },
+            json=None,
+            verify=mock.ANY)
+
+        # A single repository keeps the schema of the results, and top counts the items received
+        mock_requests_get.reset_mock()
+        result = acr_repository_show_tags(cmd, 'testregistry', ['repo1'], top=3)
+        self.assertEqual(result, ['repo1-0', 'repo1-1', 'repo1-2'])
+        self.assertEqual(mock_requests_get.call_count, 2)
+
+    @mock.patch('azure.cli.command_modules.acr.repository.get_access_credentials', autospec=True)
+    @mock.patch('requests.Session.request', autospec=True)
     def test_repository_show_manifests(self, mock_requests_get, mock_get_access_credentials):
         cmd = self._setup_cmd()
 
@@ -165,6 +224,7 @@ class AcrMockCommandsTests(unittest.TestCase):
 
         acr_repository_show_manifests(cmd, 'testregistry', 'testrepository')
         mock_requests_get.assert_called_with(
+            mock.ANY,
             method='get',
             url='https://testregistry.azurecr.io/acr/v1/testrepository/_manifests',
             headers=get_authorization_header('username', 'password'),
@@ -180,6 +240,7 @@ class AcrMockCommandsTests(unittest.TestCase):
 
         acr_repository_show_manifests(cmd, 'testregistry', 'testrepository', top=10, orderby='time_desc', detail=True)
         mock_requests_get.assert_called_with(
+            mock.ANY,
             method='get',
             url='https://testregistry.azurecr.io/acr/v1/testrepository/_manifests',
             headers=get_authorization_header(EMPTY_GUID, 'password'),
@@ -191,7 +252,7 @@ class AcrMockCommandsTests(unittest.TestCase):
             verify=mock.ANY)
 
     @mock.patch('azure.cli.command_modules.acr.repository.get_access_credentials', autospec=True)
-    @mock.patch('requests.request', autospec=True)
+    @mock.patch('requests.Session.request', autospec=True)
     def test_repository_show(self, mock_requests_get, mock_get_access_credentials):
         cmd = self._setup_cmd()
 
@@ -211,6 +272,7 @@ class AcrMockCommandsTests(unittest.TestCase):
                             registry_name='testregistry',
                             repository='testrepository')
         mock_requests_get.assert_called_with(
+            mock.ANY,
             method='get',
             url='https://testregistry.azurecr.io/acr/v1/testrepository',
             headers=get_authorization_header('username', 'password'),
@@ -223,6 +285,7 @@ class AcrMockCommandsTests(unittest.TestCase):
                             registry_name='testregistry',
                             image='testrepository:testtag')
         mock_requests_get.assert_called_with(
+            mock.ANY,
             method='get',
             url='https://testregistry.azurecr.io/acr/v1/testrepository/_tags/testtag',
             headers=get_authorization_header('username', 'password'),
@@ -235,6 +298,7 @@ class AcrMockCommandsTests(unittest.TestCase):
                             registry_name='testregistry',
                             image='testrepository@sha256:c5515758d4c5e1e838e9cd307f6c6a0d620b5e07e6f927b07d05f6d12a1ac8d7')
         mock_requests_get.assert_called_with(
+            mock.ANY,
             method='get',
             url='https://testregistry.azurecr.io/acr/v1/testrepository/_manifests/sha256:c5515758d4c5e1e838e9cd307f6c6a0d620b5e07e6f927b07d05f6d12a1ac8d7',
             headers=get_authorization_header('username', 'password'),
@@ -244,7 +308,7 @@ class AcrMockCommandsTests(unittest.TestCase):
 
     @mock.patch('azure.cli.command_modules.acr.repository.get_access_credentials', autospec=True)
     @mock.patch('azure.cli.command_modules.acr.repository._get_manifest_digest', autospec=True)
-    @mock.patch('requests.request', autospec=True)
+    @mock.patch('requests.Session.request', autospec=True)
     def test_repository_delete(self, mock_requests_delete, mock_get_manifest_digest, mock_get_access_credentials):
         cmd = self._setup_cmd()
 
@@ -262,6 +326,7 @@ class AcrMockCommandsTests(unittest.TestCase):
                               repository='testrepository',
                               yes=True)
         mock_requests_delete.assert_called_with(
+            mock.ANY,
             method='delete',
             url='https://testregistry.azurecr.io/acr/v1/testrepository',
             headers=get_authorization_header('username', 'password'),
@@ -275,6 +340,7 @@ class AcrMockCommandsTests(unittest.TestCase):
                               image='testrepository:testtag',
                               yes=True)
         mock_requests_delete.assert_called_with(
+            mock.ANY,
             method='delete',
             url='https://testregistry.azurecr.io/v2/testrepository/manifests/sha256:c5515758d4c5e1e838e9cd307f6c6a0d620b5e07e6f927b07d05f6d12a1ac8d7',
             headers=get_authorization_header('username', 'password'),
@@ -288,6 +354,7 @@ class AcrMockCommandsTests(unittest.TestCase):
                               image='testrepository@sha256:c5515758d4c5e1e838e9cd307f6c6a0d620b5e07e6f927b07d05f6d12a1ac8d7',
                               yes=True)
         mock_requests_delete.assert_called_with(
+            mock.ANY,
             method='delete',
             url='https://testregistry.azurecr.io/v2/testrepository/manifests/sha256:c5515758d4c5e1e838e9cd307f6c6a0d620b5e07e6f927b07d05f6d12a1ac8d7',
             headers=get_authorization_header('username', 'password'),
@@ -300,6 +367,7 @@ class AcrMockCommandsTests(unittest.TestCase):
                              registry_name='testregistry',
                              image='testrepository:testtag')
         mock_requests_delete.assert_called_with(
+            mock.ANY,
             method='delete',
             url='https://testregistry.azurecr.io/acr/v1/testrepository/_tags/testtag',
             headers=get_authorization_header('username', 'password'),
@@ -307,6 +375,118 @@ class AcrMockCommandsTests(unittest.TestCase):
             json=None,
             verify=mock.ANY)
 
+    @mock.patch('azure.cli.command_modules.acr.repository.get_access_credentials', autospec=True)
+    @mock.patch('requests.Session.request', autospec=True)
+    def test_repository_purge(self, mock_requests, mock_get_access_credentials):
+        cmd = self._setup_cmd()
+
+        manifests = [
+            {'digest': 'sha256:1', 'tags': ['v2']},
+            {'digest': 'sha256:2', 'tags': ['dev-2']},
+            {'digest': 'sha256:3', 'tags': ['dev-1', 'v1']},
+            {'digest': 'sha256:4', 'lastUpdateTime': '2018-07-12T18:09:14.5787214Z'},
+            {'digest': 'sha256:5', 'changeableAttributes': {'deleteEnabled': False}},
+            {'digest': 'sha256:6', 'tags': ['dev-0']}
+        ]
+
+        def _request(_, method, url, **kwargs):
+            response = mock.MagicMock()
+            response.headers = {}
+            response.status_code = 200
+            if method == 'get':
+                response.json.return_value = {'manifests': manifests}
+            elif url.endswith('sha256:6'):
+                response.status_code = 404
+                response.text = ''
+            return response
+
+        mock_requests.side_effect = _request
+        mock_get_access_credentials.return_value = 'testregistry.azurecr.io', 'username', 'password'
+
+        # Dry run doesn't delete anything
+        result = acr_repository_purge(cmd,
+                                      registry_name='testregistry',
+                                      repositories=['testrepository'],
+                                      tag_filter='dev-[0-9]+',
+                                      untagged=True,
+                                      dry_run=True)
+        self.assertEqual([item['digest'] for item in result], ['sha256:2', 'sha256:4', 'sha256:6'])
+        self.assertTrue(all(item['status'] == 'dryRun' for item in result))
+        mock_requests.assert_called_once_with(
+            mock.ANY,
+            method='get',
+            url='https://testregistry.azurecr.io/acr/v1/testrepository/_manifests',
+            headers=get_authorization_header('username', 'password'),
+            params={
+                'n': 100,
+                'orderby': 'timedesc'
+            },
+            json=None,
+            verify=mock.ANY)
+
+        result = acr_repository_purge(cmd,
+                                      registry_name='testregistry',
+                                      repositories=['testrepository'],
+                                      older_than='30d',
+                                      dry_run=True)
+        self.assertEqual([item['digest'] for item in result], ['sha256:4'])
+
+        # Keep the 2 most recent manifests and delete the others matching the filters
+        mock_requests.reset_mock()
+        result = acr_repository_purge(cmd,
+                                      registry_name='testregistry',
+                                      repositories=['testrepository'],
+                                      tag_filter='dev-[0-9]+',
+                                      untagged=True,
+                                      keep=2,
+                                      yes=True)
+        self.assertEqual([(item['digest'], item['status']) for item in result],
+                         [('sha256:4', 'deleted'), ('sha256:6', 'failed')])
+        mock_requests.assert_any_call(
+            mock.ANY,
+            method='delete',
+            url='https://testregistry.azurecr.io/v2/testrepository/manifests/sha256:4',
+            headers=get_authorization_header('username', 'password'),
+            params=None,
+            json=None,
+            verify=mock.ANY)
+        self.assertEqual(mock_requests.call_count, 3)
+
+        # At least one filter is required
+        with self.assertRaises(CLIError):
+            acr_repository_purge(cmd, registry_name='testregistry', repositories=['testrepository'])
+
+    @mock.patch('azure.cli.command_modules.acr.repository.get_access_credentials', autospec=True)
+    @mock.patch('requests.Session.request', autospec=True)
+    def test_repository_purge_lists_repositories_concurrently(self, mock_requests, mock_get_access_credentials):
+        import threading
+        cmd = self._setup_cmd()
+        repositories = ['repo{}'.format(i) for i in range(4)]
+        listing = {repository: threading.Event() for repository in repositories}
+
+        def _request(_, method, url, **kwargs):
+            repository = url.split('/')[-2]
+            listing[repository].set()
+            # the listing of each repository waits for the listing of the last one
+            if not listing[repositories[-1]].wait(10):
+                raise AssertionError('the repositories are listed one after the other')
+            response = mock.MagicMock()
+            response.headers = {}
+            response.status_code = 200
+            response.json.return_value = {'manifests': [{'digest': 'sha256:' + repository}]}
+            return response
+
+        mock_requests.side_effect = _request
+        mock_get_access_credentials.return_value = 'testregistry.azurecr.io', 'username', 'password'
+
+        result = acr_repository_purge(cmd,
+                                      registry_name='testregistry',
+                                      repositories=repositories,
+                                      untagged=True,
+                                      dry_run=True,
+                                      concurrency=4)
+        self.assertEqual([item['digest'] for item in result], ['sha256:' + r for r in repositories])
+
     @mock.patch('azure.cli.command_modules.acr._docker_utils.get_registry_by_name', autospec=True)
     @mock.patch('requests.post', autospec=True)
     @mock.patch('requests.get', autospec=True)
@@ -357,6 +537,62 @@ class AcrMockCommandsTests(unittest.TestCase):
                                    login_server=test_login_server_with_tenant_suffix,
                                    tenant_suffix=test_tenant_suffix)
 
+    @mock.patch('requests.post', autospec=True)
+    @mock.patch('requests.get', autospec=True)
+    @mock.patch('azure.cli.core._profile.Profile.get_raw_token', autospec=True)
+    def test_get_aad_token_cached(self, mock_get_raw_token, mock_requests_get, mock_requests_post):
+        import base64
+        import os
+        import shutil
+        import tempfile
+        import time
+        from azure.cli.command_modules.acr._docker_utils import _get_aad_token, TOKEN_CACHE_DIR_NAME
+
+        def _jwt(claims):
+            return 'header.{}.signature'.format(
+                base64.urlsafe_b64encode(json.dumps(claims).encode()).decode().rstrip('='))
+
+        config_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, config_dir)
+        login_server = 'testregistry.azurecr.io'
+        cli_ctx = DummyCli()
+        self._setup_mock_token_requests(mock_get_raw_token, mock_requests_get, mock_requests_post, login_server)
+        mock_get_raw_token.return_value = ('Bearer', _jwt({'oid': 'testobjectid'}), {}), TEST_SUBSCRIPTION, TEST_TENANT
+        refresh_token, access_token = _jwt({'exp': time.time() + 3600}), _jwt({'exp': time.time() + 3600})
+        mock_requests_post.return_value.content = json.dumps({
+            'refresh_token': refresh_token,
+            'access_token': access_token}).encode()
+
+        with mock.patch.dict(os.environ, {'AZURE_CONFIG_DIR': config_dir}):
+            self.assertEqual(access_token,
+                             _get_aad_token(cli_ctx, login_server, False, TEST_REPOSITORY, permission='*'))
+            self.assertEqual(mock_requests_get.call_count, 1)
+            self.assertEqual(mock_requests_post.call_count, 2)
+
+            # the access token is reused
+            self.assertEqual(access_token,
+                             _get_aad_token(cli_ctx, login_server, False, TEST_REPOSITORY, permission='*'))
+            self.assertEqual(mock_requests_get.call_count, 1)
+            self.assertEqual(mock_requests_post.call_count, 2)
+
+            # but not the refresh token for docker, which is always a new one
+            self.assertEqual(_get_aad_token(cli_ctx, login_server, True), refresh_token)
+            self.assertEqual(mock_requests_get.call_count, 2)
+            self.assertEqual(mock_requests_post.call_count, 3)
+
+            # another scope only needs an access token
+            _get_aad_token(cli_ctx, login_server, False, 'otherrepository', permission='pull')
+            self.assertEqual(mock_requests_get.call_count, 2)
+            self.assertEqual(mock_requests_post.call_count, 4)
+            self.assertIn('scope=repository%3Aotherrepository%3Apull', mock_requests_post.call_args[0][1])
+
+        cache_dir = os.path.join(config_dir, TOKEN_CACHE_DIR_NAME)
+        # the refresh token and the access tokens of the two scopes, in files of their own
+        self.assertEqual(len(os.listdir(cache_dir)), 3)
+        if os.name != 'nt':
+            for name in os.listdir(cache_dir):
+                self.assertEqual(os.stat(os.path.join(cache_dir, name)).st_mode & 0o777, 0o600)
+
     def _core_token_scenarios(self, mock_get_raw_token, mock_requests_get, mock_requests_post, mock_get_registry_by_name, registry_exists, registry_name, login_server, tenant_suffix):
         cmd = self._setup_cmd()
 
@@ -429,7 +665,7 @@ class AcrMockCommandsTests(unittest.TestCase):
             verify=mock.ANY)
 
     @mock.patch('azure.cli.command_modules.acr.helm.get_access_credentials', autospec=True)
-    @mock.patch('requests.request', autospec=True)
+    @mock.patch('requests.Session.request', autospec=True)
     def test_helm_list(self, mock_requests_get, mock_get_access_credentials):
         cmd = self._setup_cmd()
 
@@ -458,6 +694,7 @@ class AcrMockCommandsTests(unittest.TestCase):
         mock_get_access_credentials.return_value = 'testregistry.azurecr.io', EMPTY_GUID, 'password'
         acr_helm_list(cmd, 'testregistry', repository='testrepository')
         mock_requests_get.assert_called_with(
+            mock.ANY,
             method='get',
             url='https://testregistry.azurecr.io/helm/v1/testrepository/_charts',
             headers=get_authorization_header(EMPTY_GUID, 'password'),
@@ -466,7 +703,7 @@ class AcrMockCommandsTests(unittest.TestCase):
             verify=mock.ANY)
 
     @mock.patch('azure.cli.command_modules.acr.helm.get_access_credentials', autospec=True)
-    @mock.patch('requests.request', autospec=True)
+    @mock.patch('requests.Session.request', autospec=True)
     def test_helm_show(self, mock_requests_get, mock_get_access_credentials):
         cmd = self._setup_cmd()
 
@@ -491,6 +728,7 @@ class AcrMockCommandsTests(unittest.TestCase):
         # Show all versions of a chart
         acr_helm_show(cmd, 'testregistry', 'mychart1', repository='testrepository')
         mock_requests_get.assert_called_with(
+            mock.ANY,
             method='get',
             url='https://testregistry.azurecr.io/helm/v1/testrepository/_charts/mychart1',
             headers=get_authorization_header(EMPTY_GUID, 'password'),
@@ -501,6 +739,7 @@ class AcrMockCommandsTests(unittest.TestCase):
         # Show one version of a chart
         acr_helm_show(cmd, 'testregistry', 'mychart1', version='0.2.1', repository='testrepository')
         mock_requests_get.assert_called_with(
+            mock.ANY,
             method='get',
             url='https://testregistry.azurecr.io/helm/v1/testrepository/_charts/mychart1/0.2.1',
             headers=get_authorization_header(EMPTY_GUID, 'password'),
@@ -509,7 +748,7 @@ class AcrMockCommandsTests(unittest.TestCase):
             verify=mock.ANY)
 
     @mock.patch('azure.cli.command_modules.acr.helm.get_access_credentials', autospec=True)
-    @mock.patch('requests.request', autospec=True)
+    @mock.patch('requests.Session.request', autospec=True)
     def test_helm_delete(self, mock_requests_get, mock_get_access_credentials):
         cmd = self._setup_cmd()
 
@@ -523,6 +762,7 @@ class AcrMockCommandsTests(unittest.TestCase):
         # Delete all versions of a chart
         acr_helm_delete(cmd, 'testregistry', 'mychart1', repository='testrepository', yes=True)
         mock_requests_get.assert_called_with(
+            mock.ANY,
             method='delete',
             url='https://testregistry.azurecr.io/helm/v1/testrepository/_charts/mychart1',
             headers=get_authorization_header(EMPTY_GUID, 'password'),
@@ -533,6 +773,7 @@ class AcrMockCommandsTests(unittest.TestCase):
         # Delete one version of a chart
         acr_helm_delete(cmd, 'testregistry', 'mychart1', version='0.2.1', repository='testrepository', yes=True)
         mock_requests_get.assert_called_with(
+            mock.ANY,
             method='delete',
             url='https://testregistry.azurecr.io/helm/v1/testrepository/_blobs/mychart1-0.2.1.tgz',
             headers=get_authorization_header(EMPTY_GUID, 'password'),
@@ -541,7 +782,7 @@ class AcrMockCommandsTests(unittest.TestCase):
             verify=mock.ANY)
 
     @mock.patch('azure.cli.command_modules.acr.helm.get_access_credentials', autospec=True)
-    @mock.patch('requests.request', autospec=True)
+    @mock.patch('requests.Session.request', autospec=True)
     def test_helm_push(self, mock_requests_get, mock_get_access_credentials):
         cmd = self._setup_cmd()
 
@@ -559,6 +800,7 @@ class AcrMockCommandsTests(unittest.TestCase):
             mock_open.return_value = mock.MagicMock()
             acr_helm_push(cmd, 'testregistry', './charts/mychart1-0.2.1.tgz', repository='testrepository')
             mock_requests_get.assert_called_with(
+                mock.ANY,
                 method='put',
                 url='https://testregistry.azurecr.io/helm/v1/testrepository/_blobs/mychart1-0.2.1.tgz',
                 headers=get_authorization_header(EMPTY_GUID, 'password'),
@@ -571,6 +813,7 @@ class AcrMockCommandsTests(unittest.TestCase):
             mock_open.return_value = mock.MagicMock()
             acr_helm_push(cmd, 'testregistry', 'mychart1-0.2.1.tgz.prov', repository='testrepository')
             mock_requests_get.assert_called_with(
+                mock.ANY,
                 method='put',
                 url='https://testregistry.azurecr.io/helm/v1/testrepository/_blobs/mychart1-0.2.1.tgz.prov',
                 headers=get_authorization_header(EMPTY_GUID, 'password'),
@@ -583,6 +826,7 @@ class AcrMockCommandsTests(unittest.TestCase):
             mock_open.return_value = mock.MagicMock()
             acr_helm_push(cmd, 'testregistry', './charts/mychart1-0.2.1.tgz', repository='testrepository', force=True)
             mock_requests_get.assert_called_with(
+                mock.ANY,
                 method='patch',
                 url='https://testregistry.azurecr.io/helm/v1/testrepository/_blobs/mychart1-0.2.1.tgz',
                 headers=get_authorization_header(EMPTY_GUID, 'password'),
@@ -590,6 +834,112 @@ class AcrMockCommandsTests(unittest.TestCase):
                 data=mock_open.return_value.__enter__.return_value,
                 verify=mock.ANY)
 
+    def test_parallel_gzip_writer(self):
+        from concurrent.futures import ThreadPoolExecutor
+        import gzip
+        import io
+
+        output = io.BytesIO()
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            writer = _ParallelGzipWriter(output, executor, chunk_size=16)
+            for i in range(100):
+                writer.write('line {}\n'.format(i).encode())
+            writer.close()
+
+        expected = b''.join('line {}\n'.format(i).encode() for i in range(100))
+        self.assertEqual(gzip.GzipFile(fileobj=io.BytesIO(output.getvalue())).read(), expected)
+
+    @mock.patch('azure.cli.command_modules.acr._archive_utils.BlockBlobService', autospec=True)
+    @mock.patch('azure.cli.command_modules.acr._archive_utils.UPLOAD_BLOCK_SIZE', 1024)
+    def test_upload_source_code(self, mock_blob_service):
+        import base64
+        import gzip
+        import io
+        import os
+        import shutil
+        import tarfile
+        import tempfile
+
+        source_location = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, source_location)
+        files = {
+            '.dockerignore': 'node_modules\nlogs\n!logs/keep.log\n',
+            'Dockerfile': 'FROM scratch',
+            'app.py': base64.b64encode(os.urandom(6000)).decode(),
+            '.git/config': '',
+            'node_modules/lib/index.js': '',
+            'logs/keep.log': '',
+            'logs/debug.log': ''
+        }
+        for name, content in files.items():
+            path = os.path.join(source_location, *name.split('/'))
+            if not os.path.isdir(os.path.dirname(path)):
+                os.makedirs(os.path.dirname(path))
+            with open(path, 'w') as f:
+                f.write(content)
+
+        blocks = {}
+
+        def _put_block(container_name, blob_name, block, block_id):
+            blocks[block_id] = block
+
+        mock_blob_service.return_value.put_block.side_effect = _put_block
+        client = mock.MagicMock()
+        client.get_build_source_upload_url.return_value.upload_url = \
+            'https://myaccount.blob.core.windows.net/container/source.tar.gz?sv=token'
+        client.get_build_source_upload_url.return_value.relative_path = 'source.tar.gz'
+
+        with mock.patch('os.listdir', side_effect=os.listdir) as mock_listdir:
+            relative_path = upload_source_code(client, 'testregistry', 'testrg', source_location, None,
+                                               os.path.join(source_location, 'Dockerfile'), 'Dockerfile_1')
+        self.assertEqual(relative_path, 'source.tar.gz')
+
+        # ignored dirs are not scanned unless an exception rule may include their child items
+        listed = [os.path.relpath(call[0][0], source_location) for call in mock_listdir.call_args_list]
+        self.assertIn('logs', listed)
+        self.assertNotIn('node_modules', listed)
+        self.assertNotIn('.git', listed)
+
+        block_list = mock_blob_service.return_value.put_block_list.call_args[1]['block_list']
+        self.assertGreater(len(block_list), 1)
+        content = b''.join(blocks[block.id] for block in block_list)
+        with tarfile.open(fileobj=io.BytesIO(gzip.GzipFile(fileobj=io.BytesIO(content)).read())) as tar:
+            names = tar.getnames()
+        self.assertEqual(sorted(n for n in names if n), sorted(
+            ['.dockerignore', 'Dockerfile', 'Dockerfile_1', 'app.py', 'logs/keep.log']))
+
+    def test_stream_logs(self):
+        import os
+        import shutil
+        import tempfile
+
+        logs = ''.join('Step {}/300 : RUN make\r\n'.format(i) for i in range(300)).encode() + b'Run failed'
+        blob_service = mock.MagicMock()
+        blob_service.get_blob_properties.return_value.metadata = {'Complete': 'failed'}
+        blob_service.get_blob_properties.return_value.properties.content_length = len(logs)
+
+        def _get_blob_to_bytes(container_name, blob_name, start_range, end_range):
+            return mock.MagicMock(content=logs[start_range:end_range + 1])
+
+        blob_service.get_blob_to_bytes.side_effect = _get_blob_to_bytes
+
+        # The logs are printed line by line, reading all the available logs at once
+        with mock.patch('azure.cli.command_modules.acr._stream_utils.MAX_CHUNK_SIZE', 4096):
+            with mock.patch('azure.cli.command_modules.acr._stream_utils.print', create=True) as mock_print:
+                with self.assertRaises(CLIError):
+                    _stream_logs(True, 1024, 60, blob_service, 'container', 'blob', True)
+        printed = '\n'.join(call[0][0] for call in mock_print.call_args_list)
+        self.assertEqual(printed, logs.decode())
+        self.assertEqual(blob_service.get_blob_to_bytes.call_count, (len(logs) + 4095) // 4096)
+
+        # The raw logs are written to a file
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+        log_file = os.path.join(temp_dir, 'run.log')
+        _stream_logs(True, 1024, 60, blob_service, 'container', 'blob', False, log_file)
+        with open(log_file, 'rb') as f:
+            self.assertEqual(f.read(), logs)
+
     def _setup_cmd(self):
         cmd = mock.MagicMock()
         cmd.cli_ctx = DummyCli()
@@ -5,13 +5,24 @@
 # --------------------------------------------------------------------------------------------
 
 import os
-import zipfile
+from knack.log import get_logger
 from azure.cli.core.commands.client_factory import get_mgmt_service_client
 from azure.mgmt.resource.resources.models import ResourceGroup
 from ._constants import (NETCORE_VERSION_DEFAULT, NETCORE_VERSIONS, NODE_VERSION_DEFAULT,
                          NODE_VERSIONS, NETCORE_RUNTIME_NAME, NODE_RUNTIME_NAME, DOTNET_RUNTIME_NAME,
                          DOTNET_VERSION_DEFAULT, DOTNET_VERSIONS, STATIC_RUNTIME_NAME,
                          PYTHON_RUNTIME_NAME, PYTHON_VERSION_DEFAULT, LINUX_SKU_DEFAULT)
+from ._zip_utils import write_zip
+
+logger = get_logger(__name__)
+
+DEPLOYMENT_MANIFEST_DIR_NAME = 'webappDeployments'
+# files which the build of an app depends on, so that all the files are deployed again when they change
+BUILD_MANIFEST_FILE_NAMES = {
+    'package.json', 'package-lock.json', 'yarn.lock', 'requirements.txt', 'setup.py', 'pipfile', 'pipfile.lock',
+    'pyproject.toml', 'composer.json', 'composer.lock', 'pom.xml', 'build.gradle', 'global.json'
+}
+BUILD_MANIFEST_FILE_EXTENSIONS = {'.csproj', '.fsproj', '.vbproj', '.sln'}
 
 
 def _resource_client_factory(cli_ctx, **_):
@@ -25,29 +36,104 @@ def web_client_factory(cli_ctx, **_):
 
 
 def zip_contents_from_dir(dirPath, lang):
-    relroot = os.path.abspath(os.path.join(dirPath, os.pardir))
-    path_and_file = os.path.splitdrive(dirPath)[1]
-    file_val = os.path.split(path_and_file)[1]
-    zip_file_path = relroot + os.path.sep + file_val + ".zip"
-    abs_src = os.path.abspath(dirPath)
-    with zipfile.ZipFile("{}".format(zip_file_path), "w", zipfile.ZIP_DEFLATED) as zf:
-        for dirname, subdirs, files in os.walk(dirPath):
-            # skip node_modules folder for Node apps,
-            # since zip_deployment will perfom the build operation
-            if lang.lower() == NODE_RUNTIME_NAME and 'node_modules' in subdirs:
-                subdirs.remove('node_modules')
-            elif lang.lower() == NETCORE_RUNTIME_NAME:
-                if 'bin' in subdirs:
-                    subdirs.remove('bin')
-                elif 'obj' in subdirs:
-                    subdirs.remove('obj')
-            for filename in files:
-                absname = os.path.abspath(os.path.join(dirname, filename))
-                arcname = absname[len(abs_src) + 1:]
-                zf.write(absname, arcname)
+    return _zip_files(dirPath, _walk_contents(dirPath, lang))
+
+
+def _zip_files(dirPath, files):
+    """Zip the files to a temporary file named after the directory, and return its path."""
+    import tempfile
+    file_val = os.path.split(os.path.splitdrive(os.path.abspath(dirPath))[1])[1]
+    fd, zip_file_path = tempfile.mkstemp(prefix=file_val + '_', suffix='.zip')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            write_zip(f, files)
+    except Exception:
+        os.remove(zip_file_path)
+        raise
     return zip_file_path
 
 
+def _walk_contents(dirPath, lang):
+    abs_src = os.path.abspath(dirPath)
+    for dirname, subdirs, files in os.walk(dirPath):
+        # skip node_modules folder for Node apps,
+        # since zip_deployment will perfom the build operation
+        if lang.lower() == NODE_RUNTIME_NAME and 'node_modules' in subdirs:
+            subdirs.remove('node_modules')
+        elif lang.lower() == NETCORE_RUNTIME_NAME:
+            if 'bin' in subdirs:
+                subdirs.remove('bin')
+            elif 'obj' in subdirs:
+                subdirs.remove('obj')
+        for filename in files:
+            absname = os.path.abspath(os.path.join(dirname, filename))
+            arcname = absname[len(abs_src) + 1:]
+            yield absname, arcname
+
+
+def get_deployment_manifest(subscription_id, resource_group_name, name, slot=None):
+    """Return the manifest of the files last deployed to the app or slot by 'az webapp up', which maps the path
+    of each file to its size, modification time and SHA-256 hash.
+    """
+    import hashlib
+    from knack.util import ensure_dir
+    from azure.cli.core._environment import get_config_dir
+    from azure.cli.core._session import Session
+
+    key = '/'.join([subscription_id, resource_group_name, name, slot or 'production']).lower()
+    manifest_dir = os.path.join(get_config_dir(), DEPLOYMENT_MANIFEST_DIR_NAME)
+    ensure_dir(manifest_dir)
+    manifest = Session()
+    manifest.load(os.path.join(manifest_dir, '{}.json'.format(hashlib.sha256(key.encode('utf-8')).hexdigest())))
+    return manifest
+
+
+def zip_changed_contents_from_dir(dirPath, lang, deployed_files=None):
+    """Zip the files which are not in deployed_files or changed since, or all the files without deployed_files.
+
+    Files whose size and modification time are unchanged are not hashed again. All the files are zipped when a
+    build manifest, e.g. package.json, changed or was deleted, as the build needs them all. Returns the zip path,
+    or None if no file changed, the manifest entries of all the files and the paths of the deployed files since
+    deleted.
+    """
+    deployed_files = deployed_files or {}
+    files = {}
+    changed = []
+    for absname, arcname in _walk_contents(dirPath, lang):
+        stat = os.stat(absname)
+        # zip paths always use forward slashes
+        path = arcname.replace(os.path.sep, '/')
+        deployed = deployed_files.get(path)
+        if deployed and deployed[0] == stat.st_size and deployed[1] == stat.st_mtime:
+            files[path] = deployed
+            continue
+        files[path] = [stat.st_size, stat.st_mtime, _get_file_hash(absname)]
+        if not deployed or deployed[2] != files[path][2]:
+            changed.append((absname, arcname))
+    deleted = sorted(path for path in deployed_files if path not in files)
+
+    if deployed_files and any(_is_build_manifest(path) for path in deleted + [a for _, a in changed]):
+        logger.warning("The build manifests of the app changed. Deploying all the files ...")
+        changed = list(_walk_contents(dirPath, lang))
+    if not changed:
+        return None, files, deleted
+    return _zip_files(dirPath, changed), files, deleted
+
+
+def _is_build_manifest(path):
+    name = os.path.basename(path).lower()
+    return name in BUILD_MANIFEST_FILE_NAMES or os.path.splitext(name)[1] in BUILD_MANIFEST_FILE_EXTENSIONS
+
+
+def _get_file_hash(file_path):
+    import hashlib
+    sha256 = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            sha256.update(block)
+    return sha256.hexdigest()
+
+
 def get_runtime_version_details(file_path, lang_name):
     version_detected = None
     version_to_create = None
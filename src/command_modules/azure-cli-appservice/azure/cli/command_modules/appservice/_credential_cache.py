@@ -0,0 +1,101 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import hashlib
+import json
+import os
+import time
+
+from knack.log import get_logger
+from knack.util import CLIError
+
+logger = get_logger(__name__)
+
+CREDENTIAL_CACHE_DIR_NAME = 'webappCredentialCache'
+CREDENTIAL_CACHE_KEY_FILE_NAME = '.key'
+CREDENTIAL_CACHE_TTL = 10 * 60  # in seconds
+
+
+class ScmUnauthorizedError(CLIError):
+    """ The scm site of an app rejected its publishing credentials, e.g. as they were reset since cached. """
+    pass
+
+
+def _get_cache_dir():
+    from knack.util import ensure_dir
+    from azure.cli.core._environment import get_config_dir
+    cache_dir = os.path.join(get_config_dir(), CREDENTIAL_CACHE_DIR_NAME)
+    ensure_dir(cache_dir)
+    return cache_dir
+
+
+def _write_private_file(path, content):
+    """ Write the file readable by the owner only, replacing it at once so readers never see a partial file. """
+    temp_path = '{}.{}.tmp'.format(path, os.getpid())
+    with os.fdopen(os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), 'wb') as f:
+        f.write(content)
+    try:
+        os.replace(temp_path, path)
+    except AttributeError:  # Python 2
+        if os.path.exists(path):
+            os.remove(path)
+        os.rename(temp_path, path)
+
+
+def _get_fernet(cache_dir):
+    from cryptography.fernet import Fernet
+    key_path = os.path.join(cache_dir, CREDENTIAL_CACHE_KEY_FILE_NAME)
+    if not os.path.exists(key_path):
+        try:
+            # exclusively, so concurrent commands don't replace the key the other used
+            with os.fdopen(os.open(key_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600), 'wb') as f:
+                f.write(Fernet.generate_key())
+        except (IOError, OSError):
+            pass
+    with open(key_path, 'rb') as f:
+        return Fernet(f.read())
+
+
+def _get_entry_path(cache_dir, key):
+    return os.path.join(cache_dir, hashlib.sha256(key.lower().encode('utf-8')).hexdigest())
+
+
+def get_cached_value(key):
+    """ Return the value cached for the key, or None if there is none or it expired. """
+    try:
+        cache_dir = _get_cache_dir()
+        with open(_get_entry_path(cache_dir, key), 'rb') as f:
+            entry = json.loads(_get_fernet(cache_dir).decrypt(f.read()).decode('utf-8'))
+    except (IOError, OSError):
+        return None
+    except Exception as ex:  # pylint: disable=broad-except
+        logger.debug("Failed to read the credential cache. Exception: %s", str(ex))
+        return None
+    if entry.get('expiresOn', 0) <= time.time():
+        return None
+    return entry['value']
+
+
+def cache_value(key, value):
+    """ Cache the value for CREDENTIAL_CACHE_TTL seconds, encrypted with a key of the cache, in a file of its own so
+    concurrent commands don't overwrite the other entries. The expired entries are removed. """
+    try:
+        cache_dir = _get_cache_dir()
+        now = time.time()
+        content = json.dumps({'value': value, 'expiresOn': now + CREDENTIAL_CACHE_TTL}).encode('utf-8')
+        _write_private_file(_get_entry_path(cache_dir, key), _get_fernet(cache_dir).encrypt(content))
+        for name in os.listdir(cache_dir):
+            path = os.path.join(cache_dir, name)
+            if not name.startswith('.') and os.path.getmtime(path) < now - CREDENTIAL_CACHE_TTL:
+                os.remove(path)
+    except Exception as ex:  # pylint: disable=broad-except
+        logger.debug("Failed to save the credential cache. Exception: %s", str(ex))
+
+
+def invalidate_cached_value(key):
+    try:
+        os.remove(_get_entry_path(_get_cache_dir(), key))
+    except (IOError, OSError):
+        pass
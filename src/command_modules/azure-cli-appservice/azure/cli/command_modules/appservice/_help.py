@@ -402,6 +402,9 @@ examples:
   - name: List all running function apps.
     text: >
         az functionapp list --query "[?state=='Running']"
+  - name: List the runtime stack and always on setting of all function apps.
+    text: >
+        az functionapp list --show-config --query "[].{name: name, linuxFxVersion: siteConfig.linuxFxVersion, alwaysOn: siteConfig.alwaysOn}"
 """
 
 helps['functionapp list-consumption-locations'] = """
@@ -543,6 +546,9 @@ examples:
   - name: Set using both key-value pair and a json file with more settings.
     text: >
         az webapp config appsettings set -g MyResourceGroup -n MyUniqueApp --settings mySetting=value @moreSettings.json
+  - name: Set a setting for all the web apps of a resource group at once, skipping the apps where it is already set.
+    text: >
+        az webapp config appsettings set --settings mySetting=value --ids $(az webapp list -g MyResourceGroup --query "[].id" -o tsv)
 """
 
 helps['webapp config backup'] = """
@@ -1061,6 +1067,9 @@ examples:
   - name: List all running web apps.
     text: >
         az webapp list --query "[?state=='Running']"
+  - name: List the runtime stack and always on setting of all web apps.
+    text: >
+        az webapp list --show-config --query "[].{name: name, linuxFxVersion: siteConfig.linuxFxVersion, alwaysOn: siteConfig.alwaysOn}"
 """
 
 helps['webapp list-runtimes'] = """
@@ -1084,8 +1093,15 @@ examples:
 
 helps['webapp log download'] = """
 type: command
-short-summary: Download a web app's log history as a zip file.
-long-summary: This command may not work with web apps running on Linux.
+short-summary: Download the log history of one or more web apps as zip files.
+long-summary: >
+    This command may not work with web apps running on Linux. Interrupted downloads are resumed, and the logs of
+    several apps are downloaded concurrently.
+examples:
+  - name: Download the log history of a web app.
+    text: az webapp log download --name MyWebapp --resource-group MyResourceGroup --log-file logs.zip
+  - name: Download the log histories of all the web apps of a resource group to logs_<app>.zip files.
+    text: az webapp log download --ids $(az webapp list --resource-group MyResourceGroup --query [].id -o tsv) --log-file logs.zip
 """
 
 helps['webapp log show'] = """
@@ -1095,8 +1111,17 @@ short-summary: Get the details of a web app's logging configuration.
 
 helps['webapp log tail'] = """
 type: command
-short-summary: Start live log tracing for a web app.
-long-summary: This command may not work with web apps running on Linux.
+short-summary: Start live log tracing for one or more web apps.
+long-summary: >
+    This command may not work with web apps running on Linux. The logs of several apps or slots are streamed together,
+    each line prefixed with the app (and slot) it comes from, and interrupted streams are reconnected.
+examples:
+  - name: Stream the logs of a web app.
+    text: az webapp log tail --name MyWebapp --resource-group MyResourceGroup
+  - name: Stream the logs of the staging and qa slots of two web apps.
+    text: az webapp log tail --name MyWebapp MyOtherWebapp --resource-group MyResourceGroup --slot staging qa
+  - name: Stream the logs of all the web apps of a resource group.
+    text: az webapp log tail --ids $(az webapp list --resource-group MyResourceGroup --query [].id -o tsv)
 """
 
 helps['webapp restart'] = """
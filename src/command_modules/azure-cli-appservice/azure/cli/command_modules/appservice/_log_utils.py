@@ -0,0 +1,258 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import os
+import sys
+import threading
+import time
+
+from six.moves import queue  # pylint: disable=import-error
+from knack.log import get_logger
+from knack.util import CLIError
+
+from ._credential_cache import ScmUnauthorizedError
+
+logger = get_logger(__name__)
+
+LOG_STREAM_CHUNK_SIZE = 64 * 1024
+LOG_STREAM_READ_TIMEOUT = 300  # in seconds, Kudu sends a message every minute on idle streams
+LOG_STREAM_RETRY_INTERVAL = 2  # in seconds
+LOG_STREAM_MAX_RETRY_INTERVAL = 30
+LOG_STREAM_TRANSIENT_STATUS_CODES = [408, 429, 500, 502, 503, 504]
+# chunks read but not yet written, beyond which the readers wait for the output
+LOG_STREAM_MAX_PENDING_CHUNKS = 256
+LOG_DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+LOG_DOWNLOAD_RETRIES = 5
+
+
+_pool_manager = None
+_pool_manager_lock = threading.Lock()
+
+
+def get_pool_manager():
+    """ Return the pool manager shared by the log streams and downloads of the command. """
+    global _pool_manager  # pylint: disable=global-statement
+    with _pool_manager_lock:
+        if _pool_manager is None:
+            import certifi
+            import urllib3
+            try:
+                import urllib3.contrib.pyopenssl
+                urllib3.contrib.pyopenssl.inject_into_urllib3()
+            except ImportError:
+                pass
+            _pool_manager = urllib3.PoolManager(cert_reqs='CERT_REQUIRED', ca_certs=certifi.where())
+        return _pool_manager
+
+
+class LogSource(object):  # pylint: disable=too-few-public-methods
+    """ A log stream of an app, with the number of bytes received from it so far.
+
+    :param refresh_headers: callable returning new headers when the credentials of the headers are rejected
+    """
+
+    def __init__(self, label, url, headers, refresh_headers=None):
+        self.label = label
+        self.url = url
+        self.headers = headers
+        self.refresh_headers = refresh_headers
+        self.offset = 0
+
+
+_RESTARTED = object()
+
+
+def _read_source(http, source, events, retry_interval):
+    """ Read a log stream until it fails for good, reconnecting from the last offset when it is interrupted. """
+    import urllib3
+    delay = retry_interval
+    while True:
+        headers = dict(source.headers)
+        if source.offset:
+            headers['Range'] = 'bytes={}-'.format(source.offset)
+        try:
+            r = http.request('GET', source.url, headers=headers, preload_content=False, retries=False,
+                             timeout=urllib3.Timeout(connect=30, read=LOG_STREAM_READ_TIMEOUT))
+        except urllib3.exceptions.HTTPError as ex:
+            error = ex
+        else:
+            try:
+                if r.status in (200, 206):
+                    if r.status == 200 and source.offset:
+                        # the server started the stream over, rather than resuming it
+                        source.offset = 0
+                        events.put((source, _RESTARTED))
+                    for chunk in r.stream(LOG_STREAM_CHUNK_SIZE):
+                        if chunk:
+                            source.offset += len(chunk)
+                            events.put((source, chunk))
+                            delay = retry_interval
+                    error = 'the stream ended'
+                elif r.status in LOG_STREAM_TRANSIENT_STATUS_CODES:
+                    error = 'status code {}'.format(r.status)
+                elif r.status == 401 and source.refresh_headers:
+                    source.headers, source.refresh_headers = source.refresh_headers(), None
+                    continue
+                elif r.status == 401:
+                    error = ScmUnauthorizedError("Failed to connect to '{}': the credentials were rejected.".format(
+                        source.url))
+                    events.put((source, error))
+                    return
+                else:
+                    error = CLIError("Failed to connect to '{}' with status code '{}' and reason '{}'".format(
+                        source.url, r.status, r.reason))
+                    events.put((source, error))
+                    return
+            except urllib3.exceptions.HTTPError as ex:
+                error = ex
+            finally:
+                r.release_conn()
+        logger.warning("%s: the log stream was interrupted (%s). Reconnecting in %s seconds...",
+                       source.label, error, delay)
+        time.sleep(delay)
+        delay = min(delay * 2, LOG_STREAM_MAX_RETRY_INTERVAL)
+
+
+def stream_logs(sources, http=None, output=None, retry_interval=LOG_STREAM_RETRY_INTERVAL):
+    """ Write the logs of several streams to the output as they arrive, until all the streams fail for good.
+
+    Each stream is read on a thread of its own over a shared pool manager, and reconnected from the last byte
+    received when it is interrupted. The lines are written as bytes, whole, and prefixed with the label of their
+    stream when there are several.
+    """
+    if http is None:
+        http = get_pool_manager()
+    transcode = None
+    if output is None:
+        sys.stdout.flush()
+        output = getattr(sys.stdout, 'buffer', sys.stdout)
+        encoding = (sys.stdout.encoding or 'utf-8').lower()
+        if encoding.replace('-', '') != 'utf8':
+            # consoles which don't support utf-8
+            transcode = encoding
+
+    events = queue.Queue(maxsize=LOG_STREAM_MAX_PENDING_CHUNKS)
+    for source in sources:
+        thread = threading.Thread(target=_read_source, args=(http, source, events, retry_interval),
+                                  name='LogStream-' + source.label)
+        thread.daemon = True
+        thread.start()
+
+    prefixes = {source: ('[' + source.label + '] ').encode('utf-8') if len(sources) > 1 else b''
+                for source in sources}
+    partial_lines = {source: b'' for source in sources}
+    errors = []
+
+    def _write(source, data):
+        prefix = prefixes[source]
+        if transcode:
+            data = data.decode('utf-8', 'replace').encode(transcode, 'replace')
+        if prefix:
+            data = prefix + data[:-1].replace(b'\n', b'\n' + prefix) + b'\n'
+        output.write(data)
+
+    active = len(sources)
+    while active:
+        try:
+            # with a timeout, so ctrl+c can stop the command
+            event = events.get(timeout=1)
+        except queue.Empty:
+            continue
+        while event:
+            source, data = event
+            if data is _RESTARTED or isinstance(data, CLIError):
+                if partial_lines[source]:
+                    _write(source, partial_lines[source] + b'\n')
+                    partial_lines[source] = b''
+                if data is not _RESTARTED:
+                    active -= 1
+                    errors.append(data)
+                    if active:
+                        logger.warning('%s: %s', source.label, data)
+            else:
+                data = partial_lines[source] + data
+                end = data.rfind(b'\n') + 1
+                if end:
+                    _write(source, data[:end])
+                partial_lines[source] = data[end:]
+            try:
+                event = events.get_nowait()
+            except queue.Empty:
+                event = None
+        output.flush()
+
+    if errors:
+        raise errors[-1]
+
+
+def download_log(http, url, headers, log_file, retry_interval=LOG_STREAM_RETRY_INTERVAL):
+    """ Download a log to a file, resuming with a range request when the connection is interrupted.
+
+    The log is written to a temporary file next to the log file, which replaces it once the download completes.
+    """
+    import tempfile
+    directory, name = os.path.split(os.path.abspath(log_file))
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=name + '.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            size = _download(http, url, headers, f, retry_interval)
+        try:
+            os.replace(temp_path, log_file)
+        except AttributeError:  # Python 2
+            if os.path.exists(log_file):
+                os.remove(log_file)
+            os.rename(temp_path, log_file)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+    return size
+
+
+def _download(http, url, headers, f, retry_interval):
+    import urllib3
+    received = 0
+    for attempt in range(LOG_DOWNLOAD_RETRIES + 1):
+        request_headers = dict(headers)
+        if received:
+            request_headers['Range'] = 'bytes={}-'.format(received)
+        try:
+            r = http.request('GET', url, headers=request_headers, preload_content=False, retries=False,
+                             timeout=urllib3.Timeout(connect=30, read=LOG_STREAM_READ_TIMEOUT))
+        except urllib3.exceptions.HTTPError as ex:
+            error = ex
+        else:
+            try:
+                if r.status in (200, 206):
+                    if r.status == 200 and received:
+                        # the server doesn't support ranges, so the download starts over
+                        logger.warning("The server doesn't support resuming the download of '%s'. Restarting it.", url)
+                        f.seek(0)
+                        f.truncate()
+                        received = 0
+                    length = r.headers.get('Content-Length')
+                    expected = received + int(length) if length is not None else None
+                    for chunk in r.stream(LOG_DOWNLOAD_CHUNK_SIZE, decode_content=False):
+                        f.write(chunk)
+                        received += len(chunk)
+                    if expected is None or received >= expected:
+                        return received
+                    error = 'the download ended after {} of {} bytes'.format(received, expected)
+                elif r.status in LOG_STREAM_TRANSIENT_STATUS_CODES:
+                    error = 'status code {}'.format(r.status)
+                elif r.status == 401:
+                    raise ScmUnauthorizedError("Failed to connect to '{}': the credentials were rejected.".format(url))
+                else:
+                    raise CLIError("Failed to connect to '{}' with status code '{}' and reason '{}'".format(
+                        url, r.status, r.reason))
+            except urllib3.exceptions.HTTPError as ex:
+                error = ex
+            finally:
+                r.release_conn()
+        if attempt < LOG_DOWNLOAD_RETRIES:
+            delay = retry_interval * 2 ** attempt
+            logger.warning("The download of '%s' was interrupted after %s bytes (%s). Resuming in %s seconds...",
+                           url, received, error, delay)
+            time.sleep(delay)
+    raise CLIError("Failed to download '{}': {}".format(url, error))
@@ -14,7 +14,7 @@ from azure.mgmt.web.models import DatabaseType, ConnectionStringType, BuiltInAut
 
 from ._completers import get_hostname_completion_list
 
-from ._validators import validate_timeout_value
+from ._validators import validate_timeout_value, validate_site_ids_or_names
 
 
 AUTH_TYPES = {
@@ -152,6 +152,8 @@ def load_arguments(self, _):
         with self.argument_context(scope + ' config appsettings') as c:
             c.argument('settings', nargs='+', help="space-separated app settings in a format of <name>=<value>")
             c.argument('setting_names', nargs='+', help="space-separated app setting names")
+        with self.argument_context(scope + ' config appsettings set') as c:
+            c.argument('slot', options_list=['--slot', '-s'], id_part='child_name_1', help="the name of the slot. Default to the productions slot if not specified")
 
         with self.argument_context(scope + ' config hostname') as c:
             c.argument('hostname', completer=get_hostname_completion_list, help="hostname assigned to the site, such as custom domains", id_part='child_name_1')
@@ -183,6 +185,10 @@ def load_arguments(self, _):
             c.argument('src', help='a zip file path for deployment')
             c.argument('timeout', type=int, options_list=['--timeout', '-t'], help='Configurable timeout in seconds for checking the status of deployment', validator=validate_timeout_value)
 
+        with self.argument_context(scope + ' list') as c:
+            c.argument('show_config', action='store_true', help="include the configuration of each app, e.g. its runtime stack and always on, as 'siteConfig'")
+            c.argument('show_app_settings', action='store_true', help="include the app settings of each app, as 'appSettings'")
+
         with self.argument_context(scope + ' config appsettings list') as c:
             c.argument('name', arg_type=webapp_name_arg_type, id_part=None)
 
@@ -267,10 +273,18 @@ def load_arguments(self, _):
         c.argument('web_server_logging', help='configure Web server logging', arg_type=get_enum_type(['off', 'filesystem']))
         c.argument('docker_container_logging', help='configure gathering STDOUT and STDERR output from container', arg_type=get_enum_type(['off', 'filesystem']))
 
+    for scope in ['webapp log tail', 'webapp log download']:
+        with self.argument_context(scope) as c:
+            c.argument('name', arg_type=webapp_name_arg_type, nargs='+', id_part=None, arg_group='Resource Id',
+                       help="space-separated names of the web apps. You can configure the default using 'az configure --defaults web=<name>'")
+            c.argument('resource_group_name', arg_type=resource_group_name_type, id_part=None, arg_group='Resource Id')
+            c.argument('slot', options_list=['--slot', '-s'], nargs='+', help="space-separated names of the slots. Default to the productions slot if not specified")
+            c.argument('ids', nargs='+', options_list='--ids', arg_group='Resource Id', validator=validate_site_ids_or_names,
+                       help='One or more resource IDs of web apps or slots (space-delimited). If provided, no other "Resource Id" arguments should be specified.')
     with self.argument_context('webapp log tail') as c:
         c.argument('provider', help="By default all live traces configured by 'az webapp log config' will be shown, but you can scope to certain providers/folders, e.g. 'application', 'http', etc. For details, check out https://github.com/projectkudu/kudu/wiki/Diagnostic-Log-Stream")
     with self.argument_context('webapp log download') as c:
-        c.argument('log_file', default='webapp_logs.zip', type=file_type, completer=FilesCompleter(), help='the downloaded zipped log file path')
+        c.argument('log_file', default='webapp_logs.zip', type=file_type, completer=FilesCompleter(), help='the downloaded zipped log file path. With several apps, the name of each app is appended to it, e.g. webapp_logs_MyWebapp.zip')
 
     for scope in ['appsettings', 'connection-string']:
         with self.argument_context('webapp config ' + scope) as c:
@@ -11,3 +11,8 @@ def validate_timeout_value(namespace):
     if isinstance(namespace.timeout, int):
         if namespace.timeout <= 29:
             raise CLIError('--timeout value should be a positive value in seconds and should be atleast 30')
+
+
+def validate_site_ids_or_names(namespace):
+    if not namespace.ids and not (namespace.name and namespace.resource_group_name):
+        raise CLIError('usage error: --ids ID [ID ...] | --name NAME [NAME ...] --resource-group NAME')
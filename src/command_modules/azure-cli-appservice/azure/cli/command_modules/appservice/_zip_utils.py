@@ -0,0 +1,176 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import os
+import shutil
+import struct
+import tempfile
+import time
+import zlib
+from collections import deque
+
+from knack.log import get_logger
+
+logger = get_logger(__name__)
+
+ZIP_COMPRESSION_LEVEL = 6
+ZIP_CHUNK_SIZE = 1024 * 1024
+# compressed files larger than this are kept in temporary files, rather than in memory, until written
+ZIP_SPOOL_MAX_SIZE = 16 * 1024 * 1024
+# already compressed formats, which are stored rather than compressed again
+ZIP_STORED_EXTENSIONS = {
+    '.7z', '.bz2', '.ear', '.gif', '.gz', '.ico', '.jar', '.jpeg', '.jpg', '.mp3', '.mp4', '.nupkg', '.png',
+    '.tgz', '.war', '.webm', '.webp', '.whl', '.woff', '.woff2', '.xz', '.zip'
+}
+
+_ZIP_STORED = 0
+_ZIP_DEFLATED = 8
+_ZIP64_LIMIT = 0xFFFFFFFF
+_ZIP_COUNT_LIMIT = 0xFFFF
+_UTF8_NAME_FLAG = 0x800
+# the archives are always made as on Unix, so they don't depend on the machine and keep the modes of the files
+_ZIP_CREATE_SYSTEM = 3
+
+
+class _ZipEntry(object):  # pylint: disable=too-few-public-methods
+    def __init__(self, arcname, method, crc, file_size, data, mtime, mode):
+        self.arcname = arcname
+        self.method = method
+        self.crc = crc
+        self.file_size = file_size
+        self.data = data
+        self.compress_size = data.tell()
+        self.mtime = mtime
+        self.mode = mode
+        self.header_offset = None
+
+
+def _copy_file(absname, output, compressor=None):
+    crc, size = 0, 0
+    with open(absname, 'rb') as f:
+        for chunk in iter(lambda: f.read(ZIP_CHUNK_SIZE), b''):
+            crc = zlib.crc32(chunk, crc)
+            size += len(chunk)
+            output.write(compressor.compress(chunk) if compressor else chunk)
+    if compressor:
+        output.write(compressor.flush())
+    return crc & 0xFFFFFFFF, size
+
+
+def _compress_file(absname, arcname):
+    """Compress the file in chunks, to a buffer which moves to a temporary file when it gets large."""
+    stat = os.stat(absname)
+    data = tempfile.SpooledTemporaryFile(max_size=ZIP_SPOOL_MAX_SIZE)
+    if os.path.splitext(arcname)[1].lower() not in ZIP_STORED_EXTENSIONS:
+        compressor = zlib.compressobj(ZIP_COMPRESSION_LEVEL, zlib.DEFLATED, -zlib.MAX_WBITS)
+        crc, file_size = _copy_file(absname, data, compressor)
+        if data.tell() < file_size:
+            return _ZipEntry(arcname, _ZIP_DEFLATED, crc, file_size, data, stat.st_mtime, stat.st_mode)
+        data.seek(0)
+        data.truncate()
+    crc, file_size = _copy_file(absname, data)
+    return _ZipEntry(arcname, _ZIP_STORED, crc, file_size, data, stat.st_mtime, stat.st_mode)
+
+
+def _dos_date_time(mtime):
+    # in UTC, so the archive doesn't depend on the time zone of the machine
+    date_time = time.gmtime(mtime)[:6]
+    if date_time[0] < 1980:
+        date_time = (1980, 1, 1, 0, 0, 0)
+    dos_time = date_time[3] << 11 | date_time[4] << 5 | (date_time[5] // 2)
+    dos_date = (date_time[0] - 1980) << 9 | date_time[1] << 5 | date_time[2]
+    return dos_time, dos_date
+
+
+def _write_local_header(fileobj, entry):
+    name = entry.arcname.encode('utf-8')
+    extra = b''
+    file_size, compress_size = entry.file_size, entry.compress_size
+    if file_size >= _ZIP64_LIMIT or compress_size >= _ZIP64_LIMIT:
+        extra = struct.pack('<HHQQ', 1, 16, file_size, compress_size)
+        file_size = compress_size = _ZIP64_LIMIT
+    dos_time, dos_date = _dos_date_time(entry.mtime)
+    fileobj.write(struct.pack('<4sHHHHHLLLHH', b'PK\x03\x04', 45 if extra else 20, _UTF8_NAME_FLAG, entry.method,
+                              dos_time, dos_date, entry.crc, compress_size, file_size, len(name), len(extra)))
+    fileobj.write(name)
+    fileobj.write(extra)
+    return 30 + len(name) + len(extra)
+
+
+def _write_central_directory(fileobj, entries, offset):
+    start = offset
+    for entry in entries:
+        name = entry.arcname.encode('utf-8')
+        zip64_fields = []
+        file_size, compress_size, header_offset = entry.file_size, entry.compress_size, entry.header_offset
+        if file_size >= _ZIP64_LIMIT:
+            zip64_fields.append(file_size)
+            file_size = _ZIP64_LIMIT
+        if compress_size >= _ZIP64_LIMIT:
+            zip64_fields.append(compress_size)
+            compress_size = _ZIP64_LIMIT
+        if header_offset >= _ZIP64_LIMIT:
+            zip64_fields.append(header_offset)
+            header_offset = _ZIP64_LIMIT
+        extra = struct.pack('<HH' + 'Q' * len(zip64_fields), 1, 8 * len(zip64_fields),
+                            *zip64_fields) if zip64_fields else b''
+        version = 45 if extra else 20
+        dos_time, dos_date = _dos_date_time(entry.mtime)
+        fileobj.write(struct.pack('<4s4B4HL2L5H2L', b'PK\x01\x02', version, _ZIP_CREATE_SYSTEM, version, 0,
+                                  _UTF8_NAME_FLAG, entry.method, dos_time, dos_date, entry.crc, compress_size,
+                                  file_size, len(name), len(extra), 0, 0, 0, (entry.mode & 0xFFFF) << 16,
+                                  header_offset))
+        fileobj.write(name)
+        fileobj.write(extra)
+        offset += 46 + len(name) + len(extra)
+
+    size = offset - start
+    count = len(entries)
+    if count >= _ZIP_COUNT_LIMIT or size >= _ZIP64_LIMIT or start >= _ZIP64_LIMIT:
+        fileobj.write(struct.pack('<4sQ2H2L4Q', b'PK\x06\x06', 44, 45, 45, 0, 0, count, count, size, start))
+        fileobj.write(struct.pack('<4sLQL', b'PK\x06\x07', 0, offset, 1))
+    fileobj.write(struct.pack('<4s4H2LH', b'PK\x05\x06', 0, 0, min(count, _ZIP_COUNT_LIMIT),
+                              min(count, _ZIP_COUNT_LIMIT), min(size, _ZIP64_LIMIT), min(start, _ZIP64_LIMIT), 0))
+
+
+def write_zip(fileobj, files, max_workers=None):
+    """Write a zip of the files, given as (path, name in the zip) pairs, to a binary file object.
+
+    The files are compressed on a thread pool, and written in the order of their names with their modification
+    times, so the same files always produce the same archive. Files in an already compressed format, or which
+    don't get smaller, are stored. Each file is read and compressed in chunks, so large files don't take
+    their size in memory.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    if max_workers is None:
+        import multiprocessing
+        max_workers = multiprocessing.cpu_count()
+    files = sorted(((absname, arcname.replace(os.path.sep, '/')) for absname, arcname in files),
+                   key=lambda f: f[1])
+    entries = []
+    offset = 0
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = deque()
+        remaining = iter(files)
+        while True:
+            # keep a bounded number of compressed files in memory
+            for absname, arcname in remaining:
+                pending.append(executor.submit(_compress_file, absname, arcname))
+                if len(pending) >= 2 * max_workers:
+                    break
+            if not pending:
+                break
+            entry = pending.popleft().result()
+            entry.header_offset = offset
+            offset += _write_local_header(fileobj, entry)
+            entry.data.seek(0)
+            shutil.copyfileobj(entry.data, fileobj, ZIP_CHUNK_SIZE)
+            entry.data.close()
+            offset += entry.compress_size
+            entry.data = None
+            entries.append(entry)
+    _write_central_directory(fileobj, entries, offset)
+    logger.debug("Zipped %d files (%d bytes)", len(entries), offset)
@@ -50,9 +50,10 @@ from .vsts_cd_provider import VstsContinuousDeliveryProvider
 from ._params import AUTH_TYPES, MULTI_CONTAINER_TYPES, LINUX_RUNTIMES, WINDOWS_RUNTIMES
 from ._client_factory import web_client_factory, ex_handler_factory
 from ._appservice_utils import _generic_site_operation
-from ._create_util import (zip_contents_from_dir, get_runtime_version_details, create_resource_group,
+from ._credential_cache import ScmUnauthorizedError, get_cached_value, cache_value, invalidate_cached_value
+from ._create_util import (zip_changed_contents_from_dir, get_runtime_version_details, create_resource_group,
                            should_create_new_rg, set_location, should_create_new_asp, should_create_new_app,
-                           get_lang_from_content, get_num_apps_in_asp)
+                           get_lang_from_content, get_num_apps_in_asp, get_deployment_manifest)
 from ._constants import (NODE_RUNTIME_NAME, OS_DEFAULT, STATIC_RUNTIME_NAME, PYTHON_RUNTIME_NAME, RUNTIME_TO_IMAGE)
 
 logger = get_logger(__name__)
@@ -157,8 +158,9 @@ def update_app_settings(cmd, resource_group_name, name, settings=None, slot=None
     settings = settings or []
     slot_settings = slot_settings or []
 
+    client = web_client_factory(cmd.cli_ctx)
     app_settings = _generic_site_operation(cmd.cli_ctx, resource_group_name, name,
-                                           'list_application_settings', slot)
+                                           'list_application_settings', slot, client=client)
     result, slot_result = {}, {}
     # pylint: disable=too-many-nested-blocks
     for src, dest in [(settings, result), (slot_settings, slot_result)]:
@@ -178,24 +180,27 @@ def update_app_settings(cmd, resource_group_name, name, settings=None, slot=None
                 dest[setting_name] = value
 
     result.update(slot_result)
-    for setting_name, value in result.items():
-        app_settings.properties[setting_name] = value
-    client = web_client_factory(cmd.cli_ctx)
-
-    result = _generic_settings_operation(cmd.cli_ctx, resource_group_name, name,
-                                         'update_application_settings',
-                                         app_settings.properties, slot, client)
+    # updating the settings restarts the app, so it is only done when they change
+    changed = {k: v for k, v in result.items() if app_settings.properties.get(k) != v}
+    if changed:
+        app_settings.properties.update(changed)
+        app_settings = _generic_settings_operation(cmd.cli_ctx, resource_group_name, name,
+                                                   'update_application_settings',
+                                                   app_settings.properties, slot, client)
+    else:
+        logger.warning("The app settings of '%s' are already up to date. Skipping the update.", name)
 
     app_settings_slot_cfg_names = []
     if slot_result:
-        new_slot_setting_names = slot_result.keys()
         slot_cfg_names = client.web_apps.list_slot_configuration_names(resource_group_name, name)
-        slot_cfg_names.app_setting_names = slot_cfg_names.app_setting_names or []
-        slot_cfg_names.app_setting_names += new_slot_setting_names
-        app_settings_slot_cfg_names = slot_cfg_names.app_setting_names
-        client.web_apps.update_slot_configuration_names(resource_group_name, name, slot_cfg_names)
+        app_settings_slot_cfg_names = slot_cfg_names.app_setting_names or []
+        new_slot_setting_names = [n for n in slot_result if n not in app_settings_slot_cfg_names]
+        if new_slot_setting_names:
+            app_settings_slot_cfg_names += new_slot_setting_names
+            slot_cfg_names.app_setting_names = app_settings_slot_cfg_names
+            client.web_apps.update_slot_configuration_names(resource_group_name, name, slot_cfg_names)
 
-    return _build_app_settings_output(result.properties, app_settings_slot_cfg_names)
+    return _build_app_settings_output(app_settings.properties, app_settings_slot_cfg_names)
 
 
 def add_azure_storage_account(cmd, resource_group_name, name, custom_id, storage_type, account_name,
@@ -269,24 +274,32 @@ def update_azure_storage_account(cmd, resource_group_name, name, custom_id, stor
 
 
 def enable_zip_deploy(cmd, resource_group_name, name, src, timeout=None, slot=None):
+    return _zip_deploy(cmd, resource_group_name, name, src, timeout=timeout, slot=slot)
+
+
+def _zip_deploy(cmd, resource_group_name, name, src, timeout=None, slot=None, clean=True):
+    import os
+    import urllib3
     logger.warning("Getting scm site credentials for zip deployment")
-    user_name, password = _get_site_credential(cmd.cli_ctx, resource_group_name, name, slot)
     scm_url = _get_scm_url(cmd, resource_group_name, name, slot)
-    zip_url = scm_url + '/api/zipdeploy?isAsync=true'
+    # without clean, the files of the app which are not in the zip are kept
+    zip_url = scm_url + '/api/zipdeploy?isAsync=true' + ('' if clean else '&clean=false')
     deployment_status_url = scm_url + '/api/deployments/latest'
 
-    import urllib3
-    authorization = urllib3.util.make_headers(basic_auth='{0}:{1}'.format(user_name, password))
-    headers = authorization
-    headers['content-type'] = 'application/octet-stream'
-
-    import requests
-    import os
-    # Read file content
-    with open(os.path.realpath(os.path.expanduser(src)), 'rb') as fs:
-        zip_content = fs.read()
-        logger.warning("Starting zip deployment")
-        requests.post(zip_url, data=zip_content, headers=headers)
+    logger.warning("Starting zip deployment")
+    for attempt in range(2):
+        user_name, password = _get_site_credential(cmd.cli_ctx, resource_group_name, name, slot)
+        authorization = urllib3.util.make_headers(basic_auth='{0}:{1}'.format(user_name, password))
+        headers = dict(authorization)
+        headers['content-type'] = 'application/octet-stream'
+        try:
+            _upload_zip(zip_url, headers, os.path.realpath(os.path.expanduser(src)))
+            break
+        except ScmUnauthorizedError:
+            # the cached credentials may have been reset since
+            _invalidate_site_credential(cmd.cli_ctx, resource_group_name, name, slot)
+            if attempt:
+                raise
     # check the status of async deployment
     response = _check_zip_deployment_status(deployment_status_url, authorization, timeout)
     return response
@@ -375,9 +388,9 @@ def set_functionapp(cmd, resource_group_name, name, **kwargs):
     return client.web_apps.create_or_update(resource_group_name, name, site_envelope=instance)
 
 
-def list_webapp(cmd, resource_group_name=None):
-    result = _list_app(cmd.cli_ctx, resource_group_name)
-    return [r for r in result if 'function' not in r.kind]
+def list_webapp(cmd, resource_group_name=None, show_config=False, show_app_settings=False):
+    return _list_app(cmd.cli_ctx, resource_group_name, lambda r: 'function' not in r.kind,
+                     show_config, show_app_settings)
 
 
 def list_deleted_webapp(cmd, resource_group_name=None, name=None, slot=None):
@@ -390,20 +403,39 @@ def restore_deleted_webapp(cmd, deleted_id, resource_group_name, name, slot=None
     return _generic_site_operation(cmd.cli_ctx, resource_group_name, name, 'restore_from_deleted_app', slot, request)
 
 
-def list_function_app(cmd, resource_group_name=None):
-    result = _list_app(cmd.cli_ctx, resource_group_name)
-    return [r for r in result if 'function' in r.kind]
+def list_function_app(cmd, resource_group_name=None, show_config=False, show_app_settings=False):
+    return _list_app(cmd.cli_ctx, resource_group_name, lambda r: 'function' in r.kind,
+                     show_config, show_app_settings)
+
 
+def _list_app(cli_ctx, resource_group_name=None, app_filter=None, show_config=False, show_app_settings=False):
+    """List the apps, with the configuration and app settings of each if asked.
 
-def _list_app(cli_ctx, resource_group_name=None):
+    Those are fetched for several apps at once over the client of the list, while its next pages are read.
+    """
     client = web_client_factory(cli_ctx)
     if resource_group_name:
-        result = list(client.web_apps.list_by_resource_group(resource_group_name))
+        result = client.web_apps.list_by_resource_group(resource_group_name)
     else:
-        result = list(client.web_apps.list())
-    for webapp in result:
+        result = client.web_apps.list()
+    result = (webapp for webapp in result if app_filter is None or app_filter(webapp))
+
+    def _complete_app(webapp):
         _rename_server_farm_props(webapp)
-    return result
+        if show_config:
+            webapp.site_config = _generic_site_operation(cli_ctx, webapp.resource_group, webapp.name,
+                                                         'get_configuration', client=client)
+        if show_app_settings:
+            app_settings = _generic_site_operation(cli_ctx, webapp.resource_group, webapp.name,
+                                                   'list_application_settings', client=client)
+            # without slotSetting, which would take another call per app
+            webapp.app_settings = [{'name': k, 'value': v}
+                                   for k, v in _mask_creds_related_appsettings(app_settings.properties).items()]
+        return webapp
+
+    if show_config or show_app_settings:
+        return _map_sites(_complete_app, result)
+    return [_complete_app(webapp) for webapp in result]
 
 
 def _list_deleted_app(cli_ctx, resource_group_name=None, name=None, slot=None):
@@ -1366,10 +1398,16 @@ def _get_local_git_url(cli_ctx, client, resource_group_name, name, slot=None):
 
 def _get_scm_url(cmd, resource_group_name, name, slot=None):
     from azure.mgmt.web.models import HostType
+    cache_key = _get_site_cache_key(cmd.cli_ctx, resource_group_name, name, slot) + '/scmUrl'
+    scm_url = get_cached_value(cache_key)
+    if scm_url:
+        return scm_url
     webapp = show_webapp(cmd, resource_group_name, name, slot=slot)
     for host in webapp.host_name_ssl_states or []:
         if host.host_type == HostType.repository:
-            return "https://{}".format(host.name)
+            scm_url = "https://{}".format(host.name)
+            cache_value(cache_key, scm_url)
+            return scm_url
 
     # this should not happen, but throw anyway
     raise ValueError('Failed to retrieve Scm Uri')
@@ -1623,71 +1661,151 @@ def show_cors(cmd, resource_group_name, name, slot=None):
     return configs.cors
 
 
-def get_streaming_log(cmd, resource_group_name, name, provider=None, slot=None):
-    scm_url = _get_scm_url(cmd, resource_group_name, name, slot)
-    streaming_url = scm_url + '/logstream'
-    if provider:
-        streaming_url += ('/' + provider.lstrip('/'))
+def get_streaming_log(cmd, resource_group_name=None, name=None, provider=None, slot=None, ids=None):
+    import urllib3
+    from ._log_utils import LogSource, stream_logs
 
-    user, password = _get_site_credential(cmd.cli_ctx, resource_group_name, name, slot)
-    t = threading.Thread(target=_get_log, args=(streaming_url, user, password))
-    t.daemon = True
-    t.start()
+    def _get_log_source(target):
+        target_cmd, target_resource_group, target_name, target_slot = target
+        scm_url = _get_scm_url(target_cmd, target_resource_group, target_name, target_slot)
+        streaming_url = scm_url + '/logstream'
+        if provider:
+            streaming_url += ('/' + provider.lstrip('/'))
 
-    while True:
-        time.sleep(100)  # so that ctrl+c can stop the command
+        def _get_headers():
+            user, password = _get_site_credential(target_cmd.cli_ctx, target_resource_group, target_name,
+                                                  target_slot)
+            return urllib3.util.make_headers(basic_auth='{0}:{1}'.format(user, password))
 
+        def _refresh_headers():
+            # the cached credentials may have been reset since
+            _invalidate_site_credential(target_cmd.cli_ctx, target_resource_group, target_name, target_slot)
+            return _get_headers()
 
-def download_historical_logs(cmd, resource_group_name, name, log_file=None, slot=None):
-    scm_url = _get_scm_url(cmd, resource_group_name, name, slot)
-    url = scm_url.rstrip('/') + '/dump'
-    user_name, password = _get_site_credential(cmd.cli_ctx, resource_group_name, name, slot)
-    _get_log(url, user_name, password, log_file)
-    logger.warning('Downloaded logs to %s', log_file)
+        label = '{}/{}'.format(target_name, target_slot) if target_slot else target_name
+        return LogSource(label, streaming_url, _get_headers(), refresh_headers=_refresh_headers)
+
+    targets = _get_site_targets(cmd, resource_group_name, name, slot, ids)
+    stream_logs(_map_sites(_get_log_source, targets))
+
+
+def download_historical_logs(cmd, resource_group_name=None, name=None, log_file=None, slot=None, ids=None):
+    import os
+    targets = _get_site_targets(cmd, resource_group_name, name, slot, ids)
+
+    def _download_log(target):
+        target_cmd, target_resource_group, target_name, target_slot = target
+        target_log_file = log_file
+        if len(targets) > 1:
+            # a file for each app, named after it
+            root, ext = os.path.splitext(log_file)
+            target_log_file = '{}_{}{}'.format(root, '_'.join(n for n in (target_name, target_slot) if n), ext)
+        try:
+            scm_url = _get_scm_url(target_cmd, target_resource_group, target_name, target_slot)
+            url = scm_url.rstrip('/') + '/dump'
+            for attempt in range(2):
+                user_name, password = _get_site_credential(target_cmd.cli_ctx, target_resource_group, target_name,
+                                                           target_slot)
+                try:
+                    _get_log(url, user_name, password, target_log_file)
+                    break
+                except ScmUnauthorizedError:
+                    # the cached credentials may have been reset since
+                    _invalidate_site_credential(target_cmd.cli_ctx, target_resource_group, target_name, target_slot)
+                    if attempt:
+                        raise
+        except Exception as ex:  # pylint: disable=broad-except
+            if len(targets) == 1:
+                raise
+            logger.warning("Failed to download the logs of '%s': %s", target_name, ex)
+            return ex
+        logger.warning('Downloaded logs to %s', target_log_file)
+        return None
+
+    errors = [error for error in _map_sites(_download_log, targets) if error]
+    if errors:
+        raise CLIError('Failed to download the logs of {} of {} apps.'.format(len(errors), len(targets)))
+
+
+MAX_SITE_CONCURRENCY = 10
+
+
+def _get_site_targets(cmd, resource_group_name, names, slots, ids):
+    """Return the (cmd, resource group, name, slot) of the apps given by --ids, or by names and slots.
+
+    The apps of --ids in other subscriptions get a command of their own, with that subscription.
+    """
+    import copy
+    from six import string_types
+    if ids:
+        targets = []
+        for resource_id in ids:
+            parts = parse_resource_id(resource_id)
+            target_cmd = cmd
+            if parts['subscription'] != cmd.cli_ctx.data.get('subscription_id'):
+                target_cmd = copy.copy(cmd)
+                target_cmd.cli_ctx = copy.copy(cmd.cli_ctx)
+                target_cmd.cli_ctx.data = dict(cmd.cli_ctx.data, subscription_id=parts['subscription'])
+            slot = parts.get('child_name_1') if parts.get('child_type_1', '').lower() == 'slots' else None
+            targets.append((target_cmd, parts['resource_group'], parts['name'], slot))
+        return targets
+    names = [names] if isinstance(names, string_types) else names
+    slots = [slots] if isinstance(slots, string_types) else (slots or [None])
+    return [(cmd, resource_group_name, name, slot) for name in names for slot in slots]
+
+
+def _map_sites(func, targets):
+    """Call the function with each target, on a bounded thread pool, and return the results in order.
+
+    The targets may be an iterator, e.g. over the pages of a list operation, which is then consumed only as fast
+    as the pool works through it.
+    """
+    import itertools
+    from collections import deque
+    from concurrent.futures import ThreadPoolExecutor
+    if isinstance(targets, list) and len(targets) == 1:
+        return [func(targets[0])]
+    targets = iter(targets)
+    results = []
+    with ThreadPoolExecutor(max_workers=MAX_SITE_CONCURRENCY) as executor:
+        pending = deque(executor.submit(func, target)
+                        for target in itertools.islice(targets, 2 * MAX_SITE_CONCURRENCY))
+        while pending:
+            results.append(pending.popleft().result())
+            pending.extend(executor.submit(func, target) for target in itertools.islice(targets, 1))
+    return results
+
+
+def _get_site_cache_key(cli_ctx, resource_group_name, name, slot=None):
+    from azure.cli.core.commands.client_factory import get_subscription_id
+    return '{}/{}/{}/{}'.format(get_subscription_id(cli_ctx), resource_group_name, name, slot or 'production')
 
 
 def _get_site_credential(cli_ctx, resource_group_name, name, slot=None):
+    """Return the publishing credentials of the app, which are cached for a few minutes, encrypted."""
+    cache_key = _get_site_cache_key(cli_ctx, resource_group_name, name, slot) + '/publishingCredentials'
+    cached = get_cached_value(cache_key)
+    if cached:
+        return tuple(cached)
     creds = _generic_site_operation(cli_ctx, resource_group_name, name, 'list_publishing_credentials', slot)
     creds = creds.result()
+    cache_value(cache_key, [creds.publishing_user_name, creds.publishing_password])
     return (creds.publishing_user_name, creds.publishing_password)
 
 
+def _invalidate_site_credential(cli_ctx, resource_group_name, name, slot=None):
+    invalidate_cached_value(_get_site_cache_key(cli_ctx, resource_group_name, name, slot) + '/publishingCredentials')
+
+
 def _get_log(url, user_name, password, log_file=None):
-    import certifi
     import urllib3
-    try:
-        import urllib3.contrib.pyopenssl
-        urllib3.contrib.pyopenssl.inject_into_urllib3()
-    except ImportError:
-        pass
+    from ._log_utils import get_pool_manager, download_log, stream_logs, LogSource
 
-    http = urllib3.PoolManager(cert_reqs='CERT_REQUIRED', ca_certs=certifi.where())
     headers = urllib3.util.make_headers(basic_auth='{0}:{1}'.format(user_name, password))
-    r = http.request(
-        'GET',
-        url,
-        headers=headers,
-        preload_content=False
-    )
-    if r.status != 200:
-        raise CLIError("Failed to connect to '{}' with status code '{}' and reason '{}'".format(
-            url, r.status, r.reason))
     if log_file:  # download logs
-        with open(log_file, 'wb') as f:
-            while True:
-                data = r.read(1024)
-                if not data:
-                    break
-                f.write(data)
+        download_log(get_pool_manager(), url, headers, log_file)
     else:  # streaming
-        std_encoding = sys.stdout.encoding
-        for chunk in r.stream():
-            if chunk:
-                # Extra encode() and decode for stdout which does not surpport 'utf-8'
-                print(chunk.decode(encoding='utf-8', errors='replace')
-                      .encode(std_encoding, errors='replace')
-                      .decode(std_encoding, errors='replace'), end='')  # each line of log has CRLF.
-    r.release_conn()
+        stream_logs([LogSource(url, url, headers)])
 
 
 def upload_ssl_cert(cmd, resource_group_name, name, certificate_password, certificate_file):
@@ -2096,26 +2214,159 @@ def list_locations(cmd, sku, linux_workers_enabled=None):
     return client.list_geo_regions(full_sku, linux_workers_enabled)
 
 
-def _check_zip_deployment_status(deployment_status_url, authorization, timeout=None):
+def _delete_scm_files(cmd, resource_group_name, name, paths, slot=None):
+    """Delete the files from the app, warning about each which fails, and return the paths of those."""
+    import urllib3
     import requests
-    total_trials = (int(timeout) // 2) if timeout else 450
-    num_trials = 0
-    while num_trials < total_trials:
-        time.sleep(2)
-        response = requests.get(deployment_status_url, headers=authorization)
+    from six.moves.urllib.parse import quote  # pylint: disable=import-error
+    user_name, password = _get_site_credential(cmd.cli_ctx, resource_group_name, name, slot)
+    scm_url = _get_scm_url(cmd, resource_group_name, name, slot)
+    headers = urllib3.util.make_headers(basic_auth='{0}:{1}'.format(user_name, password))
+    headers['If-Match'] = '*'
+    failed = []
+    for path in paths:
+        try:
+            response = _get_scm_session().delete(scm_url + '/api/vfs/site/wwwroot/' + quote(path), headers=headers)
+        except requests.exceptions.RequestException as ex:
+            logger.warning("Failed to delete '%s' from the app: %s", path, ex)
+            failed.append(path)
+            continue
+        if response.status_code == 401:
+            _invalidate_site_credential(cmd.cli_ctx, resource_group_name, name, slot)
+            raise ScmUnauthorizedError("Failed to delete '{}' from the app: the publishing credentials were "
+                                       "rejected. Please try again.".format(path))
+        if response.status_code >= 400 and response.status_code != 404:
+            logger.warning("Failed to delete '%s' from the app: HTTP %s %s", path, response.status_code,
+                           response.text)
+            failed.append(path)
+    return failed
+
+
+def _check_zip_deployment_status(deployment_status_url, authorization, timeout=None):
+    """Poll the status of the async deployment until it succeeds or fails, or the timeout expires.
+
+    The polls reuse the connection of the scm session, and send the ETag of the last status so an unchanged
+    status isn't sent again. The delay between polls starts short, as small deployments complete in seconds,
+    and doubles with some jitter up to ZIP_DEPLOY_POLL_MAX_INTERVAL.
+    """
+    import random
+    timeout = int(timeout) if timeout else ZIP_DEPLOY_TIMEOUT
+    deadline = time.time() + timeout
+    delay = ZIP_DEPLOY_POLL_MIN_INTERVAL
+    etag = None
+    res_dict = {}
+    while True:
+        remaining = deadline - time.time()
+        if remaining <= 0:
+            break
+        time.sleep(min(delay * random.uniform(0.5, 1), remaining))
+        delay = min(delay * 2, ZIP_DEPLOY_POLL_MAX_INTERVAL)
+
+        headers = dict(authorization)
+        if etag:
+            headers['If-None-Match'] = etag
+        response = _get_scm_session().get(deployment_status_url, headers=headers)
+        if response.status_code == 304:
+            continue
+        if response.status_code == 401:
+            raise ScmUnauthorizedError("Failed to get the status of the deployment at '{}': the publishing "
+                                       "credentials were rejected.".format(deployment_status_url))
         res_dict = response.json()
-        num_trials = num_trials + 1
+        etag = response.headers.get('ETag')
         if res_dict.get('status', 0) == 3:
             raise CLIError("Zip deployment failed. {}".format(res_dict))
         elif res_dict.get('status', 0) == 4:
-            break
+            return res_dict
         if 'progress' in res_dict:
             logger.info(res_dict['progress'])  # show only in debug mode, customers seem to find this confusing
     # if the deployment is taking longer than expected
-    if res_dict.get('status', 0) != 4:
-        raise CLIError("""Deployment is taking longer than expected. Please verify
+    raise CLIError("""Deployment is taking longer than expected. Please verify
                             status at '{}' beforing launching the app""".format(deployment_status_url))
-    return res_dict
+
+
+_scm_session = None
+_scm_session_lock = threading.Lock()
+
+ZIP_DEPLOY_RETRIES = 3
+ZIP_DEPLOY_TRANSIENT_STATUS_CODES = [408, 409, 429, 500, 502, 503, 504]
+ZIP_DEPLOY_TIMEOUT = 900  # in seconds
+# a stalled upload, or one the site doesn't answer, fails after these many seconds without progress and is retried
+ZIP_UPLOAD_CONNECT_TIMEOUT = 30
+ZIP_UPLOAD_READ_TIMEOUT = 300
+ZIP_DEPLOY_POLL_MIN_INTERVAL = 1
+ZIP_DEPLOY_POLL_MAX_INTERVAL = 10
+
+
+def _get_scm_session():
+    """Return the requests session shared by the calls to the scm sites, so connections are reused."""
+    global _scm_session  # pylint: disable=global-statement
+    with _scm_session_lock:
+        if _scm_session is None:
+            import requests
+            _scm_session = requests.Session()
+        return _scm_session
+
+
+class _ZipUploadReader(object):
+    """File object streaming the zip to upload, so it is sent in small blocks rather than read in memory."""
+
+    def __init__(self, fs, size):
+        self._fs = fs
+        self._size = size
+        self.bytes_read = 0
+
+    def __len__(self):
+        return self._size
+
+    def read(self, size=-1):
+        data = self._fs.read(size)
+        self.bytes_read += len(data)
+        return data
+
+
+def _upload_zip(zip_url, headers, zip_path, retry_interval=2):
+    """Post the zip, streaming it from disk, and retry the transient failures with exponential backoff."""
+    import os
+    import requests
+
+    size = os.path.getsize(zip_path)
+    for attempt in range(ZIP_DEPLOY_RETRIES + 1):
+        with open(zip_path, 'rb') as fs:
+            reader = _ZipUploadReader(fs, size)
+            start = time.time()
+            try:
+                response = _get_scm_session().post(zip_url, data=reader, headers=headers,
+                                                   timeout=(ZIP_UPLOAD_CONNECT_TIMEOUT, ZIP_UPLOAD_READ_TIMEOUT))
+                error = 'HTTP {}'.format(response.status_code)
+                if response.status_code not in ZIP_DEPLOY_TRANSIENT_STATUS_CODES:
+                    break
+            except (requests.ConnectionError, requests.Timeout) as ex:
+                error = ex
+        if attempt < ZIP_DEPLOY_RETRIES:
+            delay = retry_interval * 2 ** attempt
+            logger.warning("Zip upload failed after %s of %s bytes (%s). Retrying in %s seconds...",
+                           reader.bytes_read, size, error, delay)
+            time.sleep(delay)
+    else:
+        raise CLIError("Failed to upload the zip to '{}': {}".format(zip_url.split('?')[0], error))
+
+    if response.status_code == 401:
+        raise ScmUnauthorizedError("Failed to upload the zip to '{}': the publishing credentials were rejected.".format(
+            zip_url.split('?')[0]))
+    if response.status_code >= 400:
+        raise CLIError("Failed to upload the zip to '{}': HTTP {} {}".format(
+            zip_url.split('?')[0], response.status_code, response.text))
+
+    elapsed = max(time.time() - start, 0.001)
+    logger.info("Uploaded %.1f MiB in %.1f seconds (%.1f MiB/s)",
+                size / 1048576.0, elapsed, size / 1048576.0 / elapsed)
+    try:
+        import resource
+        # kilobytes on Linux, bytes on macOS
+        logger.info("Peak memory usage: %s", resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+    except ImportError:  # Windows
+        pass
+    return response
 
 
 def list_continuous_webjobs(cmd, resource_group_name, name, slot=None):
@@ -2310,19 +2561,39 @@ def create_deploy_webapp(cmd, name, location=None, sku=None, dryrun=False):  # p
         update_app_settings(cmd, rg_name, name, ["SCM_DO_BUILD_DURING_DEPLOYMENT=true"])
 
     if do_deployment:
-        logger.warning("Creating zip with contents of dir %s ...", src_dir)
+        from azure.cli.core.commands.client_factory import get_subscription_id
+        manifest = get_deployment_manifest(get_subscription_id(cmd.cli_ctx), rg_name, name)
+        # the files deployed last time are only known for an existing app, and the build during the deployment
+        # needs all the files of the app
+        deployed_files = None if _create_new_app or _set_build_app_setting else manifest.get('files')
+        logger.warning("Creating zip with %s contents of dir %s ...",
+                       'changed' if deployed_files else 'the', src_dir)
         # zip contents & deploy
-        zip_file_path = zip_contents_from_dir(src_dir, language)
+        zip_file_path, files, deleted = zip_changed_contents_from_dir(src_dir, language, deployed_files)
 
-        logger.warning("Preparing to deploy %s contents to app."
-                       "This operation can take a while to complete ...",
-                       '' if is_skip_build else 'and build')
-        enable_zip_deploy(cmd, rg_name, name, zip_file_path)
-        # Remove the file after deployment, handling exception if user removed the file manually
-        try:
-            os.remove(zip_file_path)
-        except OSError:
-            pass
+        if zip_file_path:
+            logger.warning("Preparing to deploy %s contents to app."
+                           "This operation can take a while to complete ...",
+                           '' if is_skip_build else 'and build')
+            try:
+                _zip_deploy(cmd, rg_name, name, zip_file_path, clean=not deployed_files)
+            finally:
+                # Remove the file after deployment, handling exception if user removed the file manually
+                try:
+                    os.remove(zip_file_path)
+                except OSError:
+                    pass
+        if deleted:
+            logger.warning("Deleting %s files removed since the last deployment ...", len(deleted))
+            failed = _delete_scm_files(cmd, rg_name, name, deleted)
+            if failed:
+                logger.warning("%s of the removed files couldn't be deleted from the app. They will be deleted "
+                               "with the next deployment.", len(failed))
+                # kept in the manifest, so they are deleted again next time
+                files.update((path, deployed_files[path]) for path in failed)
+        if not zip_file_path and not deleted:
+            logger.warning("No changes to deploy since the last deployment.")
+        manifest['files'] = files
     create_json.update({'app_url': url})
     logger.warning("All done.")
     return create_json
@@ -2330,13 +2601,12 @@ def create_deploy_webapp(cmd, name, location=None, sku=None, dryrun=False):  # p
 
 def _ping_scm_site(cmd, resource_group, name):
     #  wakeup kudu, by making an SCM call
-    import requests
     #  work around until the timeout limits issue for linux is investigated & fixed
     user_name, password = _get_site_credential(cmd.cli_ctx, resource_group, name)
     scm_url = _get_scm_url(cmd, resource_group, name)
     import urllib3
     authorization = urllib3.util.make_headers(basic_auth='{}:{}'.format(user_name, password))
-    requests.get(scm_url + '/api/settings', headers=authorization)
+    _get_scm_session().get(scm_url + '/api/settings', headers=authorization)
 
 
 def is_webapp_up(tunnel_server):
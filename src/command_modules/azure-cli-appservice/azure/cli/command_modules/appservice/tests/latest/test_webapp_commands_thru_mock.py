@@ -2,21 +2,31 @@
 # Copyright (c) Microsoft Corporation. All rights reserved.
 # Licensed under the MIT License. See License.txt in the project root for license information.
 # --------------------------------------------------------------------------------------------
+import os
+import shutil
+import tempfile
+import threading
+import time
 import unittest
 import mock
 
+from six.moves import BaseHTTPServer, socketserver  # pylint: disable=import-error
+
 from msrestazure.azure_exceptions import CloudError
 from azure.mgmt.web.models import (SourceControl, HostNameBinding, Site, SiteConfig,
                                    HostNameSslState, SslState, Certificate,
                                    AddressResponse, HostingEnvironmentProfile,
                                    DeletedAppRestoreRequest, SnapshotRecoverySource,
-                                   SnapshotRestoreRequest)
+                                   SnapshotRestoreRequest, StringDictionary,
+                                   SlotConfigNamesResource, SiteConfigResource)
 from azure.mgmt.web import WebSiteManagementClient
 from azure.cli.core.adal_authentication import AdalAuthentication
 from knack.util import CLIError
 from azure.cli.command_modules.appservice.custom import (set_deployment_user,
                                                          update_git_token, add_hostname,
                                                          update_site_configs,
+                                                         update_app_settings,
+                                                         list_webapp,
                                                          get_external_ip,
                                                          view_in_browser,
                                                          sync_site_repo,
@@ -30,15 +40,180 @@ from azure.cli.command_modules.appservice.custom import (set_deployment_user,
                                                          validate_container_app_create_options,
                                                          restore_deleted_webapp,
                                                          list_snapshots,
-                                                         restore_snapshot)
+                                                         restore_snapshot,
+                                                         _upload_zip,
+                                                         _delete_scm_files,
+                                                         _check_zip_deployment_status)
+
+from azure.cli.command_modules.appservice._create_util import zip_changed_contents_from_dir
+from azure.cli.command_modules.appservice._zip_utils import write_zip
 
 # pylint: disable=line-too-long
 from vsts_cd_manager.continuous_delivery_manager import ContinuousDeliveryResult
 
 
+class _KuduHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    uploads = []
+
+    def do_POST(self):  # pylint: disable=invalid-name
+        remaining = int(self.headers.get('Content-Length'))
+        received = 0
+        while remaining:
+            data = self.rfile.read(min(remaining, 1024 * 1024))
+            received += len(data)
+            remaining -= len(data)
+        _KuduHandler.uploads.append(received)
+        # the first upload fails with a transient error
+        self.send_response(503 if len(_KuduHandler.uploads) == 1 else 202)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, *args):  # pylint: disable=arguments-differ
+        pass
+
+
+class _StalledKuduHandler(_KuduHandler):
+    def do_POST(self):  # pylint: disable=invalid-name
+        _KuduHandler.uploads.append(int(self.headers.get('Content-Length')))
+        # the first upload is not answered in time
+        if len(_KuduHandler.uploads) == 1:
+            time.sleep(1)
+        self.rfile.read(_KuduHandler.uploads[-1])
+        self.send_response(202)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+
+class _ThreadingHTTPServer(socketserver.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    # the keep-alive connections of the client don't block the shutdown of the server
+    daemon_threads = True
+
+
+class _FakeClock(object):
+    def __init__(self):
+        self.now = 0
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class _KuduDeploymentHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    clock = None
+    duration = 0
+    connections = 0
+    requests = []
+
+    def setup(self):
+        BaseHTTPServer.BaseHTTPRequestHandler.setup(self)
+        _KuduDeploymentHandler.connections += 1
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        import json
+        # the progress of the deployment changes every 30 seconds
+        now = _KuduDeploymentHandler.clock.now
+        if now >= _KuduDeploymentHandler.duration:
+            body = {'status': 4, 'complete': True}
+        else:
+            body = {'status': 1, 'progress': 'step {}'.format(int(now // 30))}
+        etag = '"{}"'.format(body.get('progress', 'done'))
+        not_modified = self.headers.get('If-None-Match') == etag
+        _KuduDeploymentHandler.requests.append((now, 304 if not_modified else 200))
+        content = b'' if not_modified else json.dumps(body).encode('utf-8')
+        self.send_response(304 if not_modified else 200)
+        self.send_header('ETag', etag)
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, *args):  # pylint: disable=arguments-differ
+        pass
+
+
+class _LogStreamHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    """Streams the log in chunks, resets the first connection midway and resumes from the requested offset."""
+    protocol_version = 'HTTP/1.1'
+    log = b''
+    requests = None
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        offset = int(self.headers.get('Range', 'bytes=0-')[6:-1])
+        self.requests.append(offset)
+        if offset >= len(self.log):
+            self.send_response(404)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        self.send_response(206 if offset else 200)
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        # the first connection breaks in the middle of a line
+        end = len(self.log) // 3 + 7 if len(self.requests) == 1 else len(self.log)
+        for start in range(offset, end, 1000):
+            chunk = self.log[start:min(start + 1000, end)]
+            self.wfile.write('{:x}\r\n'.format(len(chunk)).encode() + chunk + b'\r\n')
+        if len(self.requests) == 1:
+            self.close_connection = True
+            return
+        self.wfile.write(b'0\r\n\r\n')
+
+    def log_message(self, *args):  # pylint: disable=arguments-differ
+        pass
+
+
+class _LogDumpHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    """Serves the dump with ranges, resetting the first connections partway through."""
+    protocol_version = 'HTTP/1.1'
+    dump = b''
+    ranges = True
+    requests = []
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        offset = int(self.headers.get('Range', 'bytes=0-')[6:-1]) if self.ranges else 0
+        _LogDumpHandler.requests.append(offset)
+        self.send_response(206 if offset else 200)
+        self.send_header('Content-Length', str(len(self.dump) - offset))
+        if offset:
+            self.send_header('Content-Range', 'bytes {}-{}/{}'.format(offset, len(self.dump) - 1, len(self.dump)))
+        self.end_headers()
+        end = len(self.dump) * len(_LogDumpHandler.requests) // 3
+        self.wfile.write(self.dump[offset:end])
+        self.close_connection = True
+
+    def log_message(self, *args):  # pylint: disable=arguments-differ
+        pass
+
+
+class _EchoWebSocket(object):
+    """Echoes the frames sent to the tunnel back to it."""
+    def __init__(self):
+        from six.moves import queue  # pylint: disable=import-error
+        self.connected = True
+        self._frames = queue.Queue()
+
+    def send_binary(self, data):
+        self._frames.put(data)
+
+    def recv(self):
+        return self._frames.get()
+
+    def close(self):
+        self._frames.put(None)
+
+
 class TestWebappMocked(unittest.TestCase):
     def setUp(self):
         self.client = WebSiteManagementClient(AdalAuthentication(lambda: ('bearer', 'secretToken')), '123455678')
+        # the credentials of the apps are cached in a directory of the test
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir)
+        patcher = mock.patch('azure.cli.command_modules.appservice._credential_cache._get_cache_dir',
+                             return_value=cache_dir)
+        patcher.start()
+        self.addCleanup(patcher.stop)
 
     @mock.patch('azure.cli.command_modules.appservice.custom.web_client_factory', autospec=True)
     def test_set_deployment_user_creds(self, client_factory_mock):
@@ -212,6 +387,73 @@ class TestWebappMocked(unittest.TestCase):
         self.assertEqual(config_for_set.use32_bit_worker_process, None)
         self.assertEqual(config_for_set.java_container, None)
 
+    @mock.patch('azure.cli.command_modules.appservice.custom.web_client_factory', autospec=True)
+    def test_update_app_settings_skips_unchanged(self, client_factory_mock):
+        client = mock.MagicMock()
+        client_factory_mock.return_value = client
+        client.web_apps.list_application_settings.side_effect = \
+            lambda *args: StringDictionary(properties={'s1': 'v1', 's2': 'v2'})
+        client.web_apps.update_application_settings.side_effect = \
+            lambda rg, name, kind, properties: StringDictionary(properties=properties)
+        client.web_apps.list_slot_configuration_names.side_effect = \
+            lambda *args: SlotConfigNamesResource(app_setting_names=['s2'])
+        cmd = mock.MagicMock()
+
+        # action: nothing changes
+        result = update_app_settings(cmd, 'myRG', 'myweb', settings=['s1=v1'], slot_settings=['s2=v2'])
+        # assert: the settings are read, but neither they nor the slot setting names are written
+        self.assertEqual(client.web_apps.list_application_settings.call_count, 1)
+        self.assertEqual(client.web_apps.list_slot_configuration_names.call_count, 1)
+        client.web_apps.update_application_settings.assert_not_called()
+        client.web_apps.update_slot_configuration_names.assert_not_called()
+        self.assertEqual(sorted((s['name'], s['value'], s['slotSetting']) for s in result),
+                         [('s1', 'v1', False), ('s2', 'v2', True)])
+
+        # action: a setting changes and another slot setting is added
+        result = update_app_settings(cmd, 'myRG', 'myweb', settings=['s1=v3'], slot_settings=['s3=v4'])
+        # assert: each is written once, in a single call
+        client.web_apps.update_application_settings.assert_called_once_with(
+            'myRG', 'myweb', str, {'s1': 'v3', 's2': 'v2', 's3': 'v4'})
+        client.web_apps.update_slot_configuration_names.assert_called_once_with('myRG', 'myweb', mock.ANY)
+        slot_cfg_names = client.web_apps.update_slot_configuration_names.call_args[0][2]
+        self.assertEqual(slot_cfg_names.app_setting_names, ['s2', 's3'])
+        self.assertEqual(len(result), 3)
+
+    @mock.patch('azure.cli.command_modules.appservice.custom.web_client_factory', autospec=True)
+    def test_list_webapp_with_config(self, client_factory_mock):
+        client = mock.MagicMock()
+        client_factory_mock.return_value = client
+
+        def _list_sites(_):
+            for i in range(30):
+                site = Site(location='westus', kind='functionapp' if i % 3 == 0 else 'app', server_farm_id='plan')
+                site.name, site.resource_group = 'app{}'.format(i), 'myRG'
+                yield site
+
+        client.web_apps.list_by_resource_group.side_effect = _list_sites
+        names = ['app{}'.format(i) for i in range(30) if i % 3]
+        client.web_apps.get_configuration.side_effect = \
+            lambda rg, name: SiteConfigResource(linux_fx_version=name, always_on=True)
+        client.web_apps.list_application_settings.side_effect = \
+            lambda rg, name: StringDictionary(properties={'APP': name, 'DOCKER_REGISTRY_SERVER_PASSWORD': 'secret'})
+
+        # action
+        result = list_webapp(mock.MagicMock(), 'myRG')
+        # assert: the apps are listed without any other call
+        self.assertEqual([r.name for r in result], names)
+        client.web_apps.get_configuration.assert_not_called()
+
+        # action
+        result = list_webapp(mock.MagicMock(), 'myRG', show_config=True, show_app_settings=True)
+        # assert: the configuration and settings of the web apps only are fetched, once each, in order
+        self.assertEqual([r.name for r in result], names)
+        self.assertEqual(client.web_apps.get_configuration.call_count, 20)
+        self.assertEqual(client.web_apps.list_application_settings.call_count, 20)
+        self.assertEqual(client_factory_mock.call_count, 2)
+        for r in result:
+            self.assertEqual(r.site_config.linux_fx_version, r.name)
+            self.assertEqual(sorted(s['value'] for s in r.app_settings if s['value']), [r.name])
+
     @mock.patch('azure.cli.command_modules.appservice.custom._generic_site_operation', autospec=True)
     def test_list_publish_profiles_on_slots(self, site_op_mock):
         site_op_mock.return_value = [b'<publishData><publishProfile publishUrl="ftp://123"/><publishProfile publishUrl="ftp://1234"/></publishData>']
@@ -366,6 +608,353 @@ class TestWebappMocked(unittest.TestCase):
         site_op_mock.assert_called_with(cli_ctx_mock, 'rg', 'web1', 'list_publishing_credentials', None)
         get_log_mock.assert_called_with(test_scm_url + '/dump', 'great_user', 'secret_password', None)
 
+    def _start_kudu_server(self, handler):
+        import requests
+        server = _ThreadingHTTPServer(('127.0.0.1', 0), handler)
+        thread = threading.Thread(target=server.serve_forever)
+        thread.daemon = True
+        thread.start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        # a session of its own, so the connections of other tests aren't reused or counted
+        session = requests.Session()
+        self.addCleanup(session.close)
+        patcher = mock.patch('azure.cli.command_modules.appservice.custom._get_scm_session', return_value=session)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return server
+
+    def test_upload_zip_streams_and_retries(self):
+        server = self._start_kudu_server(_KuduHandler)
+        _KuduHandler.uploads = []
+
+        # a sparse file, streamed from disk rather than read in memory
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+        zip_path = os.path.join(temp_dir, 'app.zip')
+        size = 64 * 1024 * 1024
+        with open(zip_path, 'wb') as f:
+            f.truncate(size)
+
+        zip_url = 'http://127.0.0.1:{}/api/zipdeploy?isAsync=true'.format(server.server_port)
+        response = _upload_zip(zip_url, {'content-type': 'application/octet-stream'}, zip_path, retry_interval=0)
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(_KuduHandler.uploads, [size, size])
+
+    @mock.patch('azure.cli.command_modules.appservice.custom.ZIP_UPLOAD_READ_TIMEOUT', 0.2)
+    def test_upload_zip_retries_unanswered_upload(self):
+        server = self._start_kudu_server(_StalledKuduHandler)
+        _KuduHandler.uploads = []
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+        zip_path = os.path.join(temp_dir, 'app.zip')
+        with open(zip_path, 'wb') as f:
+            f.write(b'zip')
+
+        zip_url = 'http://127.0.0.1:{}/api/zipdeploy?isAsync=true'.format(server.server_port)
+        response = _upload_zip(zip_url, {'content-type': 'application/octet-stream'}, zip_path, retry_interval=0)
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(_KuduHandler.uploads, [3, 3])
+
+    def test_check_zip_deployment_status(self):
+        server = self._start_kudu_server(_KuduDeploymentHandler)
+        clock = _FakeClock()
+        _KuduDeploymentHandler.clock = clock
+        _KuduDeploymentHandler.duration = 180
+        _KuduDeploymentHandler.connections = 0
+        _KuduDeploymentHandler.requests = []
+        status_url = 'http://127.0.0.1:{}/api/deployments/latest'.format(server.server_port)
+
+        with mock.patch('azure.cli.command_modules.appservice.custom.time', clock):
+            result = _check_zip_deployment_status(status_url, {'authorization': 'Basic secret'})
+        self.assertEqual(result['status'], 4)
+        requests = _KuduDeploymentHandler.requests
+        # a 3 minute deployment was polled every 2 seconds before
+        self.assertLess(len(requests), 45)
+        self.assertEqual(_KuduDeploymentHandler.connections, 1)
+        self.assertTrue(any(status == 304 for _, status in requests))
+        # the polling stops as soon as the deployment completes, within the longest delay
+        self.assertEqual(len([now for now, _ in requests if now >= 180]), 1)
+        self.assertLess(requests[-1][0], 190)
+
+        # the deployment times out
+        clock.now = 0
+        _KuduDeploymentHandler.requests = []
+        with mock.patch('azure.cli.command_modules.appservice.custom.time', clock):
+            with self.assertRaises(CLIError):
+                _check_zip_deployment_status(status_url, {'authorization': 'Basic secret'}, timeout=60)
+        self.assertEqual(clock.now, 60)
+
+    def test_stream_logs(self):
+        import io
+        from azure.cli.command_modules.appservice._log_utils import LogSource, stream_logs
+
+        sources, handlers = [], []
+        for name in ['app1', 'app2', 'app3']:
+            handler = type('LogStreamHandler', (_LogStreamHandler,), {
+                'log': b''.join('{} line {}\r\n'.format(name, i).encode() for i in range(20000)),
+                'requests': []
+            })
+            handlers.append(handler)
+            server = self._start_kudu_server(handler)
+            sources.append(LogSource(name, 'http://127.0.0.1:{}/logstream'.format(server.server_port), {}))
+        output = io.BytesIO()
+
+        # the streams end with a 404 once the whole log is sent
+        with self.assertRaises(CLIError):
+            stream_logs(sources, output=output, retry_interval=0)
+
+        lines = output.getvalue().split(b'\n')
+        self.assertEqual(lines.pop(), b'')
+        self.assertEqual(len(lines), 60000)
+        for name in ['app1', 'app2', 'app3']:
+            prefix = '[{}] '.format(name).encode()
+            self.assertEqual([line for line in lines if line.startswith(prefix)],
+                             [prefix + '{} line {}\r'.format(name, i).encode() for i in range(20000)])
+        # the broken connection was resumed from where it stopped
+        for handler in handlers:
+            self.assertEqual(handler.requests, [0, len(handler.log) // 3 + 7, len(handler.log)])
+
+    def test_get_site_targets(self):
+        from azure.cli.command_modules.appservice.custom import _get_site_targets
+        cmd = mock.MagicMock()
+        cmd.cli_ctx.data = {'subscription_id': 'sub1'}
+
+        targets = _get_site_targets(cmd, 'rg', ['web1', 'web2'], ['staging'], None)
+        self.assertEqual(targets, [(cmd, 'rg', 'web1', 'staging'), (cmd, 'rg', 'web2', 'staging')])
+
+        targets = _get_site_targets(cmd, None, None, None, [
+            '/subscriptions/sub1/resourceGroups/rg1/providers/Microsoft.Web/sites/web1',
+            '/subscriptions/sub2/resourceGroups/rg2/providers/Microsoft.Web/sites/web2/slots/staging'])
+        self.assertEqual([t[1:] for t in targets], [('rg1', 'web1', None), ('rg2', 'web2', 'staging')])
+        self.assertIs(targets[0][0], cmd)
+        # the app in another subscription is handled in that subscription
+        self.assertEqual(targets[1][0].cli_ctx.data['subscription_id'], 'sub2')
+        self.assertEqual(cmd.cli_ctx.data['subscription_id'], 'sub1')
+
+    def test_download_log_resumes(self):
+        from azure.cli.command_modules.appservice._log_utils import download_log, get_pool_manager
+        server = self._start_kudu_server(_LogDumpHandler)
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+        log_file = os.path.join(temp_dir, 'logs.zip')
+        url = 'http://127.0.0.1:{}/dump'.format(server.server_port)
+        _LogDumpHandler.dump = os.urandom(3 * 1024 * 1024)
+
+        # the download resumes where each connection was reset
+        _LogDumpHandler.requests = []
+        self.assertEqual(download_log(get_pool_manager(), url, {}, log_file, retry_interval=0), 3 * 1024 * 1024)
+        self.assertEqual(_LogDumpHandler.requests, [0, 1024 * 1024, 2 * 1024 * 1024])
+        with open(log_file, 'rb') as f:
+            self.assertEqual(f.read(), _LogDumpHandler.dump)
+        self.assertEqual(os.listdir(temp_dir), ['logs.zip'])
+
+        # without ranges, the download starts over
+        _LogDumpHandler.requests = []
+        with mock.patch.object(_LogDumpHandler, 'ranges', False):
+            download_log(get_pool_manager(), url, {}, log_file, retry_interval=0)
+        self.assertEqual(_LogDumpHandler.requests, [0, 0, 0])
+        with open(log_file, 'rb') as f:
+            self.assertEqual(f.read(), _LogDumpHandler.dump)
+
+    @mock.patch('azure.cli.command_modules.appservice.custom._get_site_credential', autospec=True)
+    @mock.patch('azure.cli.command_modules.appservice.custom._get_scm_url', autospec=True)
+    @mock.patch('azure.cli.command_modules.appservice.custom._get_log', autospec=True)
+    def test_download_logs_of_several_apps(self, get_log_mock, get_scm_url_mock, get_credential_mock):
+        get_scm_url_mock.side_effect = lambda cmd, rg, name, slot: 'https://{}.scm'.format(name)
+        get_credential_mock.return_value = ('user', 'password')
+
+        download_historical_logs(mock.MagicMock(), 'rg', ['web1'], 'logs.zip', ['staging'])
+        get_log_mock.assert_called_with('https://web1.scm/dump', 'user', 'password', 'logs.zip')
+
+        # a file for each app
+        download_historical_logs(mock.MagicMock(), 'rg', ['web1', 'web2'], 'logs.zip', None)
+        self.assertEqual(sorted(c[0][3] for c in get_log_mock.call_args_list[1:]), ['logs_web1.zip', 'logs_web2.zip'])
+
+        # the other apps are downloaded when one fails
+        get_log_mock.reset_mock()
+        get_log_mock.side_effect = CLIError('boom')
+        with self.assertRaises(CLIError):
+            download_historical_logs(mock.MagicMock(), 'rg', ['web1', 'web2'], 'logs.zip', None)
+        self.assertEqual(get_log_mock.call_count, 2)
+
+    @mock.patch('azure.cli.command_modules.appservice._log_utils.stream_logs', autospec=True)
+    @mock.patch('azure.cli.command_modules.appservice.custom._check_zip_deployment_status', autospec=True)
+    @mock.patch('azure.cli.command_modules.appservice.custom._upload_zip', autospec=True)
+    @mock.patch('azure.cli.command_modules.appservice.custom._fill_ftp_publishing_url', autospec=True)
+    @mock.patch('azure.cli.command_modules.appservice.custom._rename_server_farm_props', autospec=True)
+    @mock.patch('azure.cli.command_modules.appservice._appservice_utils.web_client_factory', autospec=True)
+    def test_site_credentials_are_cached(self, client_factory_mock, *mocks):
+        upload_mock, stream_logs_mock = mocks[2], mocks[4]
+        from azure.cli.command_modules.appservice.custom import _zip_deploy
+        from azure.cli.command_modules.appservice._credential_cache import ScmUnauthorizedError
+        from azure.mgmt.web.models import HostType
+        client = client_factory_mock.return_value
+        client.web_apps.get.return_value = Site(location='westus', host_name_ssl_states=[
+            HostNameSslState(name='web1.scm.azurewebsites.net', host_type=HostType.repository)])
+        client.web_apps.get_slot.return_value = client.web_apps.get.return_value
+        client.web_apps.list_publishing_credentials.return_value.result.return_value = mock.MagicMock(
+            publishing_user_name='$web1', publishing_password='secret')
+        cmd = mock.MagicMock()
+        cmd.cli_ctx.data = {'subscription_id': 'sub1'}
+
+        # a zip deployment followed by a log tail gets the app and its credentials once
+        _zip_deploy(cmd, 'rg', 'web1', 'app.zip')
+        get_streaming_log(cmd, 'rg', ['web1'])
+        self.assertEqual(client.web_apps.get.call_count, 1)
+        self.assertEqual(client.web_apps.list_publishing_credentials.call_count, 1)
+        self.assertEqual(upload_mock.call_args[0][0], 'https://web1.scm.azurewebsites.net/api/zipdeploy?isAsync=true')
+        source = stream_logs_mock.call_args[0][0][0]
+        self.assertEqual(source.url, 'https://web1.scm.azurewebsites.net/logstream')
+        self.assertEqual(source.headers, {'authorization': 'Basic JHdlYjE6c2VjcmV0'})
+        # the cached credentials are encrypted and readable by the owner only
+        from azure.cli.command_modules.appservice._credential_cache import _get_cache_dir
+        for name in os.listdir(_get_cache_dir()):
+            path = os.path.join(_get_cache_dir(), name)
+            with open(path, 'rb') as f:
+                self.assertNotIn(b'secret', f.read())
+            if os.name != 'nt':
+                self.assertEqual(os.stat(path).st_mode & 0o777, 0o600)
+
+        # the credentials are fetched again when the cached ones are rejected
+        upload_mock.side_effect = [ScmUnauthorizedError('rejected'), None]
+        _zip_deploy(cmd, 'rg', 'web1', 'app.zip')
+        self.assertEqual(client.web_apps.list_publishing_credentials.call_count, 2)
+        self.assertEqual(upload_mock.call_count, 3)
+
+        # other apps and slots have their own entries
+        get_streaming_log(cmd, 'rg', ['web1'], slot=['staging'])
+        self.assertEqual(client.web_apps.get_slot.call_count, 1)
+        self.assertEqual(client.web_apps.list_publishing_credentials_slot.call_count, 1)
+
+    @mock.patch('azure.cli.command_modules.appservice.tunnel.create_connection', autospec=True)
+    def test_tunnel_serves_concurrent_connections(self, create_connection_mock):
+        import socket
+        from azure.cli.command_modules.appservice.tunnel import TunnelServer
+        create_connection_mock.side_effect = lambda *args, **kwargs: _EchoWebSocket()
+        tunnel = TunnelServer('127.0.0.1', 0, 'web1', 'user', 'password')
+        thread = threading.Thread(target=tunnel.start_server)
+        thread.daemon = True
+        thread.start()
+
+        # both debuggers get their data echoed while the other is connected
+        clients = [socket.create_connection(('127.0.0.1', tunnel.get_port()), timeout=10) for _ in range(2)]
+        for i, client in enumerate(clients):
+            data = os.urandom(200 * 1024)
+            client.sendall(data)
+            received = b''
+            while len(received) < len(data):
+                received += client.recv(65536)
+            self.assertEqual(received, data)
+        for client in clients:
+            client.close()
+        self.assertEqual(create_connection_mock.call_count, 2)
+        self.assertEqual(create_connection_mock.call_args[0][0],
+                         'wss://web1.scm.azurewebsites.net/AppServiceTunnel/Tunnel.ashx')
+
+    def test_zip_changed_contents_from_dir(self):
+        import zipfile
+
+        def _zipped(zip_path):
+            with zipfile.ZipFile(zip_path) as zf:
+                return sorted(zf.namelist())
+
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+        src_dir = os.path.join(temp_dir, 'app')
+        os.makedirs(os.path.join(src_dir, 'lib'))
+        os.makedirs(os.path.join(src_dir, 'node_modules', 'dep'))
+        for path in ['server.js', 'package.json', 'lib/util.js', 'node_modules/dep/index.js']:
+            with open(os.path.join(src_dir, path), 'w') as f:
+                f.write(path)
+
+        # without a manifest, all the files are zipped
+        zip_path, files, deleted = zip_changed_contents_from_dir(src_dir, 'node')
+        self.assertEqual(_zipped(zip_path), ['lib/util.js', 'package.json', 'server.js'])
+        self.assertEqual(sorted(files), ['lib/util.js', 'package.json', 'server.js'])
+        self.assertEqual(deleted, [])
+
+        # nothing changed
+        zip_path, files, deleted = zip_changed_contents_from_dir(src_dir, 'node', files)
+        self.assertIsNone(zip_path)
+        self.assertEqual(deleted, [])
+
+        # only the edited and added files are zipped, and the removed files are listed
+        with open(os.path.join(src_dir, 'server.js'), 'w') as f:
+            f.write('edited')
+        with open(os.path.join(src_dir, 'lib', 'new.js'), 'w') as f:
+            f.write('new')
+        os.remove(os.path.join(src_dir, 'lib', 'util.js'))
+        zip_path, files, deleted = zip_changed_contents_from_dir(src_dir, 'node', files)
+        self.assertEqual(_zipped(zip_path), ['lib/new.js', 'server.js'])
+        self.assertEqual(sorted(files), ['lib/new.js', 'package.json', 'server.js'])
+        self.assertEqual(deleted, ['lib/util.js'])
+
+        # all the files are zipped when a build manifest changes
+        with open(os.path.join(src_dir, 'package.json'), 'w') as f:
+            f.write('{"dependencies": {}}')
+        zip_path, files, deleted = zip_changed_contents_from_dir(src_dir, 'node', files)
+        self.assertEqual(_zipped(zip_path), ['lib/new.js', 'package.json', 'server.js'])
+        self.assertEqual(deleted, [])
+
+    @mock.patch('azure.cli.command_modules.appservice.custom._get_scm_session', autospec=True)
+    @mock.patch('azure.cli.command_modules.appservice.custom._get_scm_url', autospec=True)
+    @mock.patch('azure.cli.command_modules.appservice.custom._get_site_credential', autospec=True)
+    def test_delete_scm_files_reports_failures(self, credential_mock, scm_url_mock, session_mock):
+        import requests
+        credential_mock.return_value = ('user', 'password')
+        scm_url_mock.return_value = 'https://app.scm.azurewebsites.net'
+        responses = {'a.js': 200, 'gone.js': 404, 'locked.js': 409}
+
+        def _delete(url, headers):
+            path = url.rsplit('/', 1)[1]
+            if path not in responses:
+                raise requests.exceptions.ConnectionError('reset')
+            return mock.MagicMock(status_code=responses[path], text='')
+
+        session_mock.return_value.delete.side_effect = _delete
+        with mock.patch('azure.cli.command_modules.appservice.custom.logger') as logger_mock:
+            failed = _delete_scm_files(mock.MagicMock(), 'myRG', 'myweb', ['a.js', 'gone.js', 'locked.js', 'reset.js'])
+        self.assertEqual(failed, ['locked.js', 'reset.js'])
+        self.assertEqual(logger_mock.warning.call_count, 2)
+
+    def test_write_zip(self):
+        import io
+        import zipfile
+
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+        files = []
+        for name, content in [('b.js', b'console.log(1);\n' * 1000), ('a.png', b'\x89PNG' * 1000),
+                              ('empty.txt', b''), (u'd\u00e9j\u00e0.txt', b'vu')]:
+            path = os.path.join(temp_dir, name)
+            with open(path, 'wb') as f:
+                f.write(content)
+            os.utime(path, (1546300800, 1546300800))  # 2019-01-01 00:00:00 UTC
+            files.append((path, name))
+
+        archives = []
+        for max_workers in [1, 4]:
+            output = io.BytesIO()
+            # in small chunks, and with the larger files moved to temporary files
+            with mock.patch('azure.cli.command_modules.appservice._zip_utils.ZIP_CHUNK_SIZE', 1000), \
+                    mock.patch('azure.cli.command_modules.appservice._zip_utils.ZIP_SPOOL_MAX_SIZE', 1000):
+                write_zip(output, reversed(files), max_workers=max_workers)
+            archives.append(output.getvalue())
+        # the archive doesn't depend on the order of the files or the compression parallelism
+        self.assertEqual(archives[0], archives[1])
+
+        with zipfile.ZipFile(io.BytesIO(archives[0])) as zf:
+            self.assertIsNone(zf.testzip())
+            self.assertEqual(zf.namelist(), ['a.png', 'b.js', u'd\u00e9j\u00e0.txt', 'empty.txt'])
+            self.assertEqual(zf.getinfo('a.png').compress_type, zipfile.ZIP_STORED)
+            self.assertEqual(zf.getinfo('b.js').compress_type, zipfile.ZIP_DEFLATED)
+            self.assertEqual(zf.read('b.js'), b'console.log(1);\n' * 1000)
+            self.assertEqual(zf.read('a.png'), b'\x89PNG' * 1000)
+            # the same on any machine and in any time zone
+            self.assertEqual(zf.getinfo('b.js').create_system, 3)
+            self.assertEqual(zf.getinfo('b.js').date_time, (2019, 1, 1, 0, 0, 0))
+
     def test_valid_linux_create_options(self):
         some_runtime = 'TOMCAT|8.5-jre8'
         test_docker_image = 'lukasz/great-image:123'
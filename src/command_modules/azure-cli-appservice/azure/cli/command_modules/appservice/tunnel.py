@@ -21,18 +21,15 @@ from knack.util import CLIError
 from knack.log import get_logger
 logger = get_logger(__name__)
 
+TUNNEL_BUFFER_SIZE = 64 * 1024
+
 
 class TunnelWebSocket(WebSocket):
     def recv_frame(self):
         frame = super(TunnelWebSocket, self).recv_frame()
-        logger.info('Received frame: %s', frame)
+        logger.debug('Received frame, opcode: %s, length: %s', frame.opcode, len(frame.data or b''))
         return frame
 
-    def recv(self):
-        data = super(TunnelWebSocket, self).recv()
-        logger.info('Received websocket data: %s', data)
-        return data
-
 
 # pylint: disable=no-member,too-many-instance-attributes,bare-except,no-self-use
 class TunnelServer(object):
@@ -42,6 +39,7 @@ class TunnelServer(object):
         if self.local_port != 0 and not self.is_port_open():
             raise CLIError('Defined port is currently unavailable')
         self.remote_addr = remote_addr
+        self.remote_url = 'wss://{}{}'.format(remote_addr, '.scm.azurewebsites.net/AppServiceTunnel/Tunnel.ashx')
         self.remote_user_name = remote_user_name
         self.remote_password = remote_password
         self.client = None
@@ -55,6 +53,8 @@ class TunnelServer(object):
         if self.local_port == 0:
             self.local_port = self.sock.getsockname()[1]
             logger.info('Auto-selecting port: %s', self.local_port)
+        # listening right away, so connections made before the server is started wait to be accepted
+        self.sock.listen(100)
         logger.info('Finished initialization')
 
     def create_basic_auth(self):
@@ -104,55 +104,57 @@ class TunnelServer(object):
         return False
 
     def _listen(self):
-        self.sock.listen(100)
         index = 0
         basic_auth_string = self.create_basic_auth()
+        basic_auth_header = 'Authorization: Basic {}'.format(basic_auth_string)
+        cli_logger = get_logger()  # get CLI logger which has the level set through command lines
+        is_verbose = any(handler.level <= logs.INFO for handler in cli_logger.handlers)
+        if is_verbose:
+            logger.info('Websocket tracing enabled')
+            websocket.enableTrace(True)
+        else:
+            logger.info('Websocket tracing disabled, use --verbose flag to enable')
+            websocket.enableTrace(False)
         while True:
-            self.client, _address = self.sock.accept()
-            self.client.settimeout(60 * 60)
-            host = 'wss://{}{}'.format(self.remote_addr, '.scm.azurewebsites.net/AppServiceTunnel/Tunnel.ashx')
-            basic_auth_header = 'Authorization: Basic {}'.format(basic_auth_string)
-            cli_logger = get_logger()  # get CLI logger which has the level set through command lines
-            is_verbose = any(handler.level <= logs.INFO for handler in cli_logger.handlers)
-            if is_verbose:
-                logger.info('Websocket tracing enabled')
-                websocket.enableTrace(True)
-            else:
-                logger.info('Websocket tracing disabled, use --verbose flag to enable')
-                websocket.enableTrace(False)
-            self.ws = create_connection(host,
-                                        sockopt=((socket.IPPROTO_TCP, socket.TCP_NODELAY, 1),),
-                                        class_=TunnelWebSocket,
-                                        header=[basic_auth_header],
-                                        sslopt={'cert_reqs': ssl.CERT_NONE},
-                                        timeout=60 * 60,
-                                        enable_multithread=True)
-            logger.info('Websocket, connected status: %s', self.ws.connected)
+            client, _address = self.sock.accept()
+            client.settimeout(60 * 60)
             index = index + 1
             logger.info('Got debugger connection... index: %s', index)
-            debugger_thread = Thread(target=self._listen_to_client, args=(self.client, self.ws, index))
-            web_socket_thread = Thread(target=self._listen_to_web_socket, args=(self.client, self.ws, index))
-            debugger_thread.start()
-            web_socket_thread.start()
-            logger.info('Both debugger and websocket threads started...')
-            logger.info('Successfully connected to local server..')
-            debugger_thread.join()
-            web_socket_thread.join()
-            logger.info('Both debugger and websocket threads stopped...')
-            logger.info('Stopped local server..')
+            # each connection is served on threads of its own, so several debuggers can be connected at once
+            connection_thread = Thread(target=self._serve_connection, args=(client, basic_auth_header, index))
+            connection_thread.daemon = True
+            connection_thread.start()
+
+    def _serve_connection(self, client, basic_auth_header, index):
+        try:
+            ws = create_connection(self.remote_url,
+                                   sockopt=((socket.IPPROTO_TCP, socket.TCP_NODELAY, 1),),
+                                   class_=TunnelWebSocket,
+                                   header=[basic_auth_header],
+                                   sslopt={'cert_reqs': ssl.CERT_NONE},
+                                   timeout=60 * 60,
+                                   enable_multithread=True)
+        except Exception as ex:  # pylint: disable=broad-except
+            logger.warning('Failed to connect to the remote debugger: %s', ex)
+            client.close()
+            return
+        logger.info('Websocket, connected status: %s, index: %s', ws.connected, index)
+        self.client, self.ws = client, ws
+        debugger_thread = Thread(target=self._listen_to_client, args=(client, ws, index))
+        debugger_thread.daemon = True
+        debugger_thread.start()
+        logger.info('Successfully connected to local server.., index: %s', index)
+        self._listen_to_web_socket(client, ws, index)
+        debugger_thread.join()
+        logger.info('Both debugger and websocket threads stopped..., index: %s', index)
 
     def _listen_to_web_socket(self, client, ws_socket, index):
         try:
             while True:
-                logger.info('Waiting for websocket data, connection status: %s, index: %s', ws_socket.connected, index)
                 data = ws_socket.recv()
-                logger.info('Received websocket data: %s, index: %s', data, index)
                 if data:
-                    # Set the response to echo back the recieved data
-                    response = data
-                    logger.info('Sending to debugger, response: %s, index: %s', response, index)
-                    client.sendall(response)
-                    logger.info('Done sending to debugger, index: %s', index)
+                    logger.debug('Sending %s bytes to debugger, index: %s', len(data), index)
+                    client.sendall(data)
                 else:
                     break
         except Exception as ex:  # pylint: disable=broad-except
@@ -163,22 +165,21 @@ class TunnelServer(object):
             ws_socket.close()
 
     def _listen_to_client(self, client, ws_socket, index):
+        # one buffer for the connection, rather than one for each read
+        buf = bytearray(TUNNEL_BUFFER_SIZE)
+        view = memoryview(buf)
         try:
             while True:
-                logger.info('Waiting for debugger data, index: %s', index)
-                buf = bytearray(4096)
-                nbytes = client.recv_into(buf, 4096)
-                logger.info('Received debugger data, nbytes: %s, index: %s', nbytes, index)
+                nbytes = client.recv_into(buf, TUNNEL_BUFFER_SIZE)
                 if nbytes > 0:
-                    responseData = buf[0:nbytes]
-                    logger.info('Sending to websocket, response data: %s, index: %s', responseData, index)
-                    ws_socket.send_binary(responseData)
-                    logger.info('Done sending to websocket, index: %s', index)
+                    logger.debug('Sending %s bytes to websocket, index: %s', nbytes, index)
+                    ws_socket.send_binary(view[:nbytes].tobytes())
                 else:
                     break
+        except socket.timeout:
+            logger.warning("Connection Timed Out")
         except Exception as ex:  # pylint: disable=broad-except
             logger.info(ex)
-            logger.warning("Connection Timed Out")
         finally:
             logger.info('Client disconnected %s', index)
             client.close()
@@ -0,0 +1,161 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import time
+
+from msrest.exceptions import ClientException, ClientRequestError
+from msrestazure.tools import parse_resource_id
+from requests.exceptions import RequestException
+
+from knack.log import get_logger
+
+logger = get_logger(__name__)
+
+DELETE_TRANSIENT_RETRIES = 3
+DELETE_RETRY_INTERVAL = 2  # in seconds, doubled with each retry
+_TRANSIENT_STATUS_CODES = [408, 429, 500, 502, 503, 504]
+
+# resource type -> resource types which have to be deleted first, as they reference it
+_DELETE_BLOCKERS = {
+    'microsoft.compute/availabilitysets': ['microsoft.compute/virtualmachines'],
+    'microsoft.compute/disks': ['microsoft.compute/virtualmachines'],
+    'microsoft.network/applicationsecuritygroups': ['microsoft.network/networkinterfaces'],
+    'microsoft.network/loadbalancers': ['microsoft.network/networkinterfaces',
+                                        'microsoft.compute/virtualmachinescalesets'],
+    'microsoft.network/networkinterfaces': ['microsoft.compute/virtualmachines'],
+    'microsoft.network/networksecuritygroups': ['microsoft.network/networkinterfaces',
+                                                'microsoft.network/virtualnetworks'],
+    'microsoft.network/publicipaddresses': ['microsoft.network/networkinterfaces',
+                                            'microsoft.network/loadbalancers',
+                                            'microsoft.network/applicationgateways',
+                                            'microsoft.network/virtualnetworkgateways'],
+    'microsoft.network/routetables': ['microsoft.network/virtualnetworks'],
+    'microsoft.network/virtualnetworks': ['microsoft.network/networkinterfaces',
+                                          'microsoft.network/loadbalancers',
+                                          'microsoft.network/applicationgateways',
+                                          'microsoft.network/virtualnetworkgateways',
+                                          'microsoft.compute/virtualmachinescalesets']
+}
+
+
+def _get_resource_type(resource_id):
+    parts = parse_resource_id(resource_id)
+    resource_type = '{}/{}'.format(parts.get('namespace'), parts.get('type'))
+    level = 1
+    while parts.get('child_type_{}'.format(level)):
+        resource_type += '/' + parts['child_type_{}'.format(level)]
+        level += 1
+    return resource_type.lower()
+
+
+def _get_resource_group_id(resource_id):
+    parts = parse_resource_id(resource_id)
+    return '{}/{}'.format(parts.get('subscription'), parts.get('resource_group')).lower()
+
+
+def get_delete_blockers(resource_ids):
+    """
+    Returns, for the index of each resource id, the indexes of the resources which have to be deleted
+    before it: its child resources and the resources of its resource group of types known to reference it.
+    """
+    ids = [rid.lower().rstrip('/') for rid in resource_ids]
+    types = [_get_resource_type(rid) for rid in resource_ids]
+    groups = [_get_resource_group_id(rid) for rid in resource_ids]
+    blockers = {}
+    for index, rid in enumerate(ids):
+        blocking_types = _DELETE_BLOCKERS.get(types[index], [])
+        blockers[index] = set(other for other, other_id in enumerate(ids)
+                              if other != index and other_id != rid and
+                              (other_id.startswith(rid + '/') or
+                               (types[other] in blocking_types and groups[other] == groups[index])))
+    return blockers
+
+
+def _is_transient(ex):
+    if isinstance(ex, (ClientRequestError, RequestException)):
+        return True
+    response = getattr(ex, 'response', None)
+    return getattr(ex, 'status_code', None) in _TRANSIENT_STATUS_CODES or \
+        getattr(response, 'status_code', None) in _TRANSIENT_STATUS_CODES
+
+
+def _retry_transient_errors(delete):
+    def _run():
+        for attempt in range(DELETE_TRANSIENT_RETRIES):
+            try:
+                return delete()
+            except (ClientException, RequestException) as ex:
+                if not _is_transient(ex):
+                    raise
+                logger.debug("retrying a deletion after a transient error: %s", ex)
+                time.sleep(DELETE_RETRY_INTERVAL * 2 ** attempt)
+        return delete()
+    return _run
+
+
+def delete_in_dependency_order(deletions, max_workers, progress_callback=None):
+    """
+    Runs the deletions concurrently, starting each one as soon as the deletions it depends on are finished.
+
+    :param deletions: list of (resource id, callable deleting the resource and returning the result)
+    :param max_workers: the maximum number of deletions running at once
+    :param progress_callback: called with (finished deletions, total deletions) as deletions finish
+    :return: the results of the successful deletions and the exceptions of the failed ones, keyed by index
+
+    A deletion which fails on a transient error, of the connection or a throttled or unavailable service, is
+    retried a few times at once. A deletion which fails otherwise is retried after another deletion succeeds, as
+    the resource can be referenced by a resource that isn't known to block it. Once nothing else can succeed, the remaining failures are
+    given up and the resources depending on them are attempted anyway.
+    """
+    from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+    blockers = get_delete_blockers([rid for rid, _ in deletions])
+    pending = set(range(len(deletions)))
+    finished = set()
+    results, failures = {}, {}
+    failed_since_progress = set()
+    running = {}
+
+    def _report_progress():
+        if progress_callback:
+            progress_callback(len(finished), len(deletions))
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while True:
+            ready = [i for i in sorted(pending) if not blockers[i] - finished]
+            if not ready and not running:
+                if failed_since_progress:
+                    finished.update(failed_since_progress)
+                    failed_since_progress.clear()
+                    _report_progress()
+                    continue
+                if not pending:
+                    break
+                # the inferred dependencies are circular, fall back to deleting what is left at once
+                ready = sorted(pending)
+
+            for index in ready:
+                pending.discard(index)
+                logger.debug("deleting %s", deletions[index][0])
+                running[executor.submit(_retry_transient_errors(deletions[index][1]))] = index
+
+            done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+            for future in done:
+                index = running.pop(future)
+                try:
+                    results[index] = future.result()
+                except (ClientException, RequestException) as ex:
+                    logger.debug("failed to delete %s: %s", deletions[index][0], ex)
+                    failures[index] = ex
+                    failed_since_progress.add(index)
+                    continue
+                failures.pop(index, None)
+                finished.add(index)
+                # a failed deletion may have been blocked by the resource just deleted
+                pending.update(failed_since_progress)
+                failed_since_progress.clear()
+                _report_progress()
+
+    return results, failures
@@ -316,6 +316,10 @@ short-summary: Manage Azure Resource Manager deployments.
 helps['group deployment create'] = """
 type: command
 short-summary: Start a deployment.
+long-summary: >
+    With `--verbose`, the state of each deployment operation is shown as it changes. To get these updates as
+    JSON lines on stderr, e.g. in CI, set `deployment_progress` in the `core` section of the CLI configuration
+    (or the AZURE_CORE_DEPLOYMENT_PROGRESS environment variable) to `json`.
 parameters:
   - name: --parameters
     short-summary: Supply deployment parameter values.
@@ -886,6 +890,9 @@ examples:
 helps['resource delete'] = """
 type: command
 short-summary: Delete a resource.
+long-summary: >
+    Multiple resources given by `--ids` are deleted concurrently. Child resources, and resources known to reference
+    other given resources (e.g. a VM and its NICs, disks and network), are deleted before the resources they depend on.
 examples:
   - name: Delete a virtual machine named 'MyVm'.
     text: >
@@ -0,0 +1,98 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import os
+import threading
+import time
+
+from six import string_types
+
+from knack.log import get_logger
+from knack.util import ensure_dir
+
+from azure.cli.core._environment import get_config_dir
+from azure.cli.core._session import Session
+
+logger = get_logger(__name__)
+
+PROVIDER_CACHE_DIR_NAME = 'providerCache'
+PROVIDER_CACHE_TTL = 24 * 60 * 60  # in seconds
+
+_provider_caches = {}
+_provider_caches_lock = threading.Lock()
+
+
+class ProviderCache(object):
+    """
+    Cache of provider namespace -> resource type -> api-versions for one subscription.
+
+    Entries are memoized in-process and, when a filename is given, persisted as JSON so that
+    later invocations can skip the provider lookup until the entry is older than `ttl` seconds.
+    """
+
+    def __init__(self, filename=None, ttl=PROVIDER_CACHE_TTL):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._namespace_locks = {}
+        self._session = Session()
+        if filename:
+            ensure_dir(os.path.dirname(filename))
+            self._session.load(filename)
+
+    def get_api_versions(self, rcf, resource_provider_namespace, resource_type):
+        """
+        Returns the api-versions of the resource type, or None if the provider doesn't know the type.
+        A cached provider is fetched again if it is stale or doesn't know the type, as the type could
+        have been added since the entry was cached.
+        """
+        key = resource_provider_namespace.lower()
+        resource_type = resource_type.lower()
+        entry = self._get_fresh_entry(key, resource_type)
+        if entry:
+            return entry['resourceTypes'][resource_type]
+
+        # a provider is fetched once at a time, without holding up the lookups of other providers
+        with self._get_namespace_lock(key):
+            entry = self._get_fresh_entry(key, resource_type)
+            if entry:
+                return entry['resourceTypes'][resource_type]
+
+            logger.debug("Resolving api-versions of provider '%s'", resource_provider_namespace)
+            provider = rcf.providers.get(resource_provider_namespace)
+            entry = {
+                'time': time.time(),
+                'resourceTypes': {t.resource_type.lower(): list(t.api_versions or [])
+                                  for t in provider.resource_types}
+            }
+            with self._lock:
+                self._session.data[key] = entry
+                try:
+                    self._session.save()
+                except (OSError, IOError) as ex:
+                    logger.debug("Failed to save provider cache: %s", ex)
+            return entry['resourceTypes'].get(resource_type)
+
+    def _get_fresh_entry(self, key, resource_type):
+        with self._lock:
+            entry = self._session.get(key)
+        if entry and entry['time'] + self.ttl > time.time() and resource_type in entry['resourceTypes']:
+            return entry
+        return None
+
+    def _get_namespace_lock(self, key):
+        with self._lock:
+            return self._namespace_locks.setdefault(key, threading.Lock())
+
+
+def get_provider_cache(subscription_id):
+    """ Returns the provider cache shared by all resource clients of the subscription. """
+    with _provider_caches_lock:
+        if subscription_id not in _provider_caches:
+            filename = None
+            if isinstance(subscription_id, string_types):
+                filename = os.path.join(get_config_dir(), PROVIDER_CACHE_DIR_NAME,
+                                        '{}.json'.format(subscription_id))
+            _provider_caches[subscription_id] = ProviderCache(filename)
+        return _provider_caches[subscription_id]
@@ -0,0 +1,117 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import hashlib
+import os
+import threading
+
+from six.moves.urllib.error import HTTPError  # pylint: disable=import-error
+from six.moves.urllib.parse import urlparse  # pylint: disable=import-error
+from six.moves.urllib.request import Request, urlopen  # pylint: disable=import-error
+
+from knack.log import get_logger
+from knack.util import ensure_dir
+
+from azure.cli.core._environment import get_config_dir
+from azure.cli.core._session import Session
+from azure.cli.core.util import shell_safe_json_parse
+
+logger = get_logger(__name__)
+
+TEMPLATE_CACHE_DIR_NAME = 'templateCache'
+_INDEX_FILE_NAME = 'index.json'
+
+_parsed_json = {}
+_parsed_json_lock = threading.Lock()
+
+
+def _sha256(content):
+    return hashlib.sha256(content).hexdigest()
+
+
+def _read_blob(cache_dir, digest):
+    try:
+        with open(os.path.join(cache_dir, digest), 'rb') as f:
+            content = f.read()
+    except (OSError, IOError):
+        return None
+    return content if _sha256(content) == digest else None
+
+
+def _write_blob(cache_dir, digest, content):
+    path = os.path.join(cache_dir, digest)
+    if os.path.isfile(path):
+        return
+    temp_path = '{}.{}.tmp'.format(path, os.getpid())
+    # readable by the owner only, as templates can hold secrets too
+    with os.fdopen(os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), 'wb') as f:
+        f.write(content)
+    try:
+        os.rename(temp_path, path)
+    except OSError:  # written by another process meanwhile
+        os.remove(temp_path)
+
+
+def retrieve_uri(url, ssl_context=None):
+    """
+    Downloads the content of a template uri.
+
+    Downloads over http(s) which carry an ETag or Last-Modified header are kept in a content-addressed cache under
+    the config directory, and later downloads of the same uri are conditional so an unchanged file isn't transferred
+    again. The index is keyed by a hash of the uri, as uris can contain SAS tokens. Parameters uris aren't cached.
+    """
+    if urlparse(url).scheme.lower() not in ['http', 'https']:
+        return urlopen(url, context=ssl_context).read()
+
+    cache_dir = os.path.join(get_config_dir(), TEMPLATE_CACHE_DIR_NAME)
+    ensure_dir(cache_dir)
+    index = Session()
+    index.load(os.path.join(cache_dir, _INDEX_FILE_NAME))
+
+    key = _sha256(url.encode('utf-8'))
+    entry = index.get(key)
+    cached = _read_blob(cache_dir, entry['sha256']) if entry else None
+
+    request = Request(url)
+    if cached is not None:
+        if entry.get('etag'):
+            request.add_header('If-None-Match', entry['etag'])
+        if entry.get('lastModified'):
+            request.add_header('If-Modified-Since', entry['lastModified'])
+    try:
+        response = urlopen(request, context=ssl_context)
+    except HTTPError as ex:
+        if ex.code == 304 and cached is not None:
+            logger.debug("Using the cached copy of '%s'", urlparse(url).path)
+            return cached
+        raise
+    content = response.read()
+
+    etag, last_modified = response.headers.get('ETag'), response.headers.get('Last-Modified')
+    if etag or last_modified:
+        digest = _sha256(content)
+        try:
+            _write_blob(cache_dir, digest, content)
+            index[key] = {'sha256': digest, 'etag': etag, 'lastModified': last_modified}
+            # drop the previous content unless another uri still refers to it
+            if entry and entry['sha256'] != digest and \
+                    all(e.get('sha256') != entry['sha256'] for e in index.data.values()):
+                os.remove(os.path.join(cache_dir, entry['sha256']))
+        except (OSError, IOError) as ex:
+            logger.debug("Failed to cache '%s': %s", urlparse(url).path, ex)
+    return content
+
+
+def parse_json(content, preserve_order=False):
+    """
+    Parses the JSON of a template or parameters file once per process, so commands invoked repeatedly in the
+    same process on the same content (e.g. validate then create) share the parsed object. Callers must not
+    modify the returned object.
+    """
+    key = (_sha256(content.encode('utf-8')), preserve_order)
+    with _parsed_json_lock:
+        if key not in _parsed_json:
+            _parsed_json[key] = shell_safe_json_parse(content, preserve_order)
+        return _parsed_json[key]
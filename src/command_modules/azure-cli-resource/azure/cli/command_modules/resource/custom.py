@@ -44,6 +44,12 @@ from ._validators import MSI_LOCAL_ID
 
 logger = get_logger(__name__)
 
+_MAX_CONCURRENT_IDS = 10
+
+# dicts keep their insertion order from Python 3.7, before that templates are parsed as OrderedDicts to keep the order
+# of their parameters
+_TEMPLATE_ORDERED_DICT = sys.version_info < (3, 7)
+
 
 def _process_parameters(template_param_defs, parameter_lists):
 
@@ -232,6 +238,30 @@ def _urlretrieve(url):
     return req.read()
 
 
+def _load_template(template_file=None, template_uri=None):
+    """
+    Returns the template to send, None when it is given by uri, and the template object to read parameters from.
+    """
+    from ._template_cache import parse_json, retrieve_uri
+    if template_uri:
+        # only templates are cached, as parameters files can hold secrets
+        template_obj = parse_json(retrieve_uri(template_uri, _ssl_context()).decode('utf-8'),
+                                  preserve_order=_TEMPLATE_ORDERED_DICT)
+    else:
+        template_obj = get_file_json(template_file, preserve_order=_TEMPLATE_ORDERED_DICT)
+
+    if 'resources' not in template_obj:
+        # the parsed template is shared, so don't modify it
+        template_obj = type(template_obj)(template_obj)
+        template_obj['resources'] = []
+
+    template = None if template_uri else template_obj
+    if _TEMPLATE_ORDERED_DICT and template is not None:
+        # the SDK serializes only plain dicts as JSON objects
+        template = json.loads(json.dumps(template))
+    return template, template_obj
+
+
 def _deploy_arm_template_core(cli_ctx, resource_group_name,
                               template_file=None, template_uri=None, deployment_name=None,
                               parameters=None, mode=None, rollback_on_error=None, validate_only=False,
@@ -239,29 +269,19 @@ def _deploy_arm_template_core(cli_ctx, resource_group_name,
     DeploymentProperties, TemplateLink, OnErrorDeployment = get_sdk(cli_ctx, ResourceType.MGMT_RESOURCE_RESOURCES,
                                                                     'DeploymentProperties', 'TemplateLink',
                                                                     'OnErrorDeployment', mod='models')
-    template = None
-    template_link = None
-    template_obj = None
+    template_link = TemplateLink(uri=template_uri) if template_uri else None
+    template, template_obj = _load_template(template_file, template_uri)
     on_error_deployment = None
 
-    if template_uri:
-        template_link = TemplateLink(uri=template_uri)
-        template_obj = shell_safe_json_parse(_urlretrieve(template_uri).decode('utf-8'), preserve_order=True)
-    else:
-        template = get_file_json(template_file, preserve_order=True)
-        template_obj = template
-
     if rollback_on_error == '':
         on_error_deployment = OnErrorDeployment(type='LastSuccessful')
     elif rollback_on_error:
         on_error_deployment = OnErrorDeployment(type='SpecificDeployment', deployment_name=rollback_on_error)
 
     template_param_defs = template_obj.get('parameters', {})
-    template_obj['resources'] = template_obj.get('resources', [])
     parameters = _process_parameters(template_param_defs, parameters) or {}
     parameters = _get_missing_parameters(parameters, template_obj, _prompt_for_parameters)
 
-    template = json.loads(json.dumps(template))
     parameters = json.loads(json.dumps(parameters))
 
     properties = DeploymentProperties(template=template, template_link=template_link,
@@ -280,22 +300,13 @@ def _deploy_arm_template_subscription_scope(cli_ctx,
                                             no_wait=False):
     DeploymentProperties, TemplateLink = get_sdk(cli_ctx, ResourceType.MGMT_RESOURCE_RESOURCES,
                                                  'DeploymentProperties', 'TemplateLink', mod='models')
-    template = None
-    template_link = None
-    template_obj = None
-    if template_uri:
-        template_link = TemplateLink(uri=template_uri)
-        template_obj = shell_safe_json_parse(_urlretrieve(template_uri).decode('utf-8'), preserve_order=True)
-    else:
-        template = get_file_json(template_file, preserve_order=True)
-        template_obj = template
+    template_link = TemplateLink(uri=template_uri) if template_uri else None
+    template, template_obj = _load_template(template_file, template_uri)
 
     template_param_defs = template_obj.get('parameters', {})
-    template_obj['resources'] = template_obj.get('resources', [])
     parameters = _process_parameters(template_param_defs, parameters) or {}
     parameters = _get_missing_parameters(parameters, template_obj, _prompt_for_parameters)
 
-    template = json.loads(json.dumps(template))
     parameters = json.loads(json.dumps(parameters))
 
     properties = DeploymentProperties(template=template, template_link=template_link,
@@ -790,6 +801,47 @@ def _get_rsrc_util_from_parsed_id(cli_ctx, parsed_id, api_version):
                           api_version)
 
 
+def _process_parsed_ids(cli_ctx, parsed_ids, api_version, operation):
+    """
+    Applies the operation to the _ResourceUtils of each parsed id, concurrently when there are several ids,
+    and returns the results in the order of the ids. Failures are reported per id as warnings; an error is
+    raised only when no id succeeded.
+    """
+    parsed_ids = list(parsed_ids)
+
+    def _process(id_dict):
+        return operation(_get_rsrc_util_from_parsed_id(cli_ctx, id_dict, api_version))
+
+    tasks = []
+    if cli_ctx.config.getboolean('core', 'disable_concurrent_ids', False) or len(parsed_ids) < 2:
+        for id_dict in parsed_ids:
+            try:
+                tasks.append((id_dict, _process(id_dict), None))
+            except Exception as ex:  # pylint: disable=broad-except
+                tasks.append((id_dict, None, ex))
+    else:
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=_MAX_CONCURRENT_IDS) as executor:
+            futures = [(id_dict, executor.submit(_process, id_dict)) for id_dict in parsed_ids]
+            for id_dict, future in futures:
+                try:
+                    tasks.append((id_dict, future.result(), None))
+                except Exception as ex:  # pylint: disable=broad-except
+                    tasks.append((id_dict, None, ex))
+
+    results = [result for _, result, ex in tasks if ex is None]
+    exceptions = [(id_dict, ex) for id_dict, _, ex in tasks if ex is not None]
+    if len(exceptions) == 1 and not results:
+        raise exceptions[0][1]
+    for id_dict, ex in exceptions:
+        logger.warning('%s: "%s"', id_dict.get('resource_id'), str(ex))
+    if exceptions:
+        if not results:
+            raise CLIError('Encountered more than one exception.')
+        logger.warning('Encountered more than one exception.')
+    return results
+
+
 def _create_parsed_id(resource_group_name=None, resource_provider_namespace=None, parent_resource_path=None,
                       resource_type=None, resource_name=None):
     return {
@@ -821,9 +873,8 @@ def show_resource(cmd, resource_ids=None, resource_group_name=None,
                                                                               resource_type,
                                                                               resource_name)]
 
-    return _single_or_collection(
-        [_get_rsrc_util_from_parsed_id(cmd.cli_ctx, id_dict, api_version).get_resource(
-            include_response_body) for id_dict in parsed_ids])
+    return _single_or_collection(_process_parsed_ids(
+        cmd.cli_ctx, parsed_ids, api_version, lambda rsrc_utils: rsrc_utils.get_resource(include_response_body)))
 
 
 # pylint: disable=unused-argument
@@ -833,49 +884,53 @@ def delete_resource(cmd, resource_ids=None, resource_group_name=None,
     """
     Deletes the given resource(s).
     This function allows deletion of ids with dependencies on one another.
-    This is done with multiple passes through the given ids.
+    Resources are deleted concurrently, children and known dependents before the resources they depend on.
     """
-    parsed_ids = _get_parsed_resource_ids(resource_ids) or [_create_parsed_id(resource_group_name,
-                                                                              resource_provider_namespace,
-                                                                              parent_resource_path,
-                                                                              resource_type,
-                                                                              resource_name)]
+    from ._delete_utils import delete_in_dependency_order
+    parsed_ids = list(_get_parsed_resource_ids(resource_ids) or [_create_parsed_id(resource_group_name,
+                                                                                   resource_provider_namespace,
+                                                                                   parent_resource_path,
+                                                                                   resource_type,
+                                                                                   resource_name)])
     to_be_deleted = [(_get_rsrc_util_from_parsed_id(cmd.cli_ctx, id_dict, api_version), id_dict)
                      for id_dict in parsed_ids]
 
-    results = []
-    from msrestazure.azure_exceptions import CloudError
-    while to_be_deleted:
-        logger.debug("Start new loop to delete resources.")
-        operations = []
-        failed_to_delete = []
-        for rsrc_utils, id_dict in to_be_deleted:
-            try:
-                operations.append(rsrc_utils.delete())
-                resource = resource_dict_to_id(**id_dict) if id_dict.get("subscription") else resource_name
-                logger.debug("deleting %s", resource)
-            except CloudError as e:
-                # request to delete failed, add parsed id dict back to queue
-                id_dict['exception'] = str(e)
-                failed_to_delete.append((rsrc_utils, id_dict))
-        to_be_deleted = failed_to_delete
-
-        # stop deleting if none deletable
-        if not operations:
-            break
+    def _delete(rsrc_utils):
+        return lambda: rsrc_utils.delete().result()
+
+    def _get_resource_id(rsrc_utils):
+        if rsrc_utils.resource_id:
+            return rsrc_utils.resource_id
+        from azure.cli.core.commands.client_factory import get_subscription_id
+        return '/subscriptions/{}/resourceGroups/{}/providers/{}/{}{}/{}'.format(
+            get_subscription_id(cmd.cli_ctx), rsrc_utils.resource_group_name,
+            rsrc_utils.resource_provider_namespace,
+            rsrc_utils.parent_resource_path + '/' if rsrc_utils.parent_resource_path else '',
+            rsrc_utils.resource_type, rsrc_utils.resource_name)
+
+    deletions = [(_get_resource_id(rsrc_utils), _delete(rsrc_utils)) for rsrc_utils, _ in to_be_deleted]
+
+    progress_callback = None
+    if len(deletions) > 1 and sys.stderr.isatty():
+        hook = cmd.cli_ctx.get_progress_controller(det=True)
 
-        # all operations return result before next pass
-        for operation in operations:
-            results.append(operation.result())
+        def progress_callback(current, total):
+            hook.add(message='Deleting resources', value=current, total_val=total)
+            if current == total:
+                hook.end()
 
-    if to_be_deleted:
+    max_workers = 1 if cmd.cli_ctx.config.getboolean('core', 'disable_concurrent_ids', False) \
+        else _MAX_CONCURRENT_IDS
+    results, failures = delete_in_dependency_order(deletions, max_workers, progress_callback)
+
+    if failures:
         error_msg_builder = ['Some resources failed to be deleted:']
-        for _, id_dict in to_be_deleted:
-            logger.debug(id_dict['exception'])
-            error_msg_builder.append(resource_dict_to_id(**id_dict))
+        for index in sorted(failures):
+            logger.debug(str(failures[index]))
+            error_msg_builder.append(deletions[index][0])
         raise CLIError(os.linesep.join(error_msg_builder))
 
-    return _single_or_collection(results)
+    return _single_or_collection([results[index] for index in sorted(results)])
 
 
 # pylint: unused-argument
@@ -888,8 +943,8 @@ def update_resource(cmd, parameters, resource_ids=None,
                                                                               resource_type,
                                                                               resource_name)]
 
-    return _single_or_collection(
-        [_get_rsrc_util_from_parsed_id(cmd.cli_ctx, id_dict, api_version).update(parameters) for id_dict in parsed_ids])
+    return _single_or_collection(_process_parsed_ids(
+        cmd.cli_ctx, parsed_ids, api_version, lambda rsrc_utils: rsrc_utils.update(parameters)))
 
 
 # pylint: unused-argument
@@ -904,8 +959,8 @@ def tag_resource(cmd, tags, resource_ids=None,
                                                                               resource_type,
                                                                               resource_name)]
 
-    return _single_or_collection(
-        [_get_rsrc_util_from_parsed_id(cmd.cli_ctx, id_dict, api_version).tag(tags) for id_dict in parsed_ids])
+    return _single_or_collection(_process_parsed_ids(
+        cmd.cli_ctx, parsed_ids, api_version, lambda rsrc_utils: rsrc_utils.tag(tags)))
 
 
 # pylint: unused-argument
@@ -920,26 +975,27 @@ def invoke_resource_action(cmd, action, request_body=None, resource_ids=None,
                                                                               resource_type,
                                                                               resource_name)]
 
-    return _single_or_collection([_get_rsrc_util_from_parsed_id(cmd.cli_ctx, id_dict, api_version)
-                                  .invoke_action(action, request_body) for id_dict in parsed_ids])
+    return _single_or_collection(_process_parsed_ids(
+        cmd.cli_ctx, parsed_ids, api_version, lambda rsrc_utils: rsrc_utils.invoke_action(action, request_body)))
+
+
+def _get_in_order(get_func, keys):
+    """ Calls get_func for each key, concurrently when there are several keys, returning the results in order. """
+    if len(keys) < 2:
+        return [get_func(key) for key in keys]
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor(max_workers=_MAX_CONCURRENT_IDS) as executor:
+        return list(executor.map(get_func, keys))
 
 
 def get_deployment_operations(client, resource_group_name, deployment_name, operation_ids):
     """get a deployment's operation."""
-    result = []
-    for op_id in operation_ids:
-        dep = client.get(resource_group_name, deployment_name, op_id)
-        result.append(dep)
-    return result
+    return _get_in_order(lambda op_id: client.get(resource_group_name, deployment_name, op_id), operation_ids)
 
 
 def get_deployment_operations_at_subscription_scope(client, deployment_name, operation_ids):
     """get a deployment's operation."""
-    result = []
-    for op_id in operation_ids:
-        dep = client.get_at_subscription_scope(deployment_name, op_id)
-        result.append(dep)
-    return result
+    return _get_in_order(lambda op_id: client.get_at_subscription_scope(deployment_name, op_id), operation_ids)
 
 
 def list_resources(cmd, resource_group_name=None,
@@ -1974,18 +2030,18 @@ class _ResourceUtils(object):  # pylint: disable=too-many-instance-attributes
 
     @staticmethod
     def resolve_api_version(rcf, resource_provider_namespace, parent_resource_path, resource_type):
-        provider = rcf.providers.get(resource_provider_namespace)
+        from ._provider_cache import get_provider_cache
 
         # If available, we will use parent resource's api-version
         resource_type_str = (parent_resource_path.split('/')[0] if parent_resource_path else resource_type)
 
-        rt = [t for t in provider.resource_types
-              if t.resource_type.lower() == resource_type_str.lower()]
-        if not rt:
+        api_versions = get_provider_cache(rcf.config.subscription_id).get_api_versions(
+            rcf, resource_provider_namespace, resource_type_str)
+        if api_versions is None:
             raise IncorrectUsageError('Resource type {} not found.'.format(resource_type_str))
-        if len(rt) == 1 and rt[0].api_versions:
-            npv = [v for v in rt[0].api_versions if 'preview' not in v.lower()]
-            return npv[0] if npv else rt[0].api_versions[0]
+        if api_versions:
+            npv = [v for v in api_versions if 'preview' not in v.lower()]
+            return npv[0] if npv else api_versions[0]
         raise IncorrectUsageError(
             'API version is required and could not be resolved for resource {}'
             .format(resource_type))
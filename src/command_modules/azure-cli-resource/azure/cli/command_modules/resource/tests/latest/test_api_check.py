@@ -3,12 +3,15 @@
 # Licensed under the MIT License. See License.txt in the project root for license information.
 # --------------------------------------------------------------------------------------------
 
+import os
+import shutil
+import tempfile
 import unittest
 
 try:
-    from unittest.mock import MagicMock
+    from unittest.mock import MagicMock, patch
 except ImportError:
-    from mock import MagicMock
+    from mock import MagicMock, patch
 
 from knack.util import CLIError
 from azure.cli.command_modules.resource.custom import (_ResourceUtils, _validate_resource_inputs,
@@ -78,6 +81,71 @@ class TestApiCheck(unittest.TestCase):
                                    resource_group_name='rg', rcf=rcf)
         self.assertEqual(res_utils.api_version, "2005-01-01-preview")
 
+    def test_resolve_api_cached_provider(self):
+        # Verifies the provider is fetched once per namespace and persisted for later invocations.
+        from azure.cli.core.mock import DummyCli
+        from azure.cli.command_modules.resource import _provider_cache
+        cli = DummyCli()
+        config_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, config_dir)
+        with patch.dict(os.environ, {'AZURE_CONFIG_DIR': config_dir}), \
+                patch.dict(_provider_cache._provider_caches, clear=True):
+            rcf = self._get_mock_client()
+            rcf.config.subscription_id = '00000000-0000-0000-0000-000000000000'
+            for name in ['vnet1', 'vnet2']:
+                res_utils = _ResourceUtils(cli, resource_type='Mock/test', resource_name=name,
+                                           resource_group_name='rg', rcf=rcf)
+                self.assertEqual(res_utils.api_version, "2016-01-01")
+            res_utils = _ResourceUtils(cli, resource_type='Mock/foo', resource_name='vnet3',
+                                       resource_group_name='rg', rcf=rcf)
+            self.assertEqual(res_utils.api_version, "1999-01-01")
+            self.assertEqual(rcf.providers.get.call_count, 1)
+
+            # a new invocation reads the provider from disk
+            _provider_cache._provider_caches.clear()
+            rcf2 = self._get_mock_client()
+            rcf2.config.subscription_id = '00000000-0000-0000-0000-000000000000'
+            res_utils = _ResourceUtils(cli, resource_type='Mock/test', resource_name='vnet1',
+                                       resource_group_name='rg', rcf=rcf2)
+            self.assertEqual(res_utils.api_version, "2016-01-01")
+            self.assertFalse(rcf2.providers.get.called)
+
+            # an unknown type refreshes the cached provider before failing
+            with self.assertRaises(CLIError):
+                _ResourceUtils(cli, resource_type='Mock/unknown', resource_name='vnet1',
+                               resource_group_name='rg', rcf=rcf2)
+            self.assertEqual(rcf2.providers.get.call_count, 1)
+
+    def test_resolve_api_cached_provider_concurrently(self):
+        # Verifies a slow provider fetch doesn't hold up other providers, and is made once for concurrent lookups.
+        import threading
+        from azure.cli.command_modules.resource._provider_cache import ProviderCache
+        cache = ProviderCache()
+        fetching, release = threading.Event(), threading.Event()
+        provider = self._get_mock_client().providers.get.return_value
+
+        def _get_provider(namespace):
+            if namespace == 'Slow':
+                fetching.set()
+                if not release.wait(10):
+                    raise RuntimeError('provider fetch was never released')
+            return provider
+
+        rcf = MagicMock()
+        rcf.providers.get.side_effect = _get_provider
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(cache.get_api_versions(rcf, 'Slow', 'test')))
+                   for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        fetching.wait(10)
+        self.assertEqual(cache.get_api_versions(rcf, 'Fast', 'foo'), ['1999-01-01-preview', '1999-01-01'])
+        release.set()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results, [['2016-01-01-preview', '2016-01-01']] * 2)
+        self.assertEqual([c[0][0] for c in rcf.providers.get.call_args_list].count('Slow'), 1)
+
     def _get_mock_client(self):
         client = MagicMock()
         provider = MagicMock()
@@ -18,7 +18,7 @@ except ImportError:
 from azure.cli.core.util import CLIError, get_file_json, shell_safe_json_parse
 from azure.cli.command_modules.resource.custom import \
     (_get_missing_parameters, _extract_lock_params, _process_parameters, _find_missing_parameters,
-     _prompt_for_parameters, _load_file_string_or_uri)
+     _prompt_for_parameters, _load_file_string_or_uri, tag_resource)
 
 
 def _simulate_no_tty():
@@ -305,6 +305,34 @@ class TestCustom(unittest.TestCase):
         results = _prompt_for_parameters(dict(missing_parameters), fail_on_no_tty=False)
         self.assertTrue(str(list(results.keys())) in param_alpha_order)
 
+    @mock.patch('azure.cli.command_modules.resource.custom._get_rsrc_util_from_parsed_id')
+    def test_tag_resources_concurrently(self, get_rsrc_util_mock):
+        from azure.cli.core.mock import DummyCli
+        ids = ['/subscriptions/sub/resourceGroups/rg/providers/Microsoft.Network/virtualNetworks/vnet{}'.format(i)
+               for i in range(20)]
+
+        def _get_rsrc_util(_, id_dict, api_version):
+            rsrc_util = mock.MagicMock()
+            if id_dict['resource_id'] == ids[3]:
+                rsrc_util.tag.side_effect = CLIError('tag failed')
+            else:
+                rsrc_util.tag.return_value = id_dict['resource_id']
+            return rsrc_util
+
+        get_rsrc_util_mock.side_effect = _get_rsrc_util
+        cmd = mock.MagicMock()
+        cmd.cli_ctx = DummyCli()
+
+        # results keep the order of the ids and a failed id doesn't fail the others
+        with mock.patch('azure.cli.command_modules.resource.custom.logger') as logger_mock:
+            result = tag_resource(cmd, {'a': 'b'}, resource_ids=ids)
+        self.assertEqual(result, ids[:3] + ids[4:])
+        logger_mock.warning.assert_any_call('%s: "%s"', ids[3], 'tag failed')
+
+        # a single failure is raised as is
+        with self.assertRaisesRegexp(CLIError, 'tag failed'):
+            tag_resource(cmd, {'a': 'b'}, resource_ids=[ids[3]])
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,118 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import threading
+import unittest
+
+try:
+    import unittest.mock as mock
+except ImportError:
+    import mock
+
+import requests
+from msrestazure.azure_exceptions import CloudError
+
+from azure.cli.command_modules.resource._delete_utils import get_delete_blockers, delete_in_dependency_order
+
+_RG = '/subscriptions/sub/resourceGroups/rg/providers/'
+_VM = _RG + 'Microsoft.Compute/virtualMachines/vm1'
+_DISK = _RG + 'Microsoft.Compute/disks/disk1'
+_NIC = _RG + 'Microsoft.Network/networkInterfaces/nic1'
+_PIP = _RG + 'Microsoft.Network/publicIPAddresses/pip1'
+_NSG = _RG + 'Microsoft.Network/networkSecurityGroups/nsg1'
+_VNET = _RG + 'Microsoft.Network/virtualNetworks/vnet1'
+_SUBNET = _VNET + '/subnets/subnet1'
+_STORAGE = _RG + 'Microsoft.Storage/storageAccounts/sa1'
+_OTHER_NIC = '/subscriptions/sub/resourceGroups/rg2/providers/Microsoft.Network/networkInterfaces/nic2'
+
+
+def _cloud_error(status_code=409):
+    response = mock.MagicMock()
+    response.status_code = status_code
+    return CloudError(response, 'Conflict' if status_code == 409 else 'Service Unavailable')
+
+
+class TestResourceDeleteOrder(unittest.TestCase):
+
+    def test_get_delete_blockers(self):
+        ids = [_VNET, _NIC, _VM, _SUBNET, _PIP, _STORAGE, _OTHER_NIC]
+        blockers = get_delete_blockers(ids)
+        # the vnet waits for the nic of its resource group and its subnet
+        self.assertEqual(blockers[0], {1, 3})
+        self.assertEqual(blockers[1], {2})
+        self.assertEqual(blockers[2], set())
+        self.assertEqual(blockers[3], set())
+        self.assertEqual(blockers[4], {1})
+        self.assertEqual(blockers[5], set())
+        self.assertEqual(blockers[6], set())
+
+    def test_delete_in_dependency_order(self):
+        ids = [_VNET, _NSG, _PIP, _NIC, _DISK, _VM, _STORAGE]
+        deleted = []
+        lock = threading.Lock()
+
+        def _delete(rid):
+            def _run():
+                with lock:
+                    deleted.append(rid)
+                return rid
+            return _run
+
+        progress = []
+        results, failures = delete_in_dependency_order([(rid, _delete(rid)) for rid in ids], 5,
+                                                       lambda current, total: progress.append((current, total)))
+        self.assertEqual(failures, {})
+        self.assertEqual([results[i] for i in sorted(results)], ids)
+        for blocker, blocked in [(_VM, _NIC), (_VM, _DISK), (_NIC, _PIP), (_NIC, _VNET), (_NIC, _NSG), (_VNET, _NSG)]:
+            self.assertLess(deleted.index(blocker), deleted.index(blocked))
+        self.assertEqual(progress[-1], (len(ids), len(ids)))
+
+    def test_delete_retries_failed_deletions(self):
+        # the storage account is blocked by the vm without that being known, so it fails until the vm is gone
+        state = {'vm_deleted': False}
+        vm_started = threading.Event()
+
+        def _delete_storage():
+            vm_started.wait(5)
+            if not state['vm_deleted']:
+                raise _cloud_error()
+            return 'storage'
+
+        def _delete_vm():
+            vm_started.set()
+            state['vm_deleted'] = True
+            return 'vm'
+
+        def _delete_nic():
+            raise _cloud_error()
+
+        results, failures = delete_in_dependency_order(
+            [(_STORAGE, _delete_storage), (_VM, _delete_vm), (_NIC, _delete_nic)], 2)
+        self.assertEqual(results, {0: 'storage', 1: 'vm'})
+        self.assertEqual(list(failures), [2])
+
+    @mock.patch('azure.cli.command_modules.resource._delete_utils.DELETE_RETRY_INTERVAL', 0)
+    def test_delete_retries_transient_errors(self):
+        errors = {_VM: [requests.exceptions.ConnectionError('Connection reset by peer'), _cloud_error(503)],
+                  _NIC: [_cloud_error(409)]}
+        attempts = []
+
+        def _delete(rid):
+            def _run():
+                attempts.append(rid)
+                if errors[rid]:
+                    raise errors[rid].pop(0)
+                return rid
+            return _run
+
+        results, failures = delete_in_dependency_order([(rid, _delete(rid)) for rid in [_VM, _NIC]], 1)
+        # the transient errors are retried at once, the conflict only once another deletion succeeded
+        self.assertEqual(results, {0: _VM})
+        self.assertEqual(list(failures), [1])
+        self.assertEqual(attempts, [_VM, _VM, _VM, _NIC])
+
+
+if __name__ == '__main__':
+    unittest.main()
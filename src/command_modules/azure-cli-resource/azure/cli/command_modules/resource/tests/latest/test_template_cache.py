@@ -0,0 +1,89 @@
+# --------------------------------------------------------------------------------------------
+# Copyright (c) Microsoft Corporation. All rights reserved.
+# Licensed under the MIT License. See License.txt in the project root for license information.
+# --------------------------------------------------------------------------------------------
+
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+
+try:
+    import unittest.mock as mock
+except ImportError:
+    import mock
+
+from six.moves import BaseHTTPServer  # pylint: disable=import-error
+
+from azure.cli.command_modules.resource._template_cache import retrieve_uri, parse_json
+
+_TEMPLATE = b'{"parameters": {"b": {"type": "string"}, "a": {"type": "int"}}, "resources": []}'
+
+
+class _TemplateHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    requests = []
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        _TemplateHandler.requests.append(self.headers.get('If-None-Match'))
+        if self.headers.get('If-None-Match') == '"v1"':
+            self.send_response(304)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('ETag', '"v1"')
+        self.send_header('Content-Length', str(len(_TEMPLATE)))
+        self.end_headers()
+        self.wfile.write(_TEMPLATE)
+
+    def log_message(self, *args):  # pylint: disable=arguments-differ
+        pass
+
+
+class TestTemplateCache(unittest.TestCase):
+
+    def setUp(self):
+        self.config_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.config_dir)
+        patcher = mock.patch.dict(os.environ, {'AZURE_CONFIG_DIR': self.config_dir})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.server = BaseHTTPServer.HTTPServer(('127.0.0.1', 0), _TemplateHandler)
+        thread = threading.Thread(target=self.server.serve_forever)
+        thread.daemon = True
+        thread.start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        _TemplateHandler.requests = []
+
+    def test_retrieve_uri_revalidates_cached_content(self):
+        url = 'http://127.0.0.1:{}/template.json?sig=secret'.format(self.server.server_port)
+        self.assertEqual(retrieve_uri(url), _TEMPLATE)
+        self.assertEqual(retrieve_uri(url), _TEMPLATE)
+        self.assertEqual(_TemplateHandler.requests, [None, '"v1"'])
+
+        # the cache neither keeps the uri nor its SAS token
+        for name in os.listdir(os.path.join(self.config_dir, 'templateCache')):
+            path = os.path.join(self.config_dir, 'templateCache', name)
+            with open(path, 'rb') as f:
+                self.assertNotIn(b'secret', f.read())
+            if os.name != 'nt' and name != 'index.json':
+                self.assertEqual(os.stat(path).st_mode & 0o777, 0o600)
+
+    def test_parameters_uri_is_not_cached(self):
+        from azure.cli.command_modules.resource.custom import _process_parameters
+        url = 'http://127.0.0.1:{}/parameters.json'.format(self.server.server_port)
+        for _ in range(2):
+            self.assertEqual(sorted(_process_parameters({}, [[url]])), ['a', 'b'])
+        self.assertEqual(_TemplateHandler.requests, [None, None])
+        self.assertFalse(os.path.exists(os.path.join(self.config_dir, 'templateCache')))
+
+    def test_parse_json_shares_parsed_content(self):
+        first = parse_json(_TEMPLATE.decode('utf-8'), preserve_order=True)
+        self.assertIs(parse_json(_TEMPLATE.decode('utf-8'), preserve_order=True), first)
+        self.assertEqual(list(first['parameters']), ['b', 'a'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -743,13 +743,17 @@ def list_vm(cmd, resource_group_name=None, show_details=False):
 
 
 def list_vm_ip_addresses(cmd, resource_group_name=None, vm_name=None):
+    network_client = get_mgmt_service_client(cmd.cli_ctx, ResourceType.MGMT_NETWORK)
+    if resource_group_name:
+        # The VM(s) are known, so only resolve the NICs and public IPs they reference
+        return list(_get_vm_ip_addresses_by_vm(cmd, network_client, resource_group_name, vm_name))
+
     # We start by getting NICs as they are the smack in the middle of all data that we
     # want to collect for a VM (as long as we don't need any info on the VM than what
     # is available in the Id, we don't need to make any calls to the compute RP)
     #
     # Since there is no guarantee that a NIC is in the same resource group as a given
     # Virtual Machine, we can't constrain the lookup to only a single group...
-    network_client = get_mgmt_service_client(cmd.cli_ctx, ResourceType.MGMT_NETWORK)
     nics = network_client.network_interfaces.list_all()
     public_ip_addresses = network_client.public_ip_addresses.list_all()
 
@@ -757,49 +761,95 @@ def list_vm_ip_addresses(cmd, resource_group_name=None, vm_name=None):
 
     result = []
     for nic in [n for n in list(nics) if n.virtual_machine]:
-        nic_resource_group, nic_vm_name = _parse_rg_name(nic.virtual_machine.id)
-
-        # If provided, make sure that resource group name and vm name match the NIC we are
-        # looking at before adding it to the result...
-        same_resource_group_name = (resource_group_name is None or
-                                    resource_group_name.lower() == nic_resource_group.lower())
-        same_vm_name = (vm_name is None or
-                        vm_name.lower() == nic_vm_name.lower())
-        if same_resource_group_name and same_vm_name:
-            network_info = {
-                'privateIpAddresses': [],
-                'publicIpAddresses': []
-            }
-            for ip_configuration in nic.ip_configurations:
-                network_info['privateIpAddresses'].append(ip_configuration.private_ip_address)
-                if ip_configuration.public_ip_address:
-                    public_ip_address = ip_address_lookup[ip_configuration.public_ip_address.id]
-
-                    public_ip_addr_info = {
-                        'id': public_ip_address.id,
-                        'name': public_ip_address.name,
-                        'ipAddress': public_ip_address.ip_address,
-                        'ipAllocationMethod': public_ip_address.public_ip_allocation_method
-                    }
-
-                    try:
-                        public_ip_addr_info['zone'] = public_ip_address.zones[0]
-                    except (AttributeError, IndexError, TypeError):
-                        pass
-
-                    network_info['publicIpAddresses'].append(public_ip_addr_info)
-
-            result.append({
-                'virtualMachine': {
-                    'resourceGroup': nic_resource_group,
-                    'name': nic_vm_name,
-                    'network': network_info
-                }
-            })
+        _, nic_vm_name = _parse_rg_name(nic.virtual_machine.id)
+
+        # If provided, make sure that vm name matches the NIC we are looking at before
+        # adding it to the result...
+        if vm_name is None or vm_name.lower() == nic_vm_name.lower():
+            result.append(_get_vm_ip_address_info(nic, ip_address_lookup))
 
     return result
 
 
+def _get_vm_ip_addresses_by_vm(cmd, network_client, resource_group_name, vm_name=None):
+    from concurrent.futures import ThreadPoolExecutor
+    from msrestazure.azure_exceptions import CloudError
+    from ._actions import _get_thread_count
+
+    compute_client = _compute_client_factory(cmd.cli_ctx)
+    if vm_name:
+        try:
+            vms = [compute_client.virtual_machines.get(resource_group_name, vm_name)]
+        except CloudError as ex:
+            if ex.status_code != 404:
+                raise
+            return
+    else:
+        vms = list(compute_client.virtual_machines.list(resource_group_name))
+
+    nic_ids = [n.id for vm in vms for n in ((vm.network_profile and vm.network_profile.network_interfaces) or [])]
+    if not nic_ids:
+        return
+
+    def _get_nic(nic_id):
+        nic_resource_group, nic_name = _parse_rg_name(nic_id)
+        return network_client.network_interfaces.get(nic_resource_group, nic_name)
+
+    def _get_public_ip_address(public_ip_address_id):
+        pip_resource_group, pip_name = _parse_rg_name(public_ip_address_id)
+        return network_client.public_ip_addresses.get(pip_resource_group, pip_name)
+
+    with ThreadPoolExecutor(max_workers=_get_thread_count()) as executor:
+        nic_tasks = [executor.submit(_get_nic, nic_id) for nic_id in nic_ids]
+        pip_tasks = {}
+        # yield each NIC, in VM order, as soon as the public IPs it references are resolved
+        for nic_task in nic_tasks:
+            nic = nic_task.result()
+            if nic.virtual_machine is None:
+                # detached from the VM since it was read
+                continue
+            pip_ids = [c.public_ip_address.id for c in nic.ip_configurations if c.public_ip_address]
+            for pip_id in pip_ids:
+                if pip_id not in pip_tasks:
+                    pip_tasks[pip_id] = executor.submit(_get_public_ip_address, pip_id)
+            ip_address_lookup = {pip_id: pip_tasks[pip_id].result() for pip_id in pip_ids}
+            yield _get_vm_ip_address_info(nic, ip_address_lookup)
+
+
+def _get_vm_ip_address_info(nic, ip_address_lookup):
+    nic_resource_group, nic_vm_name = _parse_rg_name(nic.virtual_machine.id)
+    network_info = {
+        'privateIpAddresses': [],
+        'publicIpAddresses': []
+    }
+    for ip_configuration in nic.ip_configurations:
+        network_info['privateIpAddresses'].append(ip_configuration.private_ip_address)
+        if ip_configuration.public_ip_address:
+            public_ip_address = ip_address_lookup[ip_configuration.public_ip_address.id]
+
+            public_ip_addr_info = {
+                'id': public_ip_address.id,
+                'name': public_ip_address.name,
+                'ipAddress': public_ip_address.ip_address,
+                'ipAllocationMethod': public_ip_address.public_ip_allocation_method
+            }
+
+            try:
+                public_ip_addr_info['zone'] = public_ip_address.zones[0]
+            except (AttributeError, IndexError, TypeError):
+                pass
+
+            network_info['publicIpAddresses'].append(public_ip_addr_info)
+
+    return {
+        'virtualMachine': {
+            'resourceGroup': nic_resource_group,
+            'name': nic_vm_name,
+            'network': network_info
+        }
+    }
+
+
 def open_vm_port(cmd, resource_group_name, vm_name, port, priority=900, network_security_group_name=None,
                  apply_to_subnet=False):
     from msrestazure.tools import parse_resource_id
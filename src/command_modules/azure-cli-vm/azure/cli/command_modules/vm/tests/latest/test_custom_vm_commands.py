@@ -16,7 +16,7 @@ from azure.cli.command_modules.vm.custom import (enable_boot_diagnostics, disabl
                                                  _get_extension_instance_name,
                                                  get_boot_log)
 from azure.cli.command_modules.vm.custom import \
-    (attach_unmanaged_data_disk, detach_data_disk, get_vmss_instance_view)
+    (attach_unmanaged_data_disk, detach_data_disk, get_vmss_instance_view, list_vm_ip_addresses)
 
 from azure.cli.core import AzCommandsLoader
 from azure.cli.core.commands import AzCliCommand
@@ -238,6 +238,80 @@ class TestVmCustom(unittest.TestCase):
         vm_client.virtual_machine_scale_set_vms.list.assert_called_once_with('rg1', 'vmss1', expand='instanceView',
                                                                              select='instanceView')
 
+    @mock.patch('azure.cli.command_modules.vm.custom.get_mgmt_service_client', autospec=True)
+    @mock.patch('azure.cli.command_modules.vm.custom._compute_client_factory', autospec=True)
+    def test_list_vm_ip_addresses_for_single_vm(self, compute_client_factory_mock, network_client_factory_mock):
+        sub = '/subscriptions/00000000-0000-0000-0000-000000000000/resourceGroups/'
+        vm_id = sub + 'rg1/providers/Microsoft.Compute/virtualMachines/vm1'
+        nic_id = sub + 'rg2/providers/Microsoft.Network/networkInterfaces/nic1'
+        pip_id = sub + 'rg2/providers/Microsoft.Network/publicIPAddresses/pip1'
+        cmd = _get_test_cmd()
+        compute_client = mock.MagicMock()
+        compute_client.virtual_machines.get.return_value = FakedVM(nics=[mock.MagicMock(id=nic_id)])
+        compute_client_factory_mock.return_value = compute_client
+        nic = mock.MagicMock()
+        nic.virtual_machine.id = vm_id
+        nic.ip_configurations = [mock.MagicMock(private_ip_address='10.0.0.4')]
+        nic.ip_configurations[0].public_ip_address.id = pip_id
+        pip = mock.MagicMock(id=pip_id, ip_address='1.2.3.4', public_ip_allocation_method='Static', zones=None)
+        pip.name = 'pip1'
+        network_client = mock.MagicMock()
+        network_client.network_interfaces.get.return_value = nic
+        network_client.public_ip_addresses.get.return_value = pip
+        network_client_factory_mock.return_value = network_client
+
+        # execute
+        result = list_vm_ip_addresses(cmd, 'rg1', 'vm1')
+
+        # assert only the referenced resources are fetched, without scanning the subscription
+        compute_client.virtual_machines.get.assert_called_once_with('rg1', 'vm1')
+        network_client.network_interfaces.get.assert_called_once_with('rg2', 'nic1')
+        network_client.public_ip_addresses.get.assert_called_once_with('rg2', 'pip1')
+        self.assertFalse(network_client.network_interfaces.list_all.called)
+        self.assertFalse(network_client.public_ip_addresses.list_all.called)
+        self.assertEqual(result, [{
+            'virtualMachine': {
+                'resourceGroup': 'rg1',
+                'name': 'vm1',
+                'network': {
+                    'privateIpAddresses': ['10.0.0.4'],
+                    'publicIpAddresses': [{
+                        'id': pip_id,
+                        'name': 'pip1',
+                        'ipAddress': '1.2.3.4',
+                        'ipAllocationMethod': 'Static'
+                    }]
+                }
+            }
+        }])
+
+    @mock.patch('azure.cli.command_modules.vm.custom.get_mgmt_service_client', autospec=True)
+    @mock.patch('azure.cli.command_modules.vm.custom._compute_client_factory', autospec=True)
+    def test_list_vm_ip_addresses_skips_detached_nics(self, compute_client_factory_mock, network_client_factory_mock):
+        sub = '/subscriptions/00000000-0000-0000-0000-000000000000/resourceGroups/'
+        vm_id = sub + 'rg1/providers/Microsoft.Compute/virtualMachines/vm1'
+        nic_ids = [sub + 'rg1/providers/Microsoft.Network/networkInterfaces/nic{}'.format(i) for i in range(2)]
+        compute_client = mock.MagicMock()
+        compute_client.virtual_machines.get.return_value = FakedVM(nics=[mock.MagicMock(id=i) for i in nic_ids])
+        compute_client_factory_mock.return_value = compute_client
+        ip_configuration = mock.MagicMock(private_ip_address='10.0.0.4', public_ip_address=None)
+        attached_nic = mock.MagicMock(ip_configurations=[ip_configuration])
+        attached_nic.virtual_machine.id = vm_id
+        # the second NIC was detached from the VM in the meantime
+        detached_nic = mock.MagicMock(virtual_machine=None)
+        network_client = mock.MagicMock()
+        network_client.network_interfaces.get.side_effect = \
+            lambda rg, name: attached_nic if name == 'nic0' else detached_nic
+        network_client_factory_mock.return_value = network_client
+
+        # execute
+        result = list_vm_ip_addresses(_get_test_cmd(), 'rg1', 'vm1')
+
+        # assert
+        self.assertEqual(network_client.network_interfaces.get.call_count, 2)
+        self.assertEqual(len(result), 1)
+        self.assertEqual(result[0]['virtualMachine']['network']['privateIpAddresses'], ['10.0.0.4'])
+
     # pylint: disable=line-too-long
     @mock.patch('azure.cli.command_modules.vm.disk_encryption._compute_client_factory', autospec=True)
     @mock.patch('azure.cli.command_modules.vm.disk_encryption._get_keyvault_key_url', autospec=True)